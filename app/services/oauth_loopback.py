@@ -0,0 +1,211 @@
+"""
+OAuth sign-in through the system browser with PKCE and a loopback redirect.
+
+The app asks Supabase to redirect the browser to a one-shot HTTP listener
+on 127.0.0.1 and an ephemeral port, which only exists while the flow runs.
+The listener captures the authorization code from that redirect, and the
+code is exchanged for a session together with the PKCE code verifier, so
+an intercepted code is of no use to anyone else.
+
+Supabase has to allow the redirect: add http://127.0.0.1:*/** to the
+project's Redirect URLs.
+"""
+import asyncio
+import base64
+import hashlib
+import json
+import secrets
+import threading
+import time
+import urllib.error
+import urllib.request
+from urllib.parse import parse_qs, urlencode, urlsplit
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+LOOPBACK_HOST = '127.0.0.1'
+
+PAGE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>CS2 Tool Login</title></head>
+<body style="font-family: sans-serif; background: #121212; color: #ffffff; text-align: center; padding-top: 80px">
+<h2>{title}</h2><p>You can close this tab and return to the app.</p>
+</body></html>
+"""
+
+class OAuthError(Exception):
+    """
+    The provider refused the sign-in or the code exchange failed. status is
+    the HTTP status of a failed exchange, as on Supabase's own errors.
+    """
+    def __init__(self, message, status=None):
+        super().__init__(message)
+        self.status = status
+
+def pkce_pair():
+    """
+    A new code verifier and its S256 code challenge
+    """
+    verifier = secrets.token_urlsafe(48)
+    digest = hashlib.sha256(verifier.encode('ascii')).digest()
+    challenge = base64.urlsafe_b64encode(digest).rstrip(b'=').decode('ascii')
+    return verifier, challenge
+
+def authorize_url(supabase_url, provider, redirect_to, code_challenge):
+    """
+    The Supabase authorize URL that starts a PKCE flow with provider
+    """
+    return f"{supabase_url}/auth/v1/authorize?" + urlencode({
+        'provider': provider,
+        'redirect_to': redirect_to,
+        'code_challenge': code_challenge,
+        'code_challenge_method': 's256',
+    })
+
+def callback_params(url):
+    """
+    The parameters of a redirect URL, one value each
+    """
+    return {name: values[0] for name, values in parse_qs(urlsplit(url).query).items()}
+
+def is_oauth_redirect(url):
+    """
+    Whether url looks like the provider's redirect back: an absolute URL
+    carrying an authorization code or an error
+    """
+    parts = urlsplit(url)
+    if not parts.scheme or not parts.netloc:
+        return False
+    params = callback_params(url)
+    return 'code' in params or 'error' in params
+
+def exchange_code(supabase_url, api_key, auth_code, code_verifier, timeout=30):
+    """
+    Exchange an authorization code for a session: the token endpoint's
+    JSON with access_token, refresh_token and user
+    """
+    request = urllib.request.Request(
+        f"{supabase_url}/auth/v1/token?grant_type=pkce",
+        data=json.dumps({'auth_code': auth_code, 'code_verifier': code_verifier}).encode(),
+        headers={'apikey': api_key, 'Authorization': f"Bearer {api_key}", 'Content-Type': 'application/json'},
+        method='POST')
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        try:
+            body = json.loads(e.read())
+            message = body.get('error_description') or body.get('msg') or body.get('error') or str(e)
+        except ValueError:
+            message = str(e)
+        raise OAuthError(message, e.code) from None
+
+class LoopbackListener:
+    """
+    One-shot HTTP listener for the OAuth redirect.
+
+    An asyncio server on its own thread, bound to 127.0.0.1 and an ephemeral
+    port from start() (or entering the with block) until close(). The path
+    carries a random token, so only the redirect of this flow is accepted.
+    """
+    def __init__(self):
+        self.path = f"/callback/{secrets.token_urlsafe(12)}"
+        self.port = None
+        self.callback_url = None
+        self._received = threading.Event()
+        self._ready = threading.Event()
+        self._loop = None
+        self._stop = None
+        self._thread = None
+        self._error = None
+
+    @property
+    def redirect_uri(self):
+        return f"http://{LOOPBACK_HOST}:{self.port}{self.path}"
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._serve, name='oauth-loopback', daemon=True)
+        self._thread.start()
+        self._ready.wait(5)
+        if self.port is None:
+            raise OAuthError(f"Could not start the OAuth callback listener: {self._error}")
+        logger.info("OAuth callback listener on port %d", self.port)
+
+    def wait(self, timeout=None, poll=None):
+        """
+        Block until the redirect arrives and return its URL. poll is called
+        a few times a second and may raise to give up early.
+        """
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        while not self._received.wait(0.2):
+            if poll is not None:
+                poll()
+            if deadline is not None and time.monotonic() > deadline:
+                raise TimeoutError("No OAuth redirect arrived")
+        return self.callback_url
+
+    def close(self):
+        if self._loop is not None and self._stop is not None:
+            self._loop.call_soon_threadsafe(self._stop.set)
+        if self._thread is not None:
+            self._thread.join(2)
+            self._thread = None
+        logger.debug("OAuth callback listener closed")
+
+    def _serve(self):
+        try:
+            asyncio.run(self._main())
+        except Exception as e:
+            self._error = e
+            logger.error("OAuth callback listener failed: %s", e)
+        finally:
+            self._ready.set()
+
+    async def _main(self):
+        self._loop = asyncio.get_running_loop()
+        self._stop = asyncio.Event()
+        server = await asyncio.start_server(self._handle, LOOPBACK_HOST, 0)
+        self.port = server.sockets[0].getsockname()[1]
+        self._ready.set()
+        async with server:
+            await self._stop.wait()
+
+    async def _handle(self, reader, writer):
+        try:
+            request_line = await asyncio.wait_for(reader.readline(), 5)
+            while True:
+                line = await asyncio.wait_for(reader.readline(), 5)
+                if line in (b'\r\n', b'\n', b''):
+                    break
+
+            parts = request_line.decode('latin-1').split()
+            target = parts[1] if len(parts) == 3 else ''
+            params = callback_params(target)
+            if parts[:1] != ['GET'] or urlsplit(target).path != self.path or not ('code' in params or 'error' in params):
+                await self._respond(writer, '404 Not Found', 'Not found')
+                return
+
+            if not self._received.is_set():
+                self.callback_url = f"http://{LOOPBACK_HOST}:{self.port}{target}"
+                self._received.set()
+            title = 'Signed in' if 'code' in params else 'Sign-in was cancelled'
+            await self._respond(writer, '200 OK', title)
+        except (asyncio.TimeoutError, ConnectionError, UnicodeDecodeError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _respond(writer, status, title):
+        body = PAGE.format(title=title).encode()
+        writer.write(f"HTTP/1.1 {status}\r\nContent-Type: text/html; charset=utf-8\r\n"
+                     f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body)
+        await writer.drain()
@@ -0,0 +1,200 @@
+"""
+Cancellable service operations with deadlines.
+
+An Operation runs one service call on a thread pool. While it runs, the
+signals and state changes the call produces are collected on the handle
+(see defer) and applied on the GUI thread once the call returns, followed
+by the finished signal. Cancelling the handle, or letting its deadline
+pass, aborts it: a call still queued never runs, one already running stops
+at its next checkpoint, and whatever it produces afterwards is dropped, so
+an abandoned request cannot reach whichever screen is current by then.
+"""
+import threading
+import time
+from PyQt6.QtCore import QObject, QRunnable, QTimer, pyqtSignal
+
+from app.utils import metrics
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+OPERATIONS = metrics.counter('supabase_async_operations_total',
+                             'Asynchronous service operations by outcome', ('operation', 'outcome'))
+
+_current = threading.local()
+
+class OperationCancelled(BaseException):
+    """
+    Raised at a checkpoint of an aborted operation. Like
+    asyncio.CancelledError it is not an Exception, so the error handling
+    of the service calls lets it through.
+    """
+
+def current_operation():
+    """
+    The operation running on this thread, or None
+    """
+    return getattr(_current, 'operation', None)
+
+def checkpoint():
+    """
+    Stop the current operation here if it was cancelled or timed out
+    """
+    operation = current_operation()
+    if operation is not None and operation._abort_requested.is_set():
+        raise OperationCancelled(operation.state)
+
+class _OperationJob(QRunnable):
+    def __init__(self, operation):
+        super().__init__()
+        self.operation = operation
+        # The operation keeps the job alive until it is done
+        self.setAutoDelete(False)
+
+    def run(self):
+        self.operation._run()
+
+class Operation(QObject):
+    """
+    Handle of one service call running in the background.
+
+    state is 'pending' until the operation ends as 'finished', 'cancelled'
+    or 'timed_out'; only the GUI thread changes it. finished carries the
+    call's return value, aborted the state an aborted operation ended in.
+    Exactly one of them is emitted.
+    """
+    finished = pyqtSignal(object)
+    aborted = pyqtSignal(str)
+    _completed = pyqtSignal(object)
+
+    def __init__(self, name, function, args=(), kwargs=None, deadline=None):
+        super().__init__()
+        self.name = name
+        self.function = function
+        self.args = args
+        self.kwargs = kwargs or {}
+        self.deadline = deadline
+        self.state = 'pending'
+        self.result = None
+        self.started_at = None
+
+        self._deferred = []
+        self._abort_requested = threading.Event()
+        self._thread_pool = None
+        self._job = _OperationJob(self)
+        self._completed.connect(self._on_completed)
+
+        self._deadline_timer = QTimer(self)
+        self._deadline_timer.setSingleShot(True)
+        self._deadline_timer.timeout.connect(self._on_deadline)
+
+    @property
+    def done(self):
+        return self.state in ('finished', 'cancelled', 'timed_out')
+
+    def start(self, thread_pool):
+        self._thread_pool = thread_pool
+        self.started_at = time.monotonic()
+        if self.deadline is not None:
+            self._deadline_timer.start(int(self.deadline * 1000))
+        thread_pool.start(self._job)
+
+    def cancel(self):
+        """
+        Abort the operation; returns False when it was already done
+        """
+        return self._abort('cancelled')
+
+    def defer(self, function, *args):
+        """
+        Apply function(*args) on the GUI thread when the operation finishes
+        in time; called from the worker thread
+        """
+        self._deferred.append((function, args))
+
+    def _on_deadline(self):
+        self._abort('timed_out')
+
+    def _abort(self, state):
+        if self.done:
+            return False
+        self._abort_requested.set()
+        self._deadline_timer.stop()
+        never_ran = self._thread_pool is not None and self._thread_pool.tryTake(self._job)
+        self.state = state
+        OPERATIONS.inc(operation=self.name, outcome=state)
+        logger.info("%s %s after %.0f ms%s", self.name, state.replace('_', ' '),
+                    (time.monotonic() - self.started_at) * 1000, " before it started" if never_ran else "")
+        self.aborted.emit(state)
+        return True
+
+    def _run(self):
+        # Worker thread
+        if self._abort_requested.is_set():
+            return
+        _current.operation = self
+        result = None
+        try:
+            result = self.function(*self.args, **self.kwargs)
+        except OperationCancelled:
+            pass
+        finally:
+            _current.operation = None
+        try:
+            self._completed.emit(result)
+        except RuntimeError:
+            # The handle was deleted while the call ran
+            pass
+
+    def _on_completed(self, result):
+        if self.done:
+            OPERATIONS.inc(operation=self.name, outcome='late_result_dropped')
+            logger.debug("Dropped the late result of %s (%d deferred updates)", self.name, len(self._deferred))
+            self._deferred = []
+            return
+
+        self._deadline_timer.stop()
+        self.state = 'finished'
+        self.result = result
+        deferred, self._deferred = self._deferred, []
+        for function, args in deferred:
+            # An exception escaping a slot aborts the process, and the
+            # operation would never report finished
+            try:
+                function(*args)
+            except Exception:
+                logger.exception("Applying the result of %s failed in %s", self.name,
+                                 getattr(function, '__qualname__', function))
+        OPERATIONS.inc(operation=self.name, outcome='finished')
+        self.finished.emit(result)
+
+class OperationGroup(QObject):
+    """
+    The outstanding operations of one owner, e.g. a screen, so they can be
+    cancelled together. Operations leave the group when they end.
+    """
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._operations = set()
+
+    def __len__(self):
+        return len(self._operations)
+
+    def add(self, operation):
+        self._operations.add(operation)
+        operation.finished.connect(self._forget)
+        operation.aborted.connect(self._forget)
+        return operation
+
+    def cancel(self):
+        """
+        Cancel every outstanding operation; returns how many there were
+        """
+        operations = list(self._operations)
+        for operation in operations:
+            operation.cancel()
+        return len(operations)
+
+    def _forget(self, *args):
+        self._operations.discard(self.sender())
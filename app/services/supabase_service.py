@@ -5,17 +5,79 @@ import webbrowser
 import uuid
 import time
 from supabase import create_client, Client
+try:
+    # supabase 2.x, whose ClientOptions lacks the sync client's storage
+    from supabase.lib.client_options import SyncClientOptions as ClientOptions
+except ImportError:
+    from supabase.lib.client_options import ClientOptions
 from cryptography.fernet import Fernet
-from PyQt6.QtCore import QObject, pyqtSignal
+from PyQt6.QtCore import QObject, QThreadPool, QTimer, pyqtSignal
+
+from app.services.operation import Operation, OperationGroup, checkpoint, current_operation
+from app.services.oauth_loopback import (LoopbackListener, OAuthError, authorize_url, callback_params,
+                                         exchange_code, pkce_pair)
+from app.utils import metrics, tracing
+from app.utils.rate_limit import TokenBucket
+from app.utils.settings import settings
 
 import logging
 
 logger = logging.getLogger(__name__)
 
+OPERATION_DURATION = metrics.histogram('supabase_operation_duration_seconds',
+                                       'Duration of SupabaseService operations', ('operation',))
+OPERATION_ERRORS = metrics.counter('supabase_operation_errors_total',
+                                   'SupabaseService operations that failed with an exception', ('operation', 'error'))
+KEYRING_DURATION = metrics.histogram('keyring_operation_duration_seconds',
+                                     'Latency of keyring reads, writes and deletes', ('operation',))
+ROLE_CACHE = metrics.counter('supabase_role_cache_lookups_total',
+                             'User role lookups by cache result', ('result',))
+AUTH_THROTTLED = metrics.counter('supabase_auth_throttled_total',
+                                 'Auth requests refused by the client-side limiter or rate limited by the server',
+                                 ('operation', 'source'))
+
+# Client-side limits per auth endpoint: (tokens per second, burst). They sit
+# below Supabase's own auth rate limits, which lock the whole window once hit.
+# config['auth_rate_limits'] overrides single entries.
+AUTH_RATE_LIMITS = {
+    'sign_in': (1 / 6, 5),
+    'sign_up': (1 / 60, 3),
+    'send_password_reset_email': (1 / 60, 2),
+}
+
+# Wait before trying a failed session refresh again
+REFRESH_RETRY_MS = 30000
+
+def session_field(session, name):
+    """
+    A field of a session, which is a dict in demo mode and after a restore
+    """
+    if session is None:
+        return None
+    if isinstance(session, dict):
+        return session.get(name)
+    return getattr(session, name, None)
+
+def session_data(session):
+    """
+    A session as JSON-ready data for the keyring; Supabase returns pydantic
+    models
+    """
+    if isinstance(session, dict):
+        return session
+    if hasattr(session, 'model_dump'):
+        return session.model_dump(mode='json')
+    # pydantic 1, under supabase 1.x
+    return json.loads(session.json())
+
 class SupabaseService(QObject):
     # Signals
     auth_state_changed = pyqtSignal(dict)
     auth_error = pyqtSignal(str)
+    # operation, seconds until it may be tried again
+    rate_limited = pyqtSignal(str, float)
+    # The signed-in user's session was refreshed: {'user': ..., 'session': ...}
+    session_refreshed = pyqtSignal(dict)
     
     def __init__(self, config):
         super().__init__()
@@ -31,18 +93,40 @@ class SupabaseService(QObject):
             self.client = None  # No actual Supabase client in demo mode
         else:
             try:
-                self.client = create_client(self.supabase_url, self.supabase_key)
+                # Database requests time out with background operations,
+                # as of startup. Sessions are refreshed by refresh_session
+                # only, refresh tokens are single use.
+                self.client = create_client(self.supabase_url, self.supabase_key,
+                                            ClientOptions(auto_refresh_token=False,
+                                                          postgrest_client_timeout=settings().get('request_timeout')))
                 logger.info("Successfully connected to Supabase")
             except Exception as e:
-                logger.error(f"Error connecting to Supabase: {e}")
+                logger.error("Error connecting to Supabase: %s", e)
                 logger.warning("Falling back to DEMO MODE with mock authentication")
                 self.demo_mode = True
                 self.client = None
             
         self.current_user = None
         self.current_session = None
+        self._role_cache = {}
+        self._pkce_verifier = None
+        # Whether the session is kept in the keyring, and refreshed there too
+        self._remember = False
+        self._refresh_timer = QTimer(self)
+        self._refresh_timer.setSingleShot(True)
+        self._refresh_timer.timeout.connect(self._refresh_due)
+        # Opens OAuth authorize URLs; tools/oauth_standin.py follows them itself
+        self.browser_open = webbrowser.open
+        limits = dict(AUTH_RATE_LIMITS, **config.get('auth_rate_limits', {}))
+        self._auth_limits = {operation: TokenBucket(rate, burst) for operation, (rate, burst) in limits.items()}
         self.encryption_key = self._get_or_create_encryption_key()
         
+        # Background operations, see start()
+        self._operations = OperationGroup(self)
+        self._thread_pool = QThreadPool(self)
+        self._thread_pool.setMaxThreadCount(settings().get('worker_threads'))
+        settings().changed.connect(self.apply_settings)
+        
         # Demo mode users (for testing)
         self.demo_users = {
             "demo@example.com": {
@@ -66,19 +150,144 @@ class SupabaseService(QObject):
         """
         Get or create encryption key for secure storage
         """
-        key = keyring.get_password("cs2_login_app", "encryption_key")
+        with KEYRING_DURATION.time(operation='get'):
+            key = keyring.get_password("cs2_login_app", "encryption_key")
         if not key:
             key = Fernet.generate_key().decode()
-            keyring.set_password("cs2_login_app", "encryption_key", key)
+            with KEYRING_DURATION.time(operation='set'):
+                keyring.set_password("cs2_login_app", "encryption_key", key)
             logger.info("Created and saved new encryption key.")
         return key
     
+    def _record_error(self, operation, error):
+        """
+        Count a failed operation by exception class
+        """
+        OPERATION_ERRORS.inc(operation=operation, error=type(error).__name__)
+    
+    def apply_settings(self, names):
+        """
+        Follow changes to the worker pool size; timeouts and the role cache
+        TTL are read on every use
+        """
+        if 'worker_threads' in names:
+            self._thread_pool.setMaxThreadCount(settings().get('worker_threads'))
+    
+    def start(self, operation, *args, deadline=None, **kwargs):
+        """
+        Run an operation (the name of a method, e.g. 'sign_in') in the
+        background and return its cancellable Operation handle. The signals
+        and state changes it causes are applied on the GUI thread when it
+        finishes, and dropped if it was cancelled or missed its deadline,
+        by default the request_timeout setting.
+        """
+        if deadline is None:
+            deadline = settings().get('request_timeout')
+        handle = self._operations.add(Operation(operation, getattr(self, operation), args, kwargs, deadline))
+        handle.start(self._thread_pool)
+        return handle
+    
+    @property
+    def pending_operations(self):
+        return len(self._operations)
+    
+    def cancel_all(self):
+        """
+        Abandon every outstanding operation, e.g. when the window closes
+        """
+        self._operations.cancel()
+    
+    def _deliver(self, function, *args):
+        """
+        Call function(*args) now, or, inside an operation, when the
+        operation's result is delivered on the GUI thread
+        """
+        operation = current_operation()
+        if operation is None:
+            function(*args)
+        else:
+            operation.defer(function, *args)
+    
+    def _set_auth_state(self, user, session, remember=False, role=None):
+        """
+        Make user the signed-in user (None signs out) and announce it
+        """
+        self.current_user = user
+        self.current_session = session
+        
+        # The operation saved a remembered session to the keyring already
+        if remember:
+            self._remember = True
+        
+        state = {'user': user, 'session': session}
+        if role is not None:
+            state['role'] = role
+        self._schedule_refresh()
+        with tracing.span('auth_state_changed.emit', 'auth'):
+            self.auth_state_changed.emit(state)
+    
+    def _schedule_refresh(self):
+        """
+        Refresh the session the token_refresh_margin setting ahead of its
+        expiry; nothing to refresh when signed out
+        """
+        expires_at = session_field(self.current_session, 'expires_at')
+        if not expires_at:
+            self._refresh_timer.stop()
+            return
+        delay = max(0.0, expires_at - settings().get('token_refresh_margin') - time.time())
+        self._refresh_timer.start(int(min(delay, 86400) * 1000))
+    
+    def _refresh_due(self):
+        if self.current_session is not None:
+            self.start('refresh_session')
+    
+    def _retry_refresh(self):
+        if self.current_session is not None:
+            self._refresh_timer.start(REFRESH_RETRY_MS)
+    
+    def _set_session(self, session):
+        """
+        Replace the signed-in user's session with a refreshed one
+        """
+        if self.current_user is None:
+            return
+        self.current_session = session
+        self._schedule_refresh()
+        self.session_refreshed.emit({'user': self.current_user, 'session': session})
+    
+    def _acquire(self, operation):
+        """
+        Take a token for an auth request; when there is none, report the
+        cooldown with rate_limited instead of spending backend quota
+        """
+        bucket = self._auth_limits[operation]
+        if bucket.try_acquire():
+            return True
+        retry_after = bucket.wait_time()
+        AUTH_THROTTLED.inc(operation=operation, source='client')
+        logger.warning("Throttled %s, next attempt allowed in %.1f s", operation, retry_after)
+        self._deliver(self.rate_limited.emit, operation, retry_after)
+        return False
+    
+    def _check_server_limit(self, operation, error):
+        """
+        Hold the endpoint back when Supabase itself answered 429
+        """
+        if getattr(error, 'status', None) != 429:
+            return
+        bucket = self._auth_limits[operation]
+        bucket.drain()
+        AUTH_THROTTLED.inc(operation=operation, source='server')
+        self._deliver(self.rate_limited.emit, operation, bucket.wait_time())
+    
     def _get_fernet(self):
         """
         Get Fernet encryption instance
         """
         return Fernet(self.encryption_key.encode())
     
+    @tracing.traced('keyring.save_session', 'keyring')
     def _save_session(self, session, remember=False):
         """
         Save session data securely
@@ -86,25 +295,27 @@ class SupabaseService(QObject):
         if remember:
             # Encrypt session data
             fernet = self._get_fernet()
-            session_data = json.dumps(session)
-            encrypted_data = fernet.encrypt(session_data.encode()).decode()
+            encrypted_data = fernet.encrypt(json.dumps(session_data(session)).encode()).decode()
             
             # Save to keyring
-            keyring.set_password("cs2_login_app", "session", encrypted_data)
+            with KEYRING_DURATION.time(operation='set'):
+                keyring.set_password("cs2_login_app", "session", encrypted_data)
             logger.info("Saved session to keyring.")
     
+    @OPERATION_DURATION.timed(operation='restore_session')
     def _restore_session(self):
         """
         Restore previous session if available
         """
         try:
             # Get encrypted session from keyring
-            encrypted_data = keyring.get_password("cs2_login_app", "session")
+            with KEYRING_DURATION.time(operation='get'):
+                encrypted_data = keyring.get_password("cs2_login_app", "session")
             if encrypted_data:
                 # Decrypt session data
                 fernet = self._get_fernet()
-                session_data = fernet.decrypt(encrypted_data.encode()).decode()
-                session = json.loads(session_data)
+                decrypted = fernet.decrypt(encrypted_data.encode()).decode()
+                session = json.loads(decrypted)
                 logger.info("Restored session from keyring.")
                 
                 if self.demo_mode:
@@ -133,6 +344,8 @@ class SupabaseService(QObject):
                         
                         self.current_user = user
                         self.current_session = session
+                        self._remember = True
+                        self._schedule_refresh()
                         
                         # Emit auth state changed signal
                         self.auth_state_changed.emit({
@@ -140,28 +353,31 @@ class SupabaseService(QObject):
                             'session': self.current_session,
                             'role': user_data["role"]
                         })
-                        logger.info(f"Demo user {user_email} session restored.")
+                        logger.info("Demo user %s session restored.", user_email)
                         
                         return True
                 else:
-                    # Set session in client
-                    self.client.auth.set_session(session)
-                    self.current_session = session
-                    
-                    # Get user from session
-                    user_response = self.client.auth.get_user()
-                    self.current_user = user_response.user
+                    # Set session in client; an expired access token is
+                    # refreshed on the way, which uses up the saved refresh token
+                    response = self.client.auth.set_session(session['access_token'], session['refresh_token'])
+                    self.current_session = response.session
+                    self.current_user = response.user
+                    if session_field(response.session, 'refresh_token') != session['refresh_token']:
+                        self._save_session(response.session, True)
+                    self._remember = True
+                    self._schedule_refresh()
                     
                     # Emit auth state changed signal
                     self.auth_state_changed.emit({
                         'user': self.current_user,
                         'session': self.current_session
                     })
-                    logger.info(f"User {self.current_user.email} session restored.")
+                    logger.info("User %s session restored.", self.current_user.email)
                     
                     return True
         except Exception as e:
-            logger.error(f"Error restoring session: {e}")
+            self._record_error('restore_session', e)
+            logger.error("Error restoring session: %s", e)
             self.clear_session()
         
         return False
@@ -171,26 +387,38 @@ class SupabaseService(QObject):
         Clear saved session
         """
         try:
-            keyring.delete_password("cs2_login_app", "session")
+            with KEYRING_DURATION.time(operation='delete'):
+                keyring.delete_password("cs2_login_app", "session")
             logger.info("Cleared session from keyring.")
         except:
             pass
         
         self.current_user = None
         self.current_session = None
+        self._remember = False
+        self._role_cache.clear()
     
+    @OPERATION_DURATION.timed(operation='sign_up')
     def sign_up(self, email, password, username):
         """
         Register a new user
         """
+        if not self._acquire('sign_up'):
+            return False
+        
         try:
             # Handle demo mode
             if self.demo_mode:
                 # Check if email already exists
                 if email in self.demo_users:
-                    self.auth_error.emit("Email already registered")
-                    logger.warning(f"Attempted to register existing demo email: {email}")
-                    return
+                    self._deliver(self.auth_error.emit, "Email already registered")
+                    logger.warning("Attempted to register existing demo email: %s", email)
+                    return False
+                
+                if not self.is_username_available(username):
+                    self._deliver(self.auth_error.emit, "Username is already taken")
+                    logger.warning("Attempted to register existing demo username: %s", username)
+                    return False
                 
                 # Create new demo user
                 user_id = str(uuid.uuid4())
@@ -214,18 +442,11 @@ class SupabaseService(QObject):
                     "expires_at": int(time.time()) + 3600
                 }
                 
-                # Set current user and session
-                self.current_user = user
-                self.current_session = session
-                
-                # Emit auth state changed signal
-                self.auth_state_changed.emit({
-                    'user': self.current_user,
-                    'session': self.current_session
-                })
-                logger.info(f"Successfully signed up demo user: {email}")
+                # Sign in as this user once the result is delivered
+                self._deliver(self._set_auth_state, user, session)
+                logger.info("Successfully signed up demo user: %s", email)
                 
-                return
+                return True
             
             # Real Supabase implementation
             response = self.client.auth.sign_up({
@@ -238,6 +459,9 @@ class SupabaseService(QObject):
             session = response.session
             
             if user and user.id:
+                # Abandoned operations stop before the next request
+                checkpoint()
+                
                 # Create profile in profiles table
                 self.client.table('profiles').insert({
                     'id': user.id,
@@ -246,42 +470,42 @@ class SupabaseService(QObject):
                     'created_at': 'now()'
                 }).execute()
                 
-                # Set current user and session
-                self.current_user = user
-                self.current_session = session
-                
-                # Emit auth state changed signal
-                self.auth_state_changed.emit({
-                    'user': user,
-                    'session': session
-                })
-                logger.info(f"Successfully signed up user: {email}")
+                # Sign in as this user once the result is delivered
+                self._deliver(self._set_auth_state, user, session)
+                logger.info("Successfully signed up user: %s", email)
                 
                 return True
             
             return False
         except Exception as e:
             error_msg = str(e)
-            self.auth_error.emit(error_msg)
-            logger.error(f"Error during sign up for {email}: {error_msg}")
+            self._deliver(self.auth_error.emit, error_msg)
+            self._record_error('sign_up', e)
+            self._check_server_limit('sign_up', e)
+            logger.error("Error during sign up for %s: %s", email, error_msg)
             return False
     
+    @tracing.traced('SupabaseService.sign_in', 'auth')
+    @OPERATION_DURATION.timed(operation='sign_in')
     def sign_in(self, email, password, remember=False):
         """
         Sign in with email and password
         """
+        if not self._acquire('sign_in'):
+            return False
+        
         try:
             # Handle demo mode
             if self.demo_mode:
                 # Check if email exists and password matches
                 if email not in self.demo_users:
-                    self.auth_error.emit("Invalid email or password")
-                    logger.warning(f"Failed sign in for non-existent demo user: {email}")
+                    self._deliver(self.auth_error.emit, "Invalid email or password")
+                    logger.warning("Failed sign in for non-existent demo user: %s", email)
                     return False
                 
                 if self.demo_users[email]["password"] != password:
-                    self.auth_error.emit("Invalid email or password")
-                    logger.warning(f"Failed sign in with wrong password for demo user: {email}")
+                    self._deliver(self.auth_error.emit, "Invalid email or password")
+                    logger.warning("Failed sign in with wrong password for demo user: %s", email)
                     return False
                 
                 # Get demo user data
@@ -301,59 +525,59 @@ class SupabaseService(QObject):
                     "expires_at": int(time.time()) + 3600
                 }
                 
-                # Set current user and session
-                self.current_user = user
-                self.current_session = session
-                
-                # Save session if remember is checked
-                if remember:
-                    self._save_session(session, remember)
-                
-                # Emit auth state changed signal
-                self.auth_state_changed.emit({
-                    'user': user,
-                    'session': session,
-                    'role': user_data["role"]
-                })
-                logger.info(f"Successfully signed in demo user: {email}")
+                # Sign in as this user once the result is delivered
+                self._save_session(session, remember)
+                self._deliver(self._set_auth_state, user, session, remember, user_data["role"])
+                logger.info("Successfully signed in demo user: %s", email)
                 
                 return True
             
             # Real Supabase implementation
-            response = self.client.auth.sign_in_with_password({
-                "email": email,
-                "password": password
-            })
+            with tracing.span('supabase.auth.sign_in_with_password', 'network'):
+                response = self.client.auth.sign_in_with_password({
+                    "email": email,
+                    "password": password
+                })
             
             # Get user data
             user = response.user
             session = response.session
             
-            # Set current user and session
-            self.current_user = user
-            self.current_session = session
-            
-            # Save session if remember is checked
-            if remember:
-                self._save_session(session, remember)
-            
-            # Emit auth state changed signal
-            self.auth_state_changed.emit({
-                'user': user,
-                'session': session
-            })
-            logger.info(f"Successfully signed in user: {email}")
+            # Sign in as this user once the result is delivered
+            self._save_session(session, remember)
+            self._deliver(self._set_auth_state, user, session, remember)
+            logger.info("Successfully signed in user: %s", email)
             
             return True
         except Exception as e:
             error_msg = str(e)
-            self.auth_error.emit(error_msg)
-            logger.error(f"Error during sign in for {email}: {error_msg}")
+            self._deliver(self.auth_error.emit, error_msg)
+            self._record_error('sign_in', e)
+            self._check_server_limit('sign_in', e)
+            logger.error("Error during sign in for %s: %s", email, error_msg)
             return False
     
-    def sign_in_with_oauth(self, provider, use_browser=True):
+    def oauth_authorize_url(self, provider, redirect_to):
+        """
+        Start a PKCE flow with provider and return its authorize URL. The
+        code verifier is kept for handle_oauth_callback.
+        """
+        self._pkce_verifier, code_challenge = pkce_pair()
+        return authorize_url(self.supabase_url, provider, redirect_to, code_challenge)
+    
+    def cancel_oauth(self):
         """
-        Sign in with OAuth provider
+        Forget the code verifier of a flow the user abandoned, so a late
+        redirect for it is refused
+        """
+        self._pkce_verifier = None
+    
+    @OPERATION_DURATION.timed(operation='sign_in_with_oauth')
+    def sign_in_with_oauth(self, provider, remember=False):
+        """
+        Sign in with OAuth provider in the system browser. Blocks until the
+        browser comes back, so run it with the oauth_timeout setting as the
+        deadline of start().
         """
         try:
             # Handle demo mode
@@ -378,69 +602,65 @@ class SupabaseService(QObject):
                     "expires_at": int(time.time()) + 3600
                 }
                 
-                # Set current user and session
-                self.current_user = user
-                self.current_session = session
-                
-                # Emit auth state changed signal
-                self.auth_state_changed.emit({
-                    'user': user,
-                    'session': session,
-                    'role': user_data["role"]
-                })
-                logger.info(f"Successfully signed in demo user via OAuth: {email}")
+                # Sign in as this user once the result is delivered
+                self._deliver(self._set_auth_state, user, session, False, user_data["role"])
+                logger.info("Successfully signed in demo user via OAuth: %s", email)
                 
                 return True
             
-            # Real Supabase implementation
-            response = self.client.auth.sign_in_with_oauth({
-                "provider": provider,
-                "options": {
-                    "redirect_to": "https://yookyhounmcwvzldlnbc.supabase.co/auth/v1/callback"
-                }
-            })
-            auth_url = response.url
-            
-            if use_browser:
-                # Open system browser
-                webbrowser.open(auth_url)
+            # Real Supabase implementation: the browser is sent back to a
+            # loopback listener that only exists for this flow
+            with LoopbackListener() as listener:
+                auth_url = self.oauth_authorize_url(provider, listener.redirect_uri)
+                # Opened right away rather than on delivery, the flow waits for it
+                self.browser_open(auth_url)
+                logger.info("Redirecting to OAuth provider: %s", provider)
+                callback_url = listener.wait(settings().get('oauth_timeout'), poll=checkpoint)
             
-            logger.info(f"Redirecting to OAuth provider: {provider}")
-            return auth_url
+            return self.handle_oauth_callback(callback_url, remember)
         except Exception as e:
             error_msg = str(e)
-            self.auth_error.emit(error_msg)
-            logger.error(f"Error during OAuth sign in with {provider}: {error_msg}")
+            self._deliver(self.auth_error.emit, error_msg)
+            self._record_error('sign_in_with_oauth', e)
+            logger.error("Error during OAuth sign in with %s: %s", provider, error_msg)
             return None
     
+    @OPERATION_DURATION.timed(operation='send_password_reset_email')
     def send_password_reset_email(self, email):
         """
         Send password reset email
         """
+        if not self._acquire('send_password_reset_email'):
+            return False
+        
         try:
             # Handle demo mode
             if self.demo_mode:
                 if email in self.demo_users:
-                    logger.info(f"Simulating password reset for demo user: {email}")
+                    logger.info("Simulating password reset for demo user: %s", email)
                     return True
                 else:
-                    self.auth_error.emit("Email not found")
-                    logger.warning(f"Password reset requested for non-existent demo user: {email}")
+                    self._deliver(self.auth_error.emit, "Email not found")
+                    logger.warning("Password reset requested for non-existent demo user: %s", email)
                     return False
             
             # Real Supabase implementation
             self.client.auth.send_password_reset_email(email)
-            logger.info(f"Sent password reset email to: {email}")
+            logger.info("Sent password reset email to: %s", email)
             return True
         except Exception as e:
             error_msg = str(e)
-            self.auth_error.emit(error_msg)
-            logger.error(f"Error sending password reset email to {email}: {error_msg}")
+            self._deliver(self.auth_error.emit, error_msg)
+            self._record_error('send_password_reset_email', e)
+            self._check_server_limit('send_password_reset_email', e)
+            logger.error("Error sending password reset email to %s: %s", email, error_msg)
             return False
     
+    @OPERATION_DURATION.timed(operation='handle_oauth_callback')
     def handle_oauth_callback(self, url, remember=False):
         """
-        Handle OAuth callback
+        Complete an OAuth sign-in from the redirect URL of a PKCE flow
+        started with oauth_authorize_url
         """
         try:
             # Handle demo mode
@@ -449,39 +669,36 @@ class SupabaseService(QObject):
                 logger.info("Handling OAuth callback in demo mode.")
                 return True
                 
-            # Extract session from URL
-            # This is a simplified example - in a real app, you'd need to parse the URL
-            # and extract the session token properly
-            
-            # For demonstration purposes:
-            # Assume we've extracted the session token and set it
-            session = self.client.auth.get_session_from_url(url)
-            
-            # Get user data
-            user = self.client.auth.get_user()
+            # The redirect carries the authorization code, or the provider's error
+            params = callback_params(url)
+            if 'error' in params:
+                raise OAuthError(params.get('error_description') or params['error'])
+            if 'code' not in params or self._pkce_verifier is None:
+                raise OAuthError("The OAuth redirect does not belong to a pending sign-in")
+            code_verifier, self._pkce_verifier = self._pkce_verifier, None
             
-            # Set current user and session
-            self.current_user = user
-            self.current_session = session
-            
-            # Save session if remember is checked
-            if remember:
-                self._save_session(session, remember)
+            # Exchange the code for a session and hand it to the client
+            tokens = exchange_code(self.supabase_url, self.supabase_key, params['code'], code_verifier,
+                                   settings().get('request_timeout'))
+            checkpoint()
+            response = self.client.auth.set_session(tokens['access_token'], tokens['refresh_token'])
+            user = response.user
+            session = response.session
             
-            # Emit auth state changed signal
-            self.auth_state_changed.emit({
-                'user': user,
-                'session': session
-            })
-            logger.info(f"Successfully handled OAuth callback for user: {user.email}")
+            # Sign in as this user once the result is delivered
+            self._save_session(session, remember)
+            self._deliver(self._set_auth_state, user, session, remember)
+            logger.info("Successfully handled OAuth callback for user: %s", user.email)
             
             return True
         except Exception as e:
             error_msg = str(e)
-            self.auth_error.emit(error_msg)
-            logger.error(f"Error handling OAuth callback: {error_msg}")
+            self._deliver(self.auth_error.emit, error_msg)
+            self._record_error('handle_oauth_callback', e)
+            logger.error("Error handling OAuth callback: %s", error_msg)
             return False
     
+    @OPERATION_DURATION.timed(operation='sign_out')
     def sign_out(self):
         """
         Sign out current user
@@ -491,23 +708,76 @@ class SupabaseService(QObject):
                 # Sign out with Supabase Auth
                 self.client.auth.sign_out()
             
-            # Clear session
-            self.clear_session()
-            
-            # Emit auth state changed signal
-            self.auth_state_changed.emit({
-                'user': None,
-                'session': None
-            })
+            # Clear session and announce the sign out
+            self._deliver(self.clear_session)
+            self._deliver(self._set_auth_state, None, None)
             logger.info("User signed out.")
             
             return True
         except Exception as e:
             error_msg = str(e)
-            self.auth_error.emit(error_msg)
-            logger.error(f"Error during sign out: {error_msg}")
+            self._deliver(self.auth_error.emit, error_msg)
+            self._record_error('sign_out', e)
+            logger.error("Error during sign out: %s", error_msg)
+            return False
+    
+    @OPERATION_DURATION.timed(operation='refresh_session')
+    def refresh_session(self):
+        """
+        Exchange the refresh token for a new session. Started by a timer
+        ahead of expiry, so the app and the token broker always hold a
+        valid access token.
+        """
+        try:
+            if self.demo_mode:
+                session = dict(self.current_session, expires_at=int(time.time()) + 3600)
+            else:
+                with tracing.span('supabase.auth.refresh_session', 'network'):
+                    session = self.client.auth.refresh_session().session
+            
+            # The old refresh token is used up; a remembered session has to
+            # be saved again or the next launch cannot restore it
+            if self._remember:
+                try:
+                    self._save_session(session, True)
+                except Exception as e:
+                    self._record_error('save_session', e)
+                    logger.error("Could not save the refreshed session: %s", e)
+            
+            self._deliver(self._set_session, session)
+            logger.info("Refreshed the session.")
+            return True
+        except Exception as e:
+            self._deliver(self._retry_refresh)
+            self._record_error('refresh_session', e)
+            logger.error("Error refreshing the session: %s", e)
             return False
     
+    @OPERATION_DURATION.timed(operation='is_username_available')
+    def is_username_available(self, username):
+        """
+        Ask whether a username is still free. Returns None when the answer
+        is unknown; the unique constraint on profiles.username decides then.
+        Safe to call from a worker thread.
+        """
+        try:
+            # Handle demo mode
+            if self.demo_mode:
+                return all(user["username"] != username for user in list(self.demo_users.values()))
+            
+            # Row level security hides other users' profiles, so ask a
+            # security definer function (see README) instead of the table
+            response = self.client.rpc('username_available', {'name': username}).execute()
+            if isinstance(response.data, bool):
+                return response.data
+            logger.warning("Unexpected username_available response: %r", response.data)
+            return None
+        except Exception as e:
+            self._record_error('is_username_available', e)
+            logger.warning("Could not check username availability: %s", e)
+            return None
+    
+    @OPERATION_DURATION.timed(operation='get_user_role')
     def get_user_role(self):
         """
         Get current user role from profiles table
@@ -522,11 +792,18 @@ class SupabaseService(QObject):
                 user_email = self.current_user.get("email")
                 if user_email and user_email in self.demo_users:
                     role = self.demo_users[user_email]["role"]
-                    logger.info(f"Retrieved role for demo user {user_email}: {role}")
+                    logger.info("Retrieved role for demo user %s: %s", user_email, role)
                     return role
-                logger.warning(f"Could not find role for demo user: {user_email}")
+                logger.warning("Could not find role for demo user: %s", user_email)
                 return "FREE"  # Default role
             
+            # Reuse a recently fetched role
+            cached = self._role_cache.get(self.current_user.id)
+            if cached and time.monotonic() - cached[1] < settings().get('role_cache_ttl'):
+                ROLE_CACHE.inc(result='hit')
+                return cached[0]
+            ROLE_CACHE.inc(result='miss')
+            
             # Real Supabase implementation
             response = self.client.table('profiles')\
                 .select('role')\
@@ -536,15 +813,18 @@ class SupabaseService(QObject):
             # Get role from response
             if response.data and len(response.data) > 0:
                 role = response.data[0]['role']
-                logger.info(f"Retrieved role for user {self.current_user.id}: {role}")
+                self._role_cache[self.current_user.id] = (role, time.monotonic())
+                logger.info("Retrieved role for user %s: %s", self.current_user.id, role)
                 return role
             
-            logger.warning(f"No role found for user {self.current_user.id}")
+            logger.warning("No role found for user %s", self.current_user.id)
             return None
         except Exception as e:
-            logger.error(f"Error getting user role: {e}")
+            self._record_error('get_user_role', e)
+            logger.error("Error getting user role: %s", e)
             return None
     
+    @OPERATION_DURATION.timed(operation='upgrade_to_pro')
     def upgrade_to_pro(self):
         """
         Upgrade user role to PRO
@@ -560,16 +840,12 @@ class SupabaseService(QObject):
                 if user_email and user_email in self.demo_users:
                     self.demo_users[user_email]["role"] = "PRO"
                     
-                    # Emit auth state changed signal with updated role
-                    self.auth_state_changed.emit({
-                        'user': self.current_user,
-                        'session': self.current_session,
-                        'role': "PRO"
-                    })
-                    logger.info(f"Upgraded demo user {user_email} to PRO.")
+                    # Announce the updated role
+                    self._deliver(self._set_auth_state, self.current_user, self.current_session, False, "PRO")
+                    logger.info("Upgraded demo user %s to PRO.", user_email)
                     
                     return True
-                logger.warning(f"Could not upgrade non-existent demo user: {user_email}")
+                logger.warning("Could not upgrade non-existent demo user: %s", user_email)
                 return False
             
             # Real Supabase implementation
@@ -578,8 +854,13 @@ class SupabaseService(QObject):
                 .eq('id', self.current_user.id)\
                 .execute()
             
-            logger.info(f"Upgraded user {self.current_user.id} to PRO.")
+            self._role_cache[self.current_user.id] = ("PRO", time.monotonic())
+            
+            # Announce the updated role
+            self._deliver(self._set_auth_state, self.current_user, self.current_session, False, "PRO")
+            logger.info("Upgraded user %s to PRO.", self.current_user.id)
             return True
         except Exception as e:
-            logger.error(f"Error upgrading to PRO: {e}")
+            self._record_error('upgrade_to_pro', e)
+            logger.error("Error upgrading to PRO: %s", e)
             return False
\ No newline at end of file
@@ -0,0 +1,344 @@
+"""
+Token broker: the signed-in user's credentials for other local CS2 tools.
+
+With the token_broker setting on, the app serves the current access token,
+user id and role from memory on a local socket (a Unix domain socket, or a
+named pipe on Windows) reachable only by the same user. The session is
+refreshed by SupabaseService alone, so tools never refresh tokens
+themselves and never race the app over single-use refresh tokens.
+
+Clients prove they may ask by sending the shared secret from broker.json
+in user_config_dir(), written readable by the user only while the broker
+runs. Tools use BrokerClient:
+
+    client = BrokerClient()
+    credentials = client.credentials()   # None when signed out
+
+Protocol, one JSON or keyword line per request and reply:
+
+    -> {"secret": "<secret from broker.json>"}
+    <- {"ok": true}
+    -> credentials
+    <- {"ok": true, "user_id": "...", "access_token": "...", "expires_at": 1700000000, "role": "PRO"}
+    <- {"ok": false, "error": "signed_out"}
+"""
+import hmac
+import json
+import os
+import secrets
+import time
+from PyQt6.QtCore import QObject
+from PyQt6.QtNetwork import QLocalServer, QLocalSocket
+
+from app.services.supabase_service import session_field
+from app.utils import metrics
+from app.utils.settings import settings, user_config_dir
+from app.utils.single_instance import server_name
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+BROKER_REQUESTS = metrics.counter('broker_requests_total', 'Requests to the token broker', ('result',))
+
+# Longest request line accepted
+MAX_LINE_BYTES = 4096
+
+SIGNED_OUT = json.dumps({'ok': False, 'error': 'signed_out'}).encode() + b'\n'
+EXPIRED = json.dumps({'ok': False, 'error': 'expired'}).encode() + b'\n'
+UNAUTHORIZED = json.dumps({'ok': False, 'error': 'unauthorized'}).encode() + b'\n'
+BAD_REQUEST = json.dumps({'ok': False, 'error': 'bad_request'}).encode() + b'\n'
+AUTHORIZED = json.dumps({'ok': True}).encode() + b'\n'
+
+class BrokerError(Exception):
+    """
+    The broker could not be reached, or refused the request
+    """
+
+def broker_name():
+    return server_name() + '-broker'
+
+def broker_file():
+    """
+    Where a running broker publishes its socket and secret
+    """
+    return os.path.join(user_config_dir(), 'broker.json')
+
+def user_field(user, name):
+    if isinstance(user, dict):
+        return user.get(name)
+    return getattr(user, name, None)
+
+class TokenBroker(QObject):
+    """
+    Serves the credentials of service's signed-in user. Replies are
+    encoded when the session or role changes, so a request is answered
+    with a comparison and a write.
+    """
+    def __init__(self, service, parent=None):
+        super().__init__(parent)
+        self.service = service
+        self.server = None
+        self.secret = None
+        self._clients = {}
+        self._reply = SIGNED_OUT
+        self._user_id = None
+        self._access_token = None
+        self._expires_at = None
+        self._role = None
+        self._role_operation = None
+        self._role_user_id = None
+
+        service.auth_state_changed.connect(self.on_auth_state_changed)
+        service.session_refreshed.connect(self.on_session_refreshed)
+        # A remembered session was restored before the broker existed
+        self._set_session(service.current_user, service.current_session)
+        self._fetch_role()
+
+    def start(self):
+        """
+        Listen and publish broker.json; False when the socket is taken
+        """
+        self.server = QLocalServer(self)
+        self.server.setSocketOptions(QLocalServer.SocketOption.UserAccessOption)
+        self.server.newConnection.connect(self._on_new_connection)
+        if not self._listen():
+            logger.warning("Token broker could not listen on %s: %s", broker_name(), self.server.errorString())
+            self.server = None
+            return False
+
+        self.secret = secrets.token_urlsafe(32)
+        self._publish({'server': self.server.fullServerName(), 'secret': self.secret, 'pid': os.getpid()})
+        logger.info("Token broker listening on %s", self.server.fullServerName())
+        return True
+
+    def stop(self):
+        if self.server is None:
+            return
+        self.server.close()
+        self.server = None
+        for socket in list(self._clients):
+            socket.abort()
+        self._clients.clear()
+        try:
+            os.remove(broker_file())
+        except OSError:
+            pass
+
+    def on_auth_state_changed(self, state):
+        user = state.get('user')
+        if user_field(user, 'id') != self._user_id:
+            self._role = None
+        if 'role' in state:
+            self._role = state['role']
+        self._set_session(user, state.get('session'))
+        self._fetch_role()
+
+    def on_session_refreshed(self, state):
+        self._set_session(state.get('user'), state.get('session'))
+
+    def _fetch_role(self):
+        """
+        The role comes with demo and upgrade sign-ins only; otherwise ask
+        once, the service caches it
+        """
+        if self._user_id is None or self._role is not None or self._role_operation is not None:
+            return
+        self._role_user_id = self._user_id
+        self._role_operation = self.service.start('get_user_role')
+        self._role_operation.finished.connect(self._on_role)
+        self._role_operation.aborted.connect(self._on_role_aborted)
+
+    def _on_role(self, role):
+        self._role_operation = None
+        if self._role_user_id != self._user_id:
+            # Another user signed in meanwhile
+            self._fetch_role()
+            return
+        if role is not None:
+            self._role = role
+            self._encode()
+
+    def _on_role_aborted(self, state):
+        self._role_operation = None
+        logger.warning("Token broker could not get the user role: %s", state)
+
+    def _set_session(self, user, session):
+        self._user_id = user_field(user, 'id')
+        self._access_token = session_field(session, 'access_token')
+        self._expires_at = session_field(session, 'expires_at')
+        self._encode()
+
+    def _encode(self):
+        if self._user_id is None or not self._access_token:
+            self._reply = SIGNED_OUT
+            return
+        self._reply = json.dumps({
+            'ok': True,
+            'user_id': str(self._user_id),
+            'access_token': self._access_token,
+            'expires_at': self._expires_at,
+            'role': self._role,
+        }).encode() + b'\n'
+
+    def _listen(self):
+        if self.server.listen(broker_name()):
+            return True
+        # A socket left behind by an app that crashed refuses connections
+        probe = QLocalSocket()
+        probe.connectToServer(broker_name())
+        if probe.waitForConnected(200):
+            probe.abort()
+            return False
+        QLocalServer.removeServer(broker_name())
+        return self.server.listen(broker_name())
+
+    def _publish(self, info):
+        path = broker_file()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temporary = path + '.tmp'
+        try:
+            os.remove(temporary)
+        except OSError:
+            pass
+        # Created readable by the user only, before the secret is in it
+        with os.fdopen(os.open(temporary, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600), 'w') as info_file:
+            json.dump(info, info_file)
+        os.replace(temporary, path)
+
+    def _on_new_connection(self):
+        while self.server.hasPendingConnections():
+            socket = self.server.nextPendingConnection()
+            self._clients[socket] = False
+            socket.readyRead.connect(self._on_ready_read)
+            socket.disconnected.connect(self._on_disconnected)
+
+    def _on_disconnected(self):
+        socket = self.sender()
+        self._clients.pop(socket, None)
+        socket.deleteLater()
+
+    def _on_ready_read(self):
+        socket = self.sender()
+        while socket.canReadLine():
+            line = socket.readLine(MAX_LINE_BYTES).strip()
+
+            if not self._clients.get(socket):
+                self._authorize(socket, line)
+                if not self._clients.get(socket):
+                    return
+            elif line == b'credentials':
+                socket.write(self._credentials())
+            else:
+                BROKER_REQUESTS.inc(result='bad_request')
+                socket.write(BAD_REQUEST)
+                socket.disconnectFromServer()
+                return
+
+        if socket.bytesAvailable() > MAX_LINE_BYTES:
+            socket.abort()
+
+    def _authorize(self, socket, line):
+        try:
+            secret = json.loads(line)['secret']
+        except (ValueError, KeyError, TypeError):
+            secret = None
+        if not isinstance(secret, str) or not hmac.compare_digest(secret, self.secret):
+            BROKER_REQUESTS.inc(result='unauthorized')
+            logger.warning("Token broker refused a client without the secret")
+            socket.write(UNAUTHORIZED)
+            socket.disconnectFromServer()
+            return
+        self._clients[socket] = True
+        socket.write(AUTHORIZED)
+
+    def _credentials(self):
+        if self._reply is SIGNED_OUT:
+            BROKER_REQUESTS.inc(result='signed_out')
+            return SIGNED_OUT
+        if self._expires_at and self._expires_at <= time.time():
+            # The refresh has been failing; the token would be refused anyway
+            BROKER_REQUESTS.inc(result='expired')
+            return EXPIRED
+        BROKER_REQUESTS.inc(result='served')
+        return self._reply
+
+class BrokerClient:
+    """
+    Connection of another tool to the broker of the running app. Keep it
+    open: after the first call, credentials() is one local round trip.
+    Blocking, and needs no QCoreApplication.
+    """
+    def __init__(self, timeout_ms=1000):
+        self.timeout_ms = timeout_ms
+        self._socket = None
+
+    def credentials(self):
+        """
+        user_id, access_token, expires_at and role of the signed-in user,
+        None when nobody is signed in. Raises BrokerError when no app
+        serves credentials.
+        """
+        reply = self._request(self._connect(), b'credentials\n')
+        if reply.get('ok'):
+            return {name: reply.get(name) for name in ('user_id', 'access_token', 'expires_at', 'role')}
+        if reply.get('error') in ('signed_out', 'expired'):
+            return None
+        raise BrokerError(f"The token broker refused the request: {reply.get('error')}")
+
+    def close(self):
+        if self._socket is not None:
+            self._socket.abort()
+            self._socket = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _connect(self):
+        if self._socket is not None and self._socket.state() == QLocalSocket.LocalSocketState.ConnectedState:
+            return self._socket
+        self.close()
+
+        try:
+            with open(broker_file()) as info_file:
+                info = json.load(info_file)
+        except (OSError, ValueError) as e:
+            raise BrokerError("No running app serves credentials") from e
+
+        socket = QLocalSocket()
+        socket.connectToServer(info['server'])
+        if not socket.waitForConnected(self.timeout_ms):
+            raise BrokerError(f"Could not connect to the token broker: {socket.errorString()}")
+        self._socket = socket
+        if not self._request(socket, json.dumps({'secret': info['secret']}).encode() + b'\n').get('ok'):
+            self.close()
+            raise BrokerError("The token broker refused the secret")
+        return socket
+
+    def _request(self, socket, line):
+        socket.write(line)
+        socket.flush()
+        while not socket.canReadLine():
+            if not socket.waitForReadyRead(self.timeout_ms):
+                self.close()
+                raise BrokerError("The token broker did not answer")
+        try:
+            return json.loads(socket.readLine(MAX_LINE_BYTES))
+        except ValueError as e:
+            self.close()
+            raise BrokerError("Malformed reply from the token broker") from e
+
+def token_broker_from_settings(service, parent=None):
+    """
+    A started TokenBroker for service when the token_broker setting is on,
+    otherwise None
+    """
+    if not settings().get('token_broker'):
+        return None
+    broker = TokenBroker(service, parent)
+    if not broker.start():
+        return None
+    return broker
@@ -0,0 +1,142 @@
+import time
+from collections import OrderedDict
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+from app.utils import metrics
+from app.utils.settings import settings
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+USERNAME_CHECKS = metrics.counter('username_availability_checks_total',
+                                  'Username availability checks by outcome', ('result',))
+USERNAME_CHECK_DURATION = metrics.histogram('username_availability_check_seconds',
+                                            'Latency of username availability queries')
+
+class _CheckJob(QRunnable):
+    """
+    Run one availability query on the checker's thread pool
+    """
+    def __init__(self, checker, generation, username):
+        super().__init__()
+        self.checker = checker
+        self.generation = generation
+        self.username = username
+        self.service = checker.supabase_service
+        # The checker keeps the job alive until it reports back
+        self.setAutoDelete(False)
+
+    def run(self):
+        started = time.perf_counter()
+        available = self.service.is_username_available(self.username)
+        USERNAME_CHECK_DURATION.observe(time.perf_counter() - started)
+        try:
+            # Queued to the GUI thread, where the checker lives
+            self.checker._finished.emit(self.generation, self.username, available)
+        except RuntimeError:
+            # The checker was deleted while the query ran
+            pass
+
+class UsernameChecker(QObject):
+    """
+    Asynchronous username availability checks for the registration form.
+
+    Queries run on a small thread pool, recent answers are kept in an LRU
+    cache, and each check supersedes the previous one: a query still in the
+    queue is dropped, and the answer of one already running is cached but
+    not reported.
+    """
+    # username, True/False, or None when the answer is unknown
+    checked = pyqtSignal(str, object)
+    _finished = pyqtSignal(int, str, object)
+
+    def __init__(self, supabase_service, cache_size=None, parent=None):
+        super().__init__(parent)
+        self.supabase_service = supabase_service
+        self.cache_size = settings().get('username_cache_size') if cache_size is None else cache_size
+        self._cache = OrderedDict()
+        self._generation = 0
+        self._pending = None
+        self._jobs = {}
+
+        self._thread_pool = QThreadPool(self)
+        self._thread_pool.setMaxThreadCount(settings().get('username_check_threads'))
+        self._finished.connect(self._on_finished)
+        settings().changed.connect(self.apply_settings)
+
+    def cached(self, username):
+        """
+        The cached answer for username, or None
+        """
+        available = self._cache.get(username)
+        if available is not None:
+            self._cache.move_to_end(username)
+        return available
+
+    def check(self, username):
+        """
+        Check username, superseding any earlier check. A cached answer is
+        reported right away; returns True when a query was started.
+        """
+        self.cancel()
+
+        available = self.cached(username)
+        if available is not None:
+            USERNAME_CHECKS.inc(result='cache_hit')
+            self.checked.emit(username, available)
+            return False
+
+        self._generation += 1
+        self._pending = _CheckJob(self, self._generation, username)
+        self._jobs[self._generation] = self._pending
+        self._thread_pool.start(self._pending)
+        return True
+
+    def cancel(self):
+        """
+        Supersede the current check, if any
+        """
+        if self._pending is None:
+            return
+        if self._thread_pool.tryTake(self._pending):
+            del self._jobs[self._pending.generation]
+            logger.debug("Dropped queued username check for %s", self._pending.username)
+        USERNAME_CHECKS.inc(result='superseded')
+        self._generation += 1
+        self._pending = None
+
+    def remember(self, username, available):
+        """
+        Record an answer learned elsewhere, e.g. a taken name from sign-up
+        """
+        self._cache[username] = available
+        self._cache.move_to_end(username)
+        self._trim()
+
+    def apply_settings(self, names):
+        """
+        Follow changes to the pool and cache sizes
+        """
+        if 'username_check_threads' in names:
+            self._thread_pool.setMaxThreadCount(settings().get('username_check_threads'))
+        if 'username_cache_size' in names:
+            self.cache_size = settings().get('username_cache_size')
+            self._trim()
+
+    def _trim(self):
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def _on_finished(self, generation, username, available):
+        self._jobs.pop(generation, None)
+
+        # Superseded or not, a definite answer is worth keeping
+        if available is not None:
+            self.remember(username, available)
+
+        if generation != self._generation:
+            return
+        USERNAME_CHECKS.inc(result='taken' if available is False else 'available' if available else 'unknown')
+        self._pending = None
+        self.checked.emit(username, available)
@@ -0,0 +1,240 @@
+import time
+from PyQt6.QtCore import Qt, QObject, QTimer, QEasingCurve, QSize, QPoint, QPointF
+from PyQt6.QtGui import QColor
+
+from app.utils.settings import settings
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Duration factor and frame rate cap of each level of the animations setting
+ANIMATION_LEVELS = {
+    'full': (1.0, None),
+    'reduced': (0.5, 30),
+    'off': (0.0, None),
+}
+
+def interpolate(start, end, progress):
+    """
+    Value between start and end for progress in [0, 1]
+    """
+    if isinstance(start, QColor):
+        return QColor(
+            round(start.red() + (end.red() - start.red()) * progress),
+            round(start.green() + (end.green() - start.green()) * progress),
+            round(start.blue() + (end.blue() - start.blue()) * progress),
+            round(start.alpha() + (end.alpha() - start.alpha()) * progress),
+        )
+    if isinstance(start, QSize):
+        return QSize(round(start.width() + (end.width() - start.width()) * progress),
+                     round(start.height() + (end.height() - start.height()) * progress))
+    if isinstance(start, QPoint):
+        return QPoint(round(start.x() + (end.x() - start.x()) * progress),
+                      round(start.y() + (end.y() - start.y()) * progress))
+    if isinstance(start, QPointF):
+        return QPointF(start.x() + (end.x() - start.x()) * progress,
+                       start.y() + (end.y() - start.y()) * progress)
+    return start + (end - start) * progress
+
+class Tween:
+    """
+    One running animation of a value; instances are pooled and reused
+    """
+    __slots__ = ('key', 'setter', 'start', 'end', 'duration', 'curve', 'started_at', 'on_finished')
+
+    def reset(self, key, setter, start, end, duration, curve, started_at, on_finished):
+        self.key = key
+        self.setter = setter
+        self.start = start
+        self.end = end
+        self.duration = duration
+        self.curve = curve
+        self.started_at = started_at
+        self.on_finished = on_finished
+
+    def release(self):
+        self.key = None
+        self.setter = None
+        self.start = None
+        self.end = None
+        self.curve = None
+        self.on_finished = None
+
+class AnimationManager(QObject):
+    """
+    Drives every UI animation from one shared frame timer.
+
+    Animations are keyed by (owner, name): starting one that is already
+    running retargets it instead of stacking a second one, and finished
+    tweens are returned to a pool. Progress is taken from the elapsed time,
+    so when a tick runs late the missed frames are dropped rather than
+    slowing the animation down. The timer only runs while something animates.
+    """
+    def __init__(self, fps=60, parent=None):
+        super().__init__(parent)
+        self.frame_interval = 1.0 / fps
+        # Applied to every duration; 0 jumps to the end on the next frame
+        self.duration_scale = 1.0
+        self._active = {}
+        self._pool = []
+        self._curves = {}
+
+        self._timer = QTimer(self)
+        self._timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self._timer.setInterval(max(1, round(self.frame_interval * 1000)))
+        self._timer.timeout.connect(self._tick)
+        self._last_tick = None
+
+        # Statistics
+        self.started = 0
+        self.retargeted = 0
+        self.finished = 0
+        self.ticks = 0
+        self.dropped_frames = 0
+        self.tick_time = 0.0
+        self.max_tick_time = 0.0
+        self.last_tick_time = 0.0
+
+    def _curve(self, easing):
+        curve = self._curves.get(easing)
+        if curve is None:
+            curve = QEasingCurve(easing)
+            self._curves[easing] = curve
+        return curve
+
+    def animate(self, owner, name, setter, start, end, duration,
+                easing=QEasingCurve.Type.OutCubic, on_finished=None):
+        """
+        Animate a value from start to end over duration (ms), calling setter
+        on every frame. Replaces a running animation with the same owner and name.
+        """
+        key = (id(owner), name)
+        now = time.perf_counter()
+
+        tween = self._active.get(key)
+        if tween is not None:
+            self.retargeted += 1
+        else:
+            tween = self._pool.pop() if self._pool else Tween()
+            self._active[key] = tween
+            self.started += 1
+
+        tween.reset(key, setter, start, end, duration * self.duration_scale / 1000.0, self._curve(easing), now,
+                    on_finished)
+
+        if not self._timer.isActive():
+            self._last_tick = now
+            self._timer.start()
+        return tween
+
+    def stop(self, owner, name):
+        """
+        Stop an animation where it is, without calling on_finished
+        """
+        tween = self._active.pop((id(owner), name), None)
+        if tween is not None:
+            self._recycle(tween)
+
+    def is_running(self, owner, name):
+        return (id(owner), name) in self._active
+
+    def target(self, owner, name):
+        """
+        End value of a running animation, or None
+        """
+        tween = self._active.get((id(owner), name))
+        return tween.end if tween is not None else None
+
+    def set_frame_rate(self, fps):
+        self.frame_interval = 1.0 / fps
+        self._timer.setInterval(max(1, round(self.frame_interval * 1000)))
+
+    def apply_settings(self, names=None):
+        """
+        Take the frame rate and duration factor from the animation_fps and
+        animations settings
+        """
+        if names is not None and not {'animations', 'animation_fps'} & names:
+            return
+        scale, max_fps = ANIMATION_LEVELS[settings().get('animations')]
+        fps = settings().get('animation_fps')
+        self.set_frame_rate(min(fps, max_fps) if max_fps else fps)
+        self.duration_scale = scale
+
+    @property
+    def active_count(self):
+        return len(self._active)
+
+    def _recycle(self, tween):
+        tween.release()
+        self._pool.append(tween)
+        if not self._active:
+            self._timer.stop()
+
+    def _tick(self):
+        started = time.perf_counter()
+        if self._last_tick is not None:
+            late = started - self._last_tick
+            if late > 1.5 * self.frame_interval:
+                self.dropped_frames += int(late / self.frame_interval) - 1
+        self._last_tick = started
+
+        completed = []
+        for key, tween in list(self._active.items()):
+            elapsed = started - tween.started_at
+            progress = 1.0 if tween.duration <= 0 else min(1.0, elapsed / tween.duration)
+            try:
+                tween.setter(interpolate(tween.start, tween.end, tween.curve.valueForProgress(progress)))
+            except RuntimeError:
+                # The owner's C++ object is gone
+                progress = 1.0
+                tween.on_finished = None
+            if progress >= 1.0:
+                completed.append((key, tween))
+
+        for key, tween in completed:
+            if self._active.get(key) is not tween:
+                continue
+            del self._active[key]
+            on_finished = tween.on_finished
+            self._recycle(tween)
+            self.finished += 1
+            if on_finished is not None:
+                on_finished()
+
+        cost = time.perf_counter() - started
+        self.ticks += 1
+        self.tick_time += cost
+        self.last_tick_time = cost
+        self.max_tick_time = max(self.max_tick_time, cost)
+
+    def stats(self):
+        """
+        Active animations and per-tick cost
+        """
+        return {
+            'active': len(self._active),
+            'pooled': len(self._pool),
+            'started': self.started,
+            'retargeted': self.retargeted,
+            'finished': self.finished,
+            'ticks': self.ticks,
+            'dropped_frames': self.dropped_frames,
+            'mean_tick_ms': self.tick_time / self.ticks * 1000 if self.ticks else 0.0,
+            'max_tick_ms': self.max_tick_time * 1000,
+            'last_tick_ms': self.last_tick_time * 1000,
+        }
+
+_manager = None
+
+def animation_manager():
+    """
+    Get the application-wide animation manager
+    """
+    global _manager
+    if _manager is None:
+        _manager = AnimationManager()
+        _manager.apply_settings()
+        settings().changed.connect(_manager.apply_settings)
+    return _manager
@@ -0,0 +1,79 @@
+import math
+import time
+from PyQt6.QtCore import QObject, QTimer
+
+from app.utils import metrics
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+QUEUED_ATTEMPTS = metrics.counter('ui_queued_auth_attempts_total',
+                                  'Rate limited auth attempts queued behind a cooldown, by outcome',
+                                  ('operation', 'outcome'))
+
+class Cooldown(QObject):
+    """
+    Queue a rate limited action behind a countdown on its button.
+
+    While the cooldown runs the button is disabled and counts down; when it
+    ends the button comes back and the queued action runs once. Throttled
+    again in the meantime, only the latest action is kept.
+    """
+    def __init__(self, button, operation, parent=None):
+        super().__init__(parent)
+        self.button = button
+        self.operation = operation
+        self._action = None
+        self._deadline = 0.0
+
+        self._timer = QTimer(self)
+        self._timer.setInterval(250)
+        self._timer.timeout.connect(self._update)
+
+    @property
+    def active(self):
+        return self._action is not None
+
+    def start(self, seconds, action):
+        """
+        Run action after seconds, counting down on the button until then
+        """
+        if self._action is None:
+            QUEUED_ATTEMPTS.inc(operation=self.operation, outcome='queued')
+            logger.info("Queued %s for %.1f s", self.operation, seconds)
+        self._action = action
+        self._deadline = max(self._deadline, time.monotonic() + seconds)
+
+        self.button.stop_loading()
+        self.button.setEnabled(False)
+        self._update()
+        self._timer.start()
+
+    def cancel(self):
+        """
+        Drop the queued action and give the button back
+        """
+        if self._action is None:
+            return
+        QUEUED_ATTEMPTS.inc(operation=self.operation, outcome='cancelled')
+        self._action = None
+        self._restore()
+
+    def _restore(self):
+        self._timer.stop()
+        self._deadline = 0.0
+        self.button.setEnabled(True)
+        self.button.setText(self.button.original_text)
+
+    def _update(self):
+        remaining = self._deadline - time.monotonic()
+        if remaining > 0:
+            self.button.setText(f"Retrying in {math.ceil(remaining)}s")
+            return
+
+        action, self._action = self._action, None
+        self._restore()
+        if action is not None:
+            QUEUED_ATTEMPTS.inc(operation=self.operation, outcome='retried')
+            action()
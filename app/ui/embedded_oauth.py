@@ -0,0 +1,172 @@
+"""
+Embedded OAuth sign-in, loaded on demand.
+
+Qt WebEngine is only imported and its view only built the first time it is
+needed: on the first OAuth sign-in, or earlier through prewarm_when_idle(),
+once the login screen has been left alone for a while. The view and its
+persistent profile are then kept and reused for every later attempt.
+
+The provider's redirect back to EMBEDDED_REDIRECT_URI is intercepted as a
+navigation and never loaded, so nothing has to listen on that port.
+Supabase has to allow it, which http://127.0.0.1:*/** in the project's
+Redirect URLs already does.
+"""
+import importlib.util
+import time
+from PyQt6.QtCore import QEvent, QObject, QTimer, pyqtSignal
+from PyQt6.QtWidgets import QApplication
+
+from app.ui.animation import animation_manager
+from app.utils import metrics
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+EMBEDDED_REDIRECT_URI = 'http://127.0.0.1:54213/oauth/embedded'
+
+VIEW_BUILD = metrics.histogram('ui_oauth_view_build_seconds',
+                               'Time to load WebEngine and build the embedded OAuth view', ('trigger',))
+
+INPUT_EVENTS = {
+    QEvent.Type.KeyPress,
+    QEvent.Type.MouseButtonPress,
+    QEvent.Type.MouseMove,
+    QEvent.Type.Wheel,
+}
+
+_installed = None
+
+def webengine_installed():
+    """
+    Whether PyQt6-WebEngine is installed, without importing it
+    """
+    global _installed
+    if _installed is None:
+        _installed = importlib.util.find_spec('PyQt6.QtWebEngineWidgets') is not None
+    return _installed
+
+class EmbeddedOAuth(QObject):
+    """
+    Owner of the lazily built OAuth web view of one screen.
+
+    available tells whether the embedded view can be used; when it cannot
+    (disabled, WebEngine missing or failing to load) the caller falls back
+    to the system browser.
+    """
+    redirected = pyqtSignal(str)
+    dismissed = pyqtSignal()
+
+    def __init__(self, widget, enabled=True, idle_ms=2000):
+        super().__init__(widget)
+        self.widget = widget
+        self.enabled = enabled
+        self.view = None
+        self._view_class = None
+        self._failed = False
+        self._watching = False
+
+        self._idle_timer = QTimer(self)
+        self._idle_timer.setSingleShot(True)
+        self._idle_timer.setInterval(idle_ms)
+        self._idle_timer.timeout.connect(self._on_idle)
+
+    @property
+    def available(self):
+        return self.enabled and not self._failed and webengine_installed()
+
+    def prewarm_when_idle(self):
+        """
+        Build the view once the widget is showing and has gone idle_ms
+        without input or running animations
+        """
+        if self.view is not None or self._watching or not self.available:
+            return
+        self._watching = True
+        QApplication.instance().installEventFilter(self)
+        self._idle_timer.start()
+
+    def set_idle_interval(self, idle_ms):
+        """
+        How long the widget has to go without input before prewarming
+        """
+        self._idle_timer.setInterval(idle_ms)
+
+    def stop_prewarm(self):
+        if not self._watching:
+            return
+        self._watching = False
+        self._idle_timer.stop()
+        QApplication.instance().removeEventFilter(self)
+
+    def eventFilter(self, watched, event):
+        if event.type() in INPUT_EVENTS:
+            self._idle_timer.start()
+        return False
+
+    def open(self, url):
+        """
+        Show the sign-in view on url; False when it cannot be used
+        """
+        view = self._ensure_view('demand')
+        if view is None:
+            return False
+        view.sign_in(url)
+        return True
+
+    def close(self):
+        """
+        Hide the view of an attempt that is no longer wanted
+        """
+        if self.view is not None:
+            self.view.abandon()
+
+    def _on_idle(self):
+        if not self.widget.isVisible() or animation_manager().active_count:
+            self._idle_timer.start()
+            return
+        self.stop_prewarm()
+
+        # Import now and build on the next turn of the event loop, so
+        # input that arrived meanwhile is handled in between
+        if self._load() is not None:
+            QTimer.singleShot(0, self._build_prewarmed)
+
+    def _build_prewarmed(self):
+        self._ensure_view('prewarm')
+
+    def _load(self):
+        """
+        Import the WebEngine view module; None when it cannot be loaded
+        """
+        if self._view_class is None and not self._failed:
+            started = time.perf_counter()
+            try:
+                from app.ui.widgets.oauth_web_view import OAuthWebView
+            except ImportError as e:
+                # Installed but unusable, e.g. missing system libraries
+                self._failed = True
+                logger.warning("Embedded OAuth unavailable, using the system browser: %s", e)
+                return None
+            self._view_class = OAuthWebView
+            logger.info("Loaded WebEngine in %.0f ms", (time.perf_counter() - started) * 1000)
+        return self._view_class
+
+    def _ensure_view(self, trigger):
+        if self.view is not None:
+            return self.view
+        if not self.available:
+            return None
+
+        started = time.perf_counter()
+        view_class = self._load()
+        if view_class is None:
+            return None
+        self.view = view_class(EMBEDDED_REDIRECT_URI, self.widget)
+        self.view.redirected.connect(self.redirected)
+        self.view.dismissed.connect(self.dismissed)
+
+        elapsed = time.perf_counter() - started
+        VIEW_BUILD.observe(elapsed, trigger=trigger)
+        logger.info("Built the embedded OAuth view in %.0f ms (%s)", elapsed * 1000, trigger)
+        return self.view
@@ -0,0 +1,189 @@
+import threading
+from PyQt6.QtCore import Qt, QSize, QFile, QRunnable, QThreadPool, QRectF
+from PyQt6.QtGui import QGuiApplication, QIcon, QImage, QPainter, QPixmap, QPixmapCache
+from PyQt6.QtSvg import QSvgRenderer
+
+from app.utils import metrics
+from app.utils.settings import settings
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+IMAGE_CACHE = metrics.counter('image_cache_lookups_total', 'ImageRegistry pixmap lookups by cache result', ('result',))
+
+class _RasterJob(QRunnable):
+    """
+    Rasterize one image off the GUI thread. QImage and QSvgRenderer are safe
+    to use from worker threads; the QPixmap is created on the GUI thread.
+    """
+    def __init__(self, path, size, device_pixel_ratio):
+        super().__init__()
+        self.path = path
+        self.size = size
+        self.device_pixel_ratio = device_pixel_ratio
+        self.image = None
+        self.done = threading.Event()
+
+    def run(self):
+        try:
+            self.image = rasterize(self.path, self.size, self.device_pixel_ratio)
+        finally:
+            self.done.set()
+
+def rasterize(path, size, device_pixel_ratio):
+    """
+    Render an SVG or scale a raster image to size (in device-independent pixels)
+    """
+    target = QSize(round(size.width() * device_pixel_ratio), round(size.height() * device_pixel_ratio))
+
+    if path.lower().endswith('.svg'):
+        renderer = QSvgRenderer(path)
+        if not renderer.isValid():
+            return QImage()
+        renderer.setAspectRatioMode(Qt.AspectRatioMode.KeepAspectRatio)
+
+        image = QImage(target, QImage.Format.Format_ARGB32_Premultiplied)
+        image.fill(Qt.GlobalColor.transparent)
+        painter = QPainter(image)
+        renderer.render(painter, QRectF(0, 0, target.width(), target.height()))
+        painter.end()
+    else:
+        image = QImage(path)
+        if image.isNull():
+            return image
+        image = image.scaled(target, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
+
+    image.setDevicePixelRatio(device_pixel_ratio)
+    return image
+
+class ImageRegistry:
+    """
+    App-wide pixmap registry on top of QPixmapCache.
+
+    Every image is rasterized once per path, logical size and device pixel
+    ratio; widgets asking for the same image share the cached pixmap.
+    """
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.rasterized = 0
+        self._pending = {}
+        self._icons = {}
+        self._sizes = {}
+        self._lock = threading.Lock()
+        self._thread_pool = QThreadPool.globalInstance()
+
+    @staticmethod
+    def _default_ratio():
+        app = QGuiApplication.instance()
+        return app.devicePixelRatio() if app else 1.0
+
+    @staticmethod
+    def _key(path, size, device_pixel_ratio):
+        return f"img:{path}@{size.width()}x{size.height()}@{device_pixel_ratio:g}"
+
+    def pixmap(self, path, size, device_pixel_ratio=None):
+        """
+        Get the shared pixmap for path at size; a null pixmap if it cannot be loaded
+        """
+        ratio = device_pixel_ratio or self._default_ratio()
+        key = self._key(path, size, ratio)
+
+        pixmap = QPixmapCache.find(key)
+        if pixmap is not None:
+            self.hits += 1
+            IMAGE_CACHE.inc(result='hit')
+            return pixmap
+
+        self.misses += 1
+        IMAGE_CACHE.inc(result='miss')
+        with self._lock:
+            job = self._pending.pop(key, None)
+
+        if job is not None:
+            # A background rasterization already started, wait for it instead of redoing it
+            job.done.wait()
+            image = job.image
+        else:
+            image = rasterize(path, size, ratio)
+
+        pixmap = QPixmap.fromImage(image) if image is not None else QPixmap()
+        if not pixmap.isNull():
+            self.rasterized += 1
+            QPixmapCache.insert(key, pixmap)
+            self._sizes[key] = pixmap.width() * pixmap.height() * pixmap.depth() // 8
+        return pixmap
+
+    def icon(self, path, size, device_pixel_ratio=None):
+        """
+        Get a shared QIcon backed by the cached pixmap
+        """
+        ratio = device_pixel_ratio or self._default_ratio()
+        key = self._key(path, size, ratio)
+
+        icon = self._icons.get(key)
+        if icon is None:
+            icon = QIcon(self.pixmap(path, size, ratio))
+            self._icons[key] = icon
+        else:
+            self.hits += 1
+            IMAGE_CACHE.inc(result='hit')
+        return icon
+
+    def prewarm(self, requests, device_pixel_ratio=None):
+        """
+        Rasterize (path, size) pairs on the thread pool ahead of first use
+        """
+        ratio = device_pixel_ratio or self._default_ratio()
+        for path, size in requests:
+            key = self._key(path, size, ratio)
+            if key in self._sizes or not QFile.exists(path):
+                continue
+            with self._lock:
+                if key in self._pending:
+                    continue
+                job = _RasterJob(path, size, ratio)
+                job.setAutoDelete(False)
+                self._pending[key] = job
+            self._thread_pool.start(job)
+
+    def stats(self):
+        """
+        Cache usage and hit rates
+        """
+        # Drop bookkeeping for pixmaps QPixmapCache has evicted
+        for key in list(self._sizes):
+            if QPixmapCache.find(key) is None:
+                del self._sizes[key]
+
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'rasterized': self.rasterized,
+            'entries': len(self._sizes),
+            'cache_bytes': sum(self._sizes.values()),
+            'cache_limit_bytes': QPixmapCache.cacheLimit() * 1024,
+        }
+
+_registry = None
+
+def image_registry():
+    """
+    Get the application-wide image registry
+    """
+    global _registry
+    if _registry is None:
+        _registry = ImageRegistry()
+        _apply_cache_limit()
+        settings().changed.connect(_apply_cache_limit)
+    return _registry
+
+def _apply_cache_limit(names=None):
+    """
+    Size QPixmapCache, which also holds the shadows, from image_cache_kb
+    """
+    if names is None or 'image_cache_kb' in names:
+        QPixmapCache.setCacheLimit(settings().get('image_cache_kb'))
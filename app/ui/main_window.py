@@ -1,21 +1,31 @@
-import os
 from PyQt6.QtWidgets import (QMainWindow, QStackedWidget, QWidget, QHBoxLayout, 
                              QLabel, QPushButton, QVBoxLayout, QFrame)
-from PyQt6.QtCore import Qt, QPropertyAnimation, QEasingCurve, QSize, QPoint
+from PyQt6.QtCore import Qt, QSize, QPoint, QFile
 from PyQt6.QtGui import QIcon, QFont, QMouseEvent
 
+from app.services.oauth_loopback import is_oauth_redirect
 from app.services.supabase_service import SupabaseService
+from app.utils import metrics, tracing
+from app.utils.settings import settings
+from app.ui.transition import ScreenTransition
 from app.ui.screens.login_screen import LoginScreen
 from app.ui.screens.register_screen import RegisterScreen
 from app.ui.screens.dashboard_screen import DashboardScreen
 from app.ui.screens.forgot_password_screen import ForgotPasswordScreen
 
+import logging
+
+logger = logging.getLogger(__name__)
+
+SCREEN_BUILD = metrics.histogram('app_screen_build_seconds', 'Time to construct each screen', ('screen',))
+
 class MainWindow(QMainWindow):
-    def __init__(self, config):
+    def __init__(self, config, supabase_service=None):
         super().__init__()
+        self.config = config
         
-        # Initialize services
-        self.supabase_service = SupabaseService(config)
+        # Initialize services (benchmarks pass in a stub)
+        self.supabase_service = supabase_service or SupabaseService(config)
         
         # Connect to auth state changes
         self.supabase_service.auth_state_changed.connect(self.on_auth_state_changed)
@@ -30,32 +40,18 @@ class MainWindow(QMainWindow):
         # Set window properties
         self.setWindowTitle("CS2 Tool Login")
         self.setMinimumSize(300, 600)  # Smaller size for better fit
-        self.setStyleSheet("""
-            QMainWindow {
-                background-color: transparent;
-                color: #ffffff;
-            }
-        """)
         
         # Set window flags for modern look
         self.setWindowFlags(Qt.WindowType.FramelessWindowHint)  # Remove default window frame
         
         # Set window icon if available
-        icon_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 
-                               'app', 'assets', 'icons', 'app_icon.png')
-        if os.path.exists(icon_path):
+        icon_path = ':/icons/app_icon.png'
+        if QFile.exists(icon_path):
             self.setWindowIcon(QIcon(icon_path))
         
         # Create main container widget with rounded corners
         self.container = QFrame()
         self.container.setObjectName("mainContainer")
-        self.container.setStyleSheet("""
-            #mainContainer {
-                background-color: #121212;
-                border-radius: 15px;
-                border: none;
-            }
-        """)
         self.container_layout = QVBoxLayout(self.container)
         self.container_layout.setContentsMargins(0, 0, 0, 0)
         self.container_layout.setSpacing(0)
@@ -69,10 +65,14 @@ class MainWindow(QMainWindow):
         self.container_layout.addWidget(self.stacked_widget)
         
         # Create screens
-        self.login_screen = LoginScreen(self.supabase_service)
-        self.register_screen = RegisterScreen(self.supabase_service)
-        self.dashboard_screen = DashboardScreen(self.supabase_service)
-        self.forgot_password_screen = ForgotPasswordScreen(self.supabase_service)
+        with SCREEN_BUILD.time(screen='login'):
+            self.login_screen = LoginScreen(self.supabase_service, self.config.get('oauth_embedded', True))
+        with SCREEN_BUILD.time(screen='register'):
+            self.register_screen = RegisterScreen(self.supabase_service)
+        with SCREEN_BUILD.time(screen='dashboard'):
+            self.dashboard_screen = DashboardScreen(self.supabase_service)
+        with SCREEN_BUILD.time(screen='forgot_password'):
+            self.forgot_password_screen = ForgotPasswordScreen(self.supabase_service)
         
         # Add screens to stacked widget
         self.stacked_widget.addWidget(self.login_screen)
@@ -89,31 +89,44 @@ class MainWindow(QMainWindow):
         
         # Start with login screen
         self.stacked_widget.setCurrentIndex(0)
+        
+        # Cross-fades between screen snapshots
+        self.screen_transition = ScreenTransition(self.stacked_widget,
+                                                  self.config.get('transition_duration_ms', 250))
+        settings().changed.connect(self.apply_settings)
+    
+    def apply_settings(self, names):
+        """
+        Follow changes to the transition duration
+        """
+        if 'transition_duration_ms' in names:
+            self.screen_transition.duration = settings().get('transition_duration_ms')
+    
+    def activate(self, argv):
+        """
+        Come to the front for another launch, and complete the OAuth
+        sign-in of a callback URL on its command line
+        """
+        if self.isMinimized():
+            self.showNormal()
+        self.show()
+        self.raise_()
+        self.activateWindow()
+        
+        for arg in argv[1:]:
+            if not is_oauth_redirect(arg):
+                continue
+            if self.supabase_service.current_user is not None:
+                logger.info("Ignoring a handed over OAuth callback, already signed in")
+            else:
+                self.login_screen.on_oauth_redirected(arg)
+            break
     
     def change_screen(self, index):
         """
         Change screen with animation
         """
-        # Get current and next widget
-        current_widget = self.stacked_widget.currentWidget()
-        next_widget = self.stacked_widget.widget(index)
-        
-        if current_widget == next_widget:
-            return
-        
-        # Set next widget opacity to 0
-        next_widget.setStyleSheet("background-color: #1a1a1a; opacity: 0;")
-        
-        # Change to next widget
-        self.stacked_widget.setCurrentIndex(index)
-        
-        # Create fade-in animation
-        self.fade_in_animation = QPropertyAnimation(next_widget, b"windowOpacity")
-        self.fade_in_animation.setDuration(250)
-        self.fade_in_animation.setStartValue(0.0)
-        self.fade_in_animation.setEndValue(1.0)
-        self.fade_in_animation.setEasingCurve(QEasingCurve.Type.OutCubic)
-        self.fade_in_animation.start()
+        self.screen_transition.change(index)
     
     def create_title_bar(self):
         """
@@ -122,31 +135,7 @@ class MainWindow(QMainWindow):
         # Title bar container
         self.title_bar = QFrame()
         self.title_bar.setFixedHeight(40)
-        self.title_bar.setStyleSheet("""
-            QFrame {
-                background-color: #1e1e1e;
-                border-top-left-radius: 15px;
-                border-top-right-radius: 15px;
-                border-bottom: 1px solid #333333;
-            }
-            QPushButton {
-                background-color: transparent;
-                color: #cccccc;
-                border: none;
-                font-size: 16px;
-                padding: 5px 10px;
-            }
-            QPushButton:hover {
-                background-color: #333333;
-            }
-            QPushButton#close_button {
-                border-radius: 10px;
-            }
-            QPushButton#close_button:hover {
-                background-color: #e81123;
-                color: white;
-            }
-        """)
+        self.title_bar.setObjectName("titleBar")
         
         # Layout for title bar
         title_layout = QHBoxLayout(self.title_bar)
@@ -155,7 +144,7 @@ class MainWindow(QMainWindow):
         
         # Window title
         title_label = QLabel("CS2 Tool Login")
-        title_label.setStyleSheet("color: #ffffff; font-size: 14px; font-weight: bold;")
+        title_label.setObjectName("windowTitle")
         title_label.setAlignment(Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter)
         
         # Window controls
@@ -186,6 +175,13 @@ class MainWindow(QMainWindow):
         self.dragging = False
         self.drag_position = QPoint()
     
+    def closeEvent(self, event):
+        """
+        Abandon outstanding requests; their results have nowhere to go
+        """
+        self.supabase_service.cancel_all()
+        super().closeEvent(event)
+    
     def toggle_maximize(self):
         """
         Toggle between maximized and normal window state
@@ -220,6 +216,7 @@ class MainWindow(QMainWindow):
             self.dragging = False
             event.accept()
     
+    @tracing.traced('MainWindow.on_auth_state_changed', 'ui')
     def on_auth_state_changed(self, auth_state):
         """
         Handle authentication state changes
@@ -228,7 +225,7 @@ class MainWindow(QMainWindow):
         
         if user:
             # User is authenticated, show dashboard
-            self.dashboard_screen.update_user_info()
+            self.dashboard_screen.update_user_info(auth_state.get('role'))
             self.change_screen(2)
         else:
             # User is not authenticated, show login
@@ -1,11 +1,14 @@
-import os
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, 
                              QPushButton, QFrame, QSpacerItem, QSizePolicy)
-from PyQt6.QtCore import Qt, pyqtSignal, QSize
+from PyQt6.QtCore import Qt, pyqtSignal, QSize, QFile
 from PyQt6.QtGui import QIcon, QPixmap
 
 import logging
 from app.ui.widgets.animated_button import AnimatedButton
+from app.ui.image_registry import image_registry
+from app.ui.theme import set_state
+from app.services.operation import OperationGroup
+from app.utils import tracing
 
 logger = logging.getLogger(__name__)
 
@@ -18,6 +21,9 @@ class DashboardScreen(QWidget):
         self.supabase_service = supabase_service
         self.user_role = None
         
+        # Requests in flight, abandoned when the screen is left
+        self.operations = OperationGroup(self)
+        
         # Setup UI
         self.setup_ui()
         logger.info("DashboardScreen initialized")
@@ -31,13 +37,6 @@ class DashboardScreen(QWidget):
         # Create content frame
         content_frame = QFrame()
         content_frame.setObjectName("dashboardContentFrame")
-        content_frame.setStyleSheet("""
-            #dashboardContentFrame {
-                background-color: #1a1a1a;
-                border-radius: 15px;
-                border: 1px solid #333333;
-            }
-        """)
         
         # Content layout
         content_layout = QVBoxLayout(content_frame)
@@ -48,44 +47,22 @@ class DashboardScreen(QWidget):
         header_layout = QHBoxLayout()
         
         # Logo image if available
-        logo_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))), 
-                               'app', 'assets', 'images', 'logo.png')
-        if os.path.exists(logo_path):
+        logo_path = ':/images/logo.svg'
+        if QFile.exists(logo_path):
             logo_label = QLabel()
-            logo_pixmap = QPixmap(logo_path)
-            logo_label.setPixmap(logo_pixmap.scaled(QSize(50, 50), Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation))
+            logo_label.setPixmap(image_registry().pixmap(logo_path, QSize(50, 50)))
             header_layout.addWidget(logo_label)
         
         # Title
         title_label = QLabel("CS2 Tool Dashboard")
-        title_label.setStyleSheet("""
-            font-size: 24px;
-            font-weight: bold;
-            color: #ffffff;
-        """)
+        title_label.setObjectName("dashboardTitle")
         header_layout.addWidget(title_label)
         header_layout.addStretch()
         
         # Logout button
         self.logout_button = AnimatedButton("LOGOUT")
         self.logout_button.setFixedSize(120, 40)
-        self.logout_button.setStyleSheet("""
-            QPushButton {
-                background-color: #333333;
-                color: white;
-                border-radius: 6px;
-                font-size: 12px;
-                font-weight: bold;
-                text-transform: uppercase;
-                letter-spacing: 1px;
-            }
-            QPushButton:hover {
-                background-color: #444444;
-            }
-            QPushButton:pressed {
-                background-color: #555555;
-            }
-        """)
+        self.logout_button.setObjectName("logoutButton")
         self.logout_button.clicked.connect(self.on_logout_clicked)
         header_layout.addWidget(self.logout_button)
         
@@ -96,11 +73,7 @@ class DashboardScreen(QWidget):
         # User avatar placeholder
         avatar_frame = QFrame()
         avatar_frame.setFixedSize(80, 80)
-        avatar_frame.setStyleSheet("""
-            background-color: #252525;
-            border-radius: 40px;
-            border: 2px solid #3a86ff;
-        """)
+        avatar_frame.setObjectName("dashboardAvatar")
         user_info_layout.addWidget(avatar_frame)
         
         # User details layout
@@ -109,38 +82,19 @@ class DashboardScreen(QWidget):
         
         # Username
         self.username_label = QLabel("Username")
-        self.username_label.setStyleSheet("""
-            font-size: 18px;
-            font-weight: bold;
-            color: #ffffff;
-        """)
+        self.username_label.setObjectName("dashboardUsername")
         
         # Email
         self.email_label = QLabel("Email")
-        self.email_label.setStyleSheet("""
-            font-size: 14px;
-            color: #cccccc;
-        """)
+        self.email_label.setObjectName("dashboardEmail")
         
         # Role
         self.role_layout = QHBoxLayout()
         self.role_label = QLabel("Role:")
-        self.role_label.setStyleSheet("""
-            font-size: 14px;
-            color: #cccccc;
-        """)
+        self.role_label.setObjectName("roleLabel")
         
         self.role_value_label = QLabel("FREE")
-        self.role_value_label.setStyleSheet("""
-            font-size: 14px;
-            font-weight: bold;
-            color: #ffffff;
-            background-color: transparent;
-            border-radius: 4px;
-            padding: 3px 10px;
-            text-transform: uppercase;
-            letter-spacing: 1px;
-        """)
+        self.role_value_label.setObjectName("roleValue")
         
         self.role_layout.addWidget(self.role_label)
         self.role_layout.addWidget(self.role_value_label)
@@ -156,7 +110,7 @@ class DashboardScreen(QWidget):
         # Content divider
         divider = QFrame()
         divider.setFrameShape(QFrame.Shape.HLine)
-        divider.setStyleSheet("background-color: #333333;")
+        divider.setObjectName("dashboardDivider")
         
         # Dashboard content
         dashboard_layout = QVBoxLayout()
@@ -166,12 +120,7 @@ class DashboardScreen(QWidget):
         free_layout = QVBoxLayout(self.free_content)
         
         free_title = QLabel("FREE Plan Features")
-        free_title.setStyleSheet("""
-            font-size: 20px;
-            font-weight: bold;
-            color: #ffffff;
-            margin-bottom: 10px;
-        """)
+        free_title.setObjectName("planTitle")
         
         free_features = QLabel("""
             • Basic CS2 tool features\n
@@ -179,31 +128,11 @@ class DashboardScreen(QWidget):
             • Standard matchmaking support\n
             • Basic weapon analytics
         """)
-        free_features.setStyleSheet("""
-            font-size: 16px;
-            color: #cccccc;
-            margin-bottom: 20px;
-        """)
+        free_features.setObjectName("planFeatures")
         
         self.upgrade_button = AnimatedButton("UPGRADE TO PRO")
         self.upgrade_button.setMinimumHeight(50)
-        self.upgrade_button.setStyleSheet("""
-            QPushButton {
-                background: qlineargradient(x1:0, y1:0, x2:1, y2:0, stop:0 #ff9500, stop:1 #ff3800);
-                color: #ffffff;
-                font-weight: bold;
-                font-size: 16px;
-                border-radius: 8px;
-                text-transform: uppercase;
-                letter-spacing: 1px;
-            }
-            QPushButton:hover {
-                background: qlineargradient(x1:0, y1:0, x2:1, y2:0, stop:0 #ffaa00, stop:1 #ff4500);
-            }
-            QPushButton:pressed {
-                background: qlineargradient(x1:0, y1:0, x2:1, y2:0, stop:0 #ff8000, stop:1 #ff2000);
-            }
-        """)
+        self.upgrade_button.setObjectName("upgradeButton")
         self.upgrade_button.clicked.connect(self.on_upgrade_clicked)
         
         free_layout.addWidget(free_title)
@@ -215,12 +144,7 @@ class DashboardScreen(QWidget):
         pro_layout = QVBoxLayout(self.pro_content)
         
         pro_title = QLabel("PRO Plan Features")
-        pro_title.setStyleSheet("""
-            font-size: 20px;
-            font-weight: bold;
-            color: #ffffff;
-            margin-bottom: 10px;
-        """)
+        pro_title.setObjectName("planTitle")
         
         pro_features = QLabel("""
             • Advanced CS2 tool features\n
@@ -231,19 +155,10 @@ class DashboardScreen(QWidget):
             • Strategy builder\n
             • Priority updates
         """)
-        pro_features.setStyleSheet("""
-            font-size: 16px;
-            color: #cccccc;
-            margin-bottom: 20px;
-        """)
+        pro_features.setObjectName("planFeatures")
         
         pro_status = QLabel("You have access to all PRO features!")
-        pro_status.setStyleSheet("""
-            font-size: 16px;
-            font-weight: bold;
-            color: #00cc66;
-            margin-bottom: 10px;
-        """)
+        pro_status.setObjectName("proStatus")
         
         pro_layout.addWidget(pro_title)
         pro_layout.addWidget(pro_features)
@@ -267,65 +182,62 @@ class DashboardScreen(QWidget):
         # Set layout
         self.setLayout(main_layout)
         
-        # Set stylesheet
-        self.setStyleSheet("""
-            QWidget {
-                background-color: #121212;
-                color: #ffffff;
-                font-family: 'Segoe UI', Arial, sans-serif;
-            }
-        """)
-        
         # Hide content initially
         self.free_content.hide()
         self.pro_content.hide()
     
-    def update_user_info(self):
+    @tracing.traced('DashboardScreen.update_user_info', 'ui')
+    def update_user_info(self, role=None):
         """
-        Update user information
+        Update user information; role when it is already known
         """
         # Get current user
         user = self.supabase_service.current_user
         
         if user:
-            logger.info(f"Updating user info for: {user.email}")
-            # Update username and email
-            self.username_label.setText(user.user_metadata.get('username', 'User'))
-            self.email_label.setText(user.email)
+            # Demo mode keeps the user as a dict, Supabase returns a User object
+            if isinstance(user, dict):
+                email = user.get('email', '')
+                metadata = user.get('user_metadata') or {}
+            else:
+                email = user.email
+                metadata = user.user_metadata or {}
             
-            # Get user role
-            self.user_role = self.supabase_service.get_user_role()
+            logger.info("Updating user info for: %s", email)
+            # Update username and email
+            self.username_label.setText(metadata.get('username', 'User'))
+            self.email_label.setText(email)
             
-            # Update role display
-            logger.info(f"User role: {self.user_role}")
-            if self.user_role == 'PRO':
-                self.role_value_label.setText('PRO')
-                self.role_value_label.setStyleSheet("""
-                    font-size: 14px;
-                    font-weight: bold;
-                    color: #00cc66;
-                    background-color: transparent;
-                    border-radius: 10px;
-                    padding: 2px 10px;
-                """)
-                
-                # Show PRO content
-                self.free_content.hide()
-                self.pro_content.show()
+            # The role comes with the auth state after demo and upgrade
+            # sign-ins; otherwise it is fetched in the background
+            if role is not None:
+                self.show_role(role)
             else:
-                self.role_value_label.setText('FREE')
-                self.role_value_label.setStyleSheet("""
-                    font-size: 14px;
-                    font-weight: bold;
-                    color: #ffaa00;
-                    background-color: transparent;
-                    border-radius: 10px;
-                    padding: 2px 10px;
-                """)
-                
-                # Show FREE content
-                self.free_content.show()
-                self.pro_content.hide()
+                operation = self.operations.add(self.supabase_service.start('get_user_role'))
+                operation.finished.connect(self.show_role)
+    
+    def show_role(self, role):
+        """
+        Show the role and the content for it
+        """
+        self.user_role = role
+        
+        # Update role display
+        logger.info("User role: %s", self.user_role)
+        if self.user_role == 'PRO':
+            self.role_value_label.setText('PRO')
+            set_state(self.role_value_label, 'role', 'PRO')
+            
+            # Show PRO content
+            self.free_content.hide()
+            self.pro_content.show()
+        else:
+            self.role_value_label.setText('FREE')
+            set_state(self.role_value_label, 'role', 'FREE')
+            
+            # Show FREE content
+            self.free_content.show()
+            self.pro_content.hide()
     
     def on_logout_clicked(self):
         """
@@ -333,8 +245,10 @@ class DashboardScreen(QWidget):
         """
         logger.info("Logout button clicked")
         # Sign out with Supabase
-        success = self.supabase_service.sign_out()
-        
+        operation = self.operations.add(self.supabase_service.start('sign_out'))
+        operation.finished.connect(self.on_sign_out_finished)
+    
+    def on_sign_out_finished(self, success):
         if success:
             # Navigate to login screen
             logger.info("Logout successful, navigating to login screen")
@@ -346,9 +260,22 @@ class DashboardScreen(QWidget):
         """
         logger.info("Upgrade to PRO button clicked")
         # Upgrade to PRO
-        success = self.supabase_service.upgrade_to_pro()
-        
+        self.upgrade_button.start_loading()
+        operation = self.operations.add(self.supabase_service.start('upgrade_to_pro'))
+        operation.finished.connect(self.on_upgrade_finished)
+        operation.aborted.connect(lambda state: self.upgrade_button.stop_loading())
+    
+    def hideEvent(self, event):
+        """
+        Abandon requests when the screen is left
+        """
+        if not event.spontaneous():
+            self.operations.cancel()
+        super().hideEvent(event)
+    
+    def on_upgrade_finished(self, success):
+        self.upgrade_button.stop_loading()
         if success:
             # Update user info
             logger.info("Upgrade to PRO successful")
-            self.update_user_info()
\ No newline at end of file
+            self.update_user_info('PRO')
\ No newline at end of file
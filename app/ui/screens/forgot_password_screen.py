@@ -6,6 +6,10 @@ from PyQt6.QtGui import QPixmap
 
 from app.ui.widgets.animated_button import AnimatedButton
 from app.ui.widgets.animated_line_edit import AnimatedLineEdit
+from app.ui.theme import set_state
+from app.ui.cooldown import Cooldown
+from app.services.operation import OperationGroup
+from app.utils.settings import settings
 
 import logging
 
@@ -24,6 +28,20 @@ class ForgotPasswordScreen(QWidget):
         
         # Setup UI
         self.setup_ui()
+        
+        # One timer hides the message; showing another restarts it
+        self.message_timer = QTimer(self)
+        self.message_timer.setSingleShot(True)
+        self.message_timer.setInterval(settings().get('error_display_ms'))
+        self.message_timer.timeout.connect(lambda: self.message_label.setVisible(False))
+        settings().changed.connect(self.apply_settings)
+        
+        # Requests in flight, abandoned when the screen is left
+        self.operations = OperationGroup(self)
+        
+        # A throttled request waits out the cooldown and is sent again
+        self.cooldown = Cooldown(self.send_button, 'send_password_reset_email', self)
+        self.supabase_service.rate_limited.connect(self.on_rate_limited)
         logger.info("ForgotPasswordScreen initialized")
     
     def setup_ui(self):
@@ -35,13 +53,6 @@ class ForgotPasswordScreen(QWidget):
         # Create content frame
         content_frame = QFrame()
         content_frame.setObjectName("forgotPasswordContentFrame")
-        content_frame.setStyleSheet('''
-            #forgotPasswordContentFrame {
-                background-color: transparent;
-                border-radius: 15px;
-                border: none;
-            }
-        ''')
         
         # Content layout
         content_layout = QVBoxLayout(content_frame)
@@ -51,12 +62,7 @@ class ForgotPasswordScreen(QWidget):
         # Title
         title_label = QLabel("Forgot Password")
         title_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        title_label.setStyleSheet('''
-            font-size: 24px;
-            font-weight: bold;
-            color: #ffffff;
-            margin-bottom: 15px;
-        ''')
+        title_label.setObjectName("forgotPasswordTitle")
         
         # Form layout
         form_layout = QVBoxLayout()
@@ -66,39 +72,12 @@ class ForgotPasswordScreen(QWidget):
         self.email_edit = AnimatedLineEdit()
         self.email_edit.setPlaceholderText("Enter your email")
         self.email_edit.setMinimumHeight(50)
-        self.email_edit.setStyleSheet('''
-            QLineEdit {
-                background-color: #252525;
-                border: 2px solid #333333;
-                border-radius: 10px;
-                padding: 10px 20px;
-                color: #ffffff;
-                font-size: 15px;
-            }
-            QLineEdit:focus {
-                border: 2px solid #3a86ff;
-                background-color: #2a2a2a;
-            }
-        ''')
+        self.email_edit.setObjectName("forgotPasswordEmail")
         
         # Send recovery email button
         self.send_button = AnimatedButton("Send Recovery Email")
         self.send_button.setMinimumHeight(50)
-        self.send_button.setStyleSheet('''
-            QPushButton {
-                background-color: #3a86ff;
-                color: white;
-                border-radius: 10px;
-                font-size: 16px;
-                font-weight: bold;
-            }
-            QPushButton:hover {
-                background-color: #2a76ef;
-            }
-            QPushButton:pressed {
-                background-color: #1a66df;
-            }
-        ''')
+        self.send_button.setObjectName("sendRecoveryButton")
         self.send_button.clicked.connect(self.on_send_clicked)
         
         # Back to login link
@@ -106,12 +85,7 @@ class ForgotPasswordScreen(QWidget):
         back_layout.setContentsMargins(0, 25, 0, 0)
         
         self.back_link = QLabel("Back to Login")
-        self.back_link.setStyleSheet('''
-            color: #3a86ff;
-            font-size: 15px;
-            font-weight: bold;
-            text-decoration: none;
-        ''')
+        self.back_link.setObjectName("backToLoginLink")
         self.back_link.setCursor(Qt.CursorShape.PointingHandCursor)
         self.back_link.mousePressEvent = self.on_back_clicked
         
@@ -121,13 +95,7 @@ class ForgotPasswordScreen(QWidget):
         
         # Error/Success message
         self.message_label = QLabel()
-        self.message_label.setStyleSheet('''
-            font-size: 15px;
-            font-weight: bold;
-            min-height: 25px;
-            padding: 5px;
-            border-radius: 5px;
-        ''')
+        self.message_label.setObjectName("forgotPasswordMessage")
         self.message_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
         self.message_label.setVisible(False)
         
@@ -146,26 +114,30 @@ class ForgotPasswordScreen(QWidget):
         
         # Set layout
         self.setLayout(main_layout)
-        
-        # Set stylesheet
-        self.setStyleSheet('''
-            QWidget {
-                background-color: transparent;
-                color: #ffffff;
-                font-family: 'Segoe UI', Arial, sans-serif;
-            }
-        ''')
     
     def on_send_clicked(self):
+        if self.cooldown.active:
+            return
+        
         email = self.email_edit.text()
         if not email:
             self.show_message("Please enter your email", is_error=True)
             return
         
-        logger.info(f"Sending password recovery email to: {email}")
+        logger.info("Sending password recovery email to: %s", email)
         self.send_button.start_loading()
-        success = self.supabase_service.send_password_reset_email(email)
-        self.on_recovery_sent(success)
+        operation = self.operations.add(self.supabase_service.start('send_password_reset_email', email))
+        operation.finished.connect(self.on_send_finished)
+        operation.aborted.connect(self.on_send_aborted)
+    
+    def on_send_finished(self, success):
+        if not self.cooldown.active:
+            self.on_recovery_sent(success)
+    
+    def on_send_aborted(self, state):
+        self.send_button.stop_loading()
+        if state == 'timed_out':
+            self.show_message("The server took too long to respond, please try again", is_error=True)
 
     def on_recovery_sent(self, success):
         self.send_button.stop_loading()
@@ -180,33 +152,32 @@ class ForgotPasswordScreen(QWidget):
         logger.info("Navigating back to login screen.")
         self.navigate_to_login.emit()
     
+    def on_rate_limited(self, operation, retry_after):
+        if operation != 'send_password_reset_email':
+            return
+        self.cooldown.start(retry_after, self.on_send_clicked)
+        self.show_message("Too many requests, the email will be sent shortly", is_error=True)
+    
+    def apply_settings(self, names):
+        if 'error_display_ms' in names:
+            self.message_timer.setInterval(settings().get('error_display_ms'))
+    
+    def hideEvent(self, event):
+        if not event.spontaneous():
+            self.cooldown.cancel()
+            self.operations.cancel()
+        super().hideEvent(event)
+    
     def on_auth_error(self, error_message):
-        logger.error(f"Authentication error: {error_message}")
+        logger.error("Authentication error: %s", error_message)
         self.show_message(error_message, is_error=True)
     
     def show_message(self, message, is_error=False):
         self.message_label.setText(message)
         if is_error:
-            logger.error(f"Displaying error message: {message}")
-            self.message_label.setStyleSheet('''
-                color: #ff3333;
-                background-color: transparent;
-                font-size: 15px;
-                font-weight: bold;
-                min-height: 25px;
-                padding: 5px;
-                border-radius: 5px;
-            ''')
+            logger.error("Displaying error message: %s", message)
         else:
-            logger.info(f"Displaying success message: {message}")
-            self.message_label.setStyleSheet('''
-                color: #2ecc71;
-                background-color: transparent;
-                font-size: 15px;
-                font-weight: bold;
-                min-height: 25px;
-                padding: 5px;
-                border-radius: 5px;
-            ''')
+            logger.info("Displaying success message: %s", message)
+        set_state(self.message_label, 'error', is_error)
         self.message_label.setVisible(True)
-        QTimer.singleShot(5000, lambda: self.message_label.setVisible(False))
\ No newline at end of file
+        self.message_timer.start()
\ No newline at end of file
@@ -1,12 +1,17 @@
-import os
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, 
                              QPushButton, QCheckBox, QFrame, QSpacerItem, QSizePolicy)
-from PyQt6.QtCore import Qt, pyqtSignal, QSize, QPropertyAnimation, QEasingCurve, QTimer
+from PyQt6.QtCore import Qt, pyqtSignal, QSize, QPropertyAnimation, QEasingCurve, QTimer, QFile
 from PyQt6.QtGui import QIcon, QPixmap, QColor, QPalette, QFont
 
 from app.ui.widgets.animated_button import AnimatedButton
 from app.ui.widgets.oauth_button import OAuthButton
 from app.ui.widgets.animated_line_edit import AnimatedLineEdit
+from app.ui.image_registry import image_registry
+from app.ui.cooldown import Cooldown
+from app.ui.embedded_oauth import EMBEDDED_REDIRECT_URI, EmbeddedOAuth
+from app.services.operation import OperationGroup
+from app.utils import tracing
+from app.utils.settings import settings
 
 import logging
 
@@ -17,7 +22,7 @@ class LoginScreen(QWidget):
     navigate_to_register = pyqtSignal()
     navigate_to_forgot_password = pyqtSignal()
     
-    def __init__(self, supabase_service):
+    def __init__(self, supabase_service, embedded_oauth=True):
         super().__init__()
         self.supabase_service = supabase_service
         
@@ -26,6 +31,29 @@ class LoginScreen(QWidget):
         
         # Setup UI
         self.setup_ui()
+        
+        # One timer hides the message; showing another restarts it
+        self.error_timer = QTimer(self)
+        self.error_timer.setSingleShot(True)
+        self.error_timer.setInterval(settings().get('error_display_ms'))
+        self.error_timer.timeout.connect(lambda: self.error_label.setVisible(False))
+        
+        # Requests in flight, abandoned when the screen is left
+        self.operations = OperationGroup(self)
+        self.oauth_operation = None
+        self.oauth_remember = False
+        
+        # In-app OAuth; WebEngine is loaded once the screen sits idle, or on
+        # the first click. Demo sign-ins never leave the app.
+        self.embedded_oauth = EmbeddedOAuth(self, embedded_oauth and not supabase_service.demo_mode,
+                                            settings().get('oauth_prewarm_idle_ms'))
+        self.embedded_oauth.redirected.connect(self.on_oauth_redirected)
+        self.embedded_oauth.dismissed.connect(self.on_oauth_dismissed)
+        
+        # A throttled sign-in waits out the cooldown and is retried
+        self.cooldown = Cooldown(self.login_button, 'sign_in', self)
+        self.supabase_service.rate_limited.connect(self.on_rate_limited)
+        settings().changed.connect(self.apply_settings)
         logger.info("LoginScreen initialized")
     
     def setup_ui(self):
@@ -37,13 +65,6 @@ class LoginScreen(QWidget):
         # Create content frame
         content_frame = QFrame()
         content_frame.setObjectName("loginContentFrame")
-        content_frame.setStyleSheet("""
-            #loginContentFrame {
-                background-color: transparent;
-                border-radius: 15px;
-                border: none;
-            }
-        """)
         
         # Content layout
         content_layout = QVBoxLayout(content_frame)
@@ -55,26 +76,16 @@ class LoginScreen(QWidget):
         logo_layout.setAlignment(Qt.AlignmentFlag.AlignCenter)
         
         # Logo image if available
-        logo_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))), 
-                               'app', 'assets', 'images', 'logo.png')
-        if os.path.exists(logo_path):
+        logo_path = ':/images/logo.svg'
+        if QFile.exists(logo_path):
             logo_label = QLabel()
-            logo_pixmap = QPixmap(logo_path)
-            logo_label.setPixmap(logo_pixmap.scaled(QSize(80, 80), Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation))  # Smaller logo
+            logo_label.setPixmap(image_registry().pixmap(logo_path, QSize(80, 80)))  # Smaller logo
             logo_layout.addWidget(logo_label)
         
         # Title
         title_label = QLabel("CS2 Tool Login")
         title_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        title_label.setStyleSheet("""
-            font-size: 24px;
-            font-weight: bold;
-            color: #ffffff;
-            margin-top: 10px;
-            margin-bottom: 15px;
-            text-transform: uppercase;
-            letter-spacing: 1px;
-        """)
+        title_label.setObjectName("loginTitle")
         
         # Form layout
         form_layout = QVBoxLayout()
@@ -84,77 +95,24 @@ class LoginScreen(QWidget):
         self.email_edit = AnimatedLineEdit()
         self.email_edit.setPlaceholderText("Email")
         self.email_edit.setMinimumHeight(50)  # Bigger input field
-        self.email_edit.setStyleSheet("""
-            QLineEdit {
-                background-color: transparent;
-                border: 2px solid #333333;
-                border-radius: 10px;
-                padding: 10px 20px;
-                color: #ffffff;
-                font-size: 15px;
-                margin-bottom: 5px;
-            }
-            QLineEdit:focus {
-                border: 2px solid #3a86ff;
-                background-color: #2a2a2a;
-            }
-        """)
+        self.email_edit.setObjectName("loginEmail")
         
         # Password field
         self.password_edit = AnimatedLineEdit()
         self.password_edit.setPlaceholderText("Password")
         self.password_edit.setEchoMode(QLineEdit.EchoMode.Password)
         self.password_edit.setMinimumHeight(50)  # Bigger input field
-        self.password_edit.setStyleSheet("""
-            QLineEdit {
-                background-color: transparent;
-                border: 2px solid #333333;
-                border-radius: 10px;
-                padding: 10px 20px;
-                color: #ffffff;
-                font-size: 15px;
-                margin-bottom: 5px;
-            }
-            QLineEdit:focus {
-                border: 2px solid #3a86ff;
-                background-color: #2a2a2a;
-            }
-        """)
+        self.password_edit.setObjectName("loginPassword")
         
         # Remember me checkbox
         remember_layout = QHBoxLayout()
         self.remember_checkbox = QCheckBox("Remember me")
-        self.remember_checkbox.setStyleSheet("""
-            QCheckBox {
-                color: #cccccc;
-                font-size: 15px;
-                margin-top: 5px;
-                margin-bottom: 5px;
-            }
-            QCheckBox::indicator {
-                width: 20px;
-                height: 20px;
-                border-radius: 5px;
-                border: 2px solid #555555;
-            }
-            QCheckBox::indicator:checked {
-                background-color: #3a86ff;
-                border: 2px solid #3a86ff;
-                image: url(app/assets/icons/checkmark.svg);
-            }
-            QCheckBox::indicator:hover {
-                border: 2px solid #4a96ff;
-            }
-        """)
+        self.remember_checkbox.setObjectName("rememberCheckbox")
         remember_layout.addWidget(self.remember_checkbox)
         remember_layout.addStretch()
         
         self.forgot_password_link = QLabel("Forgot Password?")
-        self.forgot_password_link.setStyleSheet("""
-            color: #3a86ff;
-            font-size: 15px;
-            text-decoration: none;
-        """)
+        self.forgot_password_link.setObjectName("forgotPasswordLink")
         self.forgot_password_link.setCursor(Qt.CursorShape.PointingHandCursor)
         self.forgot_password_link.mousePressEvent = self.on_forgot_password_clicked
         remember_layout.addWidget(self.forgot_password_link)
@@ -162,23 +120,7 @@ class LoginScreen(QWidget):
         # Login button
         self.login_button = AnimatedButton("LOGIN")
         self.login_button.setMinimumHeight(50)  # Bigger button
-        self.login_button.setStyleSheet("""
-            QPushButton {
-                background-color: #3a86ff;
-                color: white;
-                border-radius: 10px;
-                font-size: 16px;
-                font-weight: bold;
-                letter-spacing: 2px;
-                text-transform: uppercase;
-            }
-            QPushButton:hover {
-                background-color: #2a76ef;
-            }
-            QPushButton:pressed {
-                background-color: #1a66df;
-            }
-        """)
+        self.login_button.setObjectName("loginButton")
         self.login_button.clicked.connect(self.on_login_clicked)
         
         # Divider
@@ -187,19 +129,14 @@ class LoginScreen(QWidget):
         
         left_line = QFrame()
         left_line.setFrameShape(QFrame.Shape.HLine)
-        left_line.setStyleSheet("background-color: #444444; min-height: 2px;")
+        left_line.setObjectName("dividerLine")
         
         or_label = QLabel("OR")
-        or_label.setStyleSheet("""
-            color: #aaaaaa;
-            font-size: 16px;
-            font-weight: bold;
-            margin: 0 15px;
-        """)
+        or_label.setObjectName("dividerLabel")
         
         right_line = QFrame()
         right_line.setFrameShape(QFrame.Shape.HLine)
-        right_line.setStyleSheet("background-color: #444444; min-height: 2px;")
+        right_line.setObjectName("dividerLine")
         
         divider_layout.addWidget(left_line)
         divider_layout.addStretch()
@@ -214,51 +151,12 @@ class LoginScreen(QWidget):
         
         self.google_button = OAuthButton("Login with Google", "google")
         self.google_button.setMinimumHeight(50)  # Increased height
-        self.google_button.setStyleSheet("""
-            QPushButton {
-                background-color: #ffffff;
-                color: #333333;
-                border-radius: 10px;
-                font-size: 15px;
-                font-weight: bold;
-                text-align: left;
-                padding-left: 20px;
-                padding-top: 5px;
-                padding-bottom: 5px;
-                border: none;
-            }
-            QPushButton:hover {
-                background-color: #e0e0e0;
-            }
-            QPushButton:pressed {
-                background-color: #202020;
-            }
-        """)
+        self.google_button.setObjectName("googleButton")
         self.google_button.clicked.connect(lambda: self.on_oauth_clicked("google"))
         
         # self.github_button = OAuthButton("Login with GitHub", "github")
         # self.github_button.setMinimumHeight(50)  # Increased height
-        # self.github_button.setStyleSheet("""
-        #     QPushButton {
-        #         background-color: #ffffff;
-        #         color: #333333;
-        #         border-radius: 10px;
-        #         font-size: 15px;
-        #         font-weight: bold;
-        #         text-align: left;
-        #         padding-left: 20px;
-        #         padding-top: 5px;
-        #         padding-bottom: 5px;
-        #         border: none;
-        #     }
-        #     QPushButton:hover {
-        #         background-color: #303030;
-        #         border: 1px solid #3a86ff;
-        #     }
-        #     QPushButton:pressed {
-        #         background-color: #202020;
-        #     }
-        # """)
+        # self.github_button.setObjectName("githubButton")
         # self.github_button.clicked.connect(lambda: self.on_oauth_clicked("github"))
         
         oauth_layout.addWidget(self.google_button)
@@ -269,17 +167,11 @@ class LoginScreen(QWidget):
         register_layout.setContentsMargins(0, 25, 0, 0)  # Increased vertical space
         
         register_label = QLabel("Don't have an account?")
-        register_label.setStyleSheet("color: #cccccc; font-size: 15px;")
+        register_label.setObjectName("loginRegisterPrompt")
         register_layout.addStretch()
         
         self.register_link = QLabel("Register")
-        self.register_link.setStyleSheet("""
-            color: #3a86ff;
-            font-size: 15px;
-            font-weight: bold;
-            text-decoration: none;
-            margin-left: 8px;
-        """)
+        self.register_link.setObjectName("registerLink")
         self.register_link.setCursor(Qt.CursorShape.PointingHandCursor)
         self.register_link.mousePressEvent = self.on_register_clicked
         register_layout.addStretch()
@@ -291,15 +183,7 @@ class LoginScreen(QWidget):
         
         # Error message
         self.error_label = QLabel()
-        self.error_label.setStyleSheet("""
-            color: #ff3333;
-            font-size: 15px;
-            font-weight: bold;
-            min-height: 25px;
-            padding: 5px;
-            background-color: transparent;
-            border-radius: 5px;
-        """)
+        self.error_label.setObjectName("loginError")
         self.error_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
         self.error_label.setVisible(False)
         
@@ -325,20 +209,16 @@ class LoginScreen(QWidget):
         
         # Set layout
         self.setLayout(main_layout)
-        
-        # Set stylesheet
-        self.setStyleSheet("""
-            QWidget {
-                background-color: transparent;
-                color: #ffffff;
-                font-family: 'Segoe UI', Arial, sans-serif;
-            }
-        """)
     
+    @tracing.traced('LoginScreen.on_login_clicked', 'ui')
     def on_login_clicked(self):
         """
         Handle login button click
         """
+        # Already queued behind a cooldown
+        if self.cooldown.active:
+            return
+        
         # Get email and password
         email = self.email_edit.text()
         password = self.password_edit.text()
@@ -350,29 +230,81 @@ class LoginScreen(QWidget):
             return
         
         # Sign in with Supabase
-        logger.info(f"Attempting to sign in user: {email}")
+        logger.info("Attempting to sign in user: %s", email)
         self.login_button.start_loading()
-        success = self.supabase_service.sign_in(email, password, remember)
+        operation = self.operations.add(self.supabase_service.start('sign_in', email, password, remember))
+        operation.finished.connect(self.on_sign_in_finished)
+        operation.aborted.connect(self.on_sign_in_aborted)
+    
+    def on_sign_in_finished(self, success):
+        """
+        Handle the end of a sign-in; errors are handled by on_auth_error
+        """
+        if not self.cooldown.active:
+            self.login_button.stop_loading()
+    
+    def on_sign_in_aborted(self, state):
+        """
+        Handle a sign-in that was abandoned or timed out
+        """
         self.login_button.stop_loading()
-        
-        if not success:
-            # Error is handled by on_auth_error
-            pass
+        if state == 'timed_out':
+            self.show_error("The server took too long to respond, please try again")
     
     def on_oauth_clicked(self, provider):
         """
         Handle OAuth button click
         """
-        # Get OAuth URL
-        logger.info(f"Initiating OAuth login with provider: {provider}")
-        auth_url = self.supabase_service.sign_in_with_oauth(provider)
-        
-        if not auth_url:
-            # Error is handled by on_auth_error
-            pass
-        
-        # TODO: Implement WebView for embedded OAuth login
-        # For now, we'll use the system browser
+        logger.info("Initiating OAuth login with provider: %s", provider)
+        remember = self.remember_checkbox.isChecked()
+        self.oauth_remember = remember
+        
+        # A new attempt replaces one still waiting for the browser
+        if self.oauth_operation is not None:
+            self.oauth_operation.cancel()
+        
+        # Sign in inside the app when WebEngine can be used
+        if self.embedded_oauth.available:
+            url = self.supabase_service.oauth_authorize_url(provider, EMBEDDED_REDIRECT_URI)
+            if self.embedded_oauth.open(url):
+                return
+        
+        # The system browser comes back through a loopback listener; errors
+        # are handled by on_auth_error
+        self.oauth_operation = self.operations.add(
+            self.supabase_service.start('sign_in_with_oauth', provider, remember, deadline=settings().get('oauth_timeout')))
+        self.oauth_operation.finished.connect(self.on_oauth_finished)
+        self.oauth_operation.aborted.connect(self.on_oauth_aborted)
+    
+    def on_oauth_redirected(self, url):
+        """
+        Complete a sign-in from the intercepted redirect of the embedded
+        view, or from a callback URL another launch handed over
+        """
+        # The redirect may come this way while the loopback listener still waits
+        if self.oauth_operation is not None:
+            self.oauth_operation.cancel()
+        self.oauth_operation = self.operations.add(
+            self.supabase_service.start('handle_oauth_callback', url, self.oauth_remember))
+        self.oauth_operation.finished.connect(self.on_oauth_finished)
+        self.oauth_operation.aborted.connect(self.on_oauth_aborted)
+    
+    def on_oauth_dismissed(self):
+        """
+        The embedded sign-in window was closed before the provider redirected
+        """
+        self.supabase_service.cancel_oauth()
+        self.show_error("Sign-in cancelled")
+    
+    def on_oauth_finished(self, success):
+        self.oauth_operation = None
+    
+    def on_oauth_aborted(self, state):
+        callback = self.sender().name == 'handle_oauth_callback'
+        self.oauth_operation = None
+        if state == 'timed_out':
+            self.show_error("The server took too long to respond, please try again" if callback
+                            else "The sign-in was not completed in the browser in time")
     
     def on_register_clicked(self, event):
         """
@@ -388,12 +320,51 @@ class LoginScreen(QWidget):
         logger.info("Navigating to forgot password screen")
         self.navigate_to_forgot_password.emit()
     
+    def on_rate_limited(self, operation, retry_after):
+        """
+        Queue the sign-in until the rate limiter allows it again
+        """
+        if operation != 'sign_in':
+            return
+        self.cooldown.start(retry_after, self.on_login_clicked)
+        self.show_error("Too many sign-in attempts, retrying shortly")
+    
+    def apply_settings(self, names):
+        """
+        Follow changes to the message timing and the embedded OAuth view
+        """
+        if 'error_display_ms' in names:
+            self.error_timer.setInterval(settings().get('error_display_ms'))
+        if 'oauth_prewarm_idle_ms' in names:
+            self.embedded_oauth.set_idle_interval(settings().get('oauth_prewarm_idle_ms'))
+        if 'oauth_embedded' in names:
+            self.embedded_oauth.enabled = settings().get('oauth_embedded') and not self.supabase_service.demo_mode
+            if self.embedded_oauth.enabled and self.isVisible():
+                self.embedded_oauth.prewarm_when_idle()
+            elif not self.embedded_oauth.enabled:
+                self.embedded_oauth.stop_prewarm()
+    
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.embedded_oauth.prewarm_when_idle()
+    
+    def hideEvent(self, event):
+        """
+        Drop a queued sign-in and abandon requests when the screen is left
+        """
+        if not event.spontaneous():
+            self.cooldown.cancel()
+            self.operations.cancel()
+            self.embedded_oauth.stop_prewarm()
+            self.embedded_oauth.close()
+        super().hideEvent(event)
+    
     def on_auth_error(self, error_message):
         """
         Handle authentication error
         """
         self.show_error(error_message)
-        logger.warning(f"Authentication error: {error_message}")
+        logger.warning("Authentication error: %s", error_message)
     
     def show_error(self, message):
         """
@@ -401,7 +372,7 @@ class LoginScreen(QWidget):
         """
         self.error_label.setText(message)
         self.error_label.setVisible(True)
-        logger.error(f"Displayed error message: {message}")
+        logger.error("Displayed error message: %s", message)
         
         # Hide error after 5 seconds
-        QTimer.singleShot(5000, lambda: self.error_label.setVisible(False))
\ No newline at end of file
+        self.error_timer.start()
\ No newline at end of file
@@ -1,11 +1,16 @@
-import os
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, 
                              QPushButton, QFrame, QSpacerItem, QSizePolicy)
-from PyQt6.QtCore import Qt, pyqtSignal, QSize, QTimer
+from PyQt6.QtCore import Qt, pyqtSignal, QSize, QTimer, QFile
 from PyQt6.QtGui import QIcon, QPixmap
 
 from app.ui.widgets.animated_button import AnimatedButton
 from app.ui.widgets.animated_line_edit import AnimatedLineEdit
+from app.ui.image_registry import image_registry
+from app.ui.cooldown import Cooldown
+from app.services.operation import OperationGroup
+from app.services.username_checker import UsernameChecker
+from app.utils import validation
+from app.utils.settings import settings
 
 import logging
 
@@ -24,6 +29,36 @@ class RegisterScreen(QWidget):
         
         # Setup UI
         self.setup_ui()
+        
+        # One timer hides the message; showing another restarts it
+        self.error_timer = QTimer(self)
+        self.error_timer.setSingleShot(True)
+        self.error_timer.setInterval(settings().get('error_display_ms'))
+        self.error_timer.timeout.connect(lambda: self.error_label.setVisible(False))
+        
+        # Live validation: each field is checked once typing pauses, and the
+        # username is also checked for availability in the background
+        self.username_checker = UsernameChecker(supabase_service, parent=self)
+        self.username_checker.checked.connect(self.on_username_checked)
+        self.submit_pending = False
+        
+        # Requests in flight, abandoned when the screen is left
+        self.operations = OperationGroup(self)
+        
+        # A throttled sign-up waits out the cooldown and is retried
+        self.cooldown = Cooldown(self.register_button, 'sign_up', self)
+        self.supabase_service.rate_limited.connect(self.on_rate_limited)
+        
+        # Each field is validated once typing pauses for validation_delay_ms
+        self.validation_timers = {}
+        for field in self.field_hints:
+            timer = QTimer(self)
+            timer.setSingleShot(True)
+            timer.setInterval(settings().get('validation_delay_ms'))
+            timer.timeout.connect(lambda field=field: self.validate_field(field))
+            field.textEdited.connect(lambda text, field=field: self.on_field_edited(field))
+            self.validation_timers[field] = timer
+        settings().changed.connect(self.apply_settings)
         logger.info("RegisterScreen initialized")
     
     def setup_ui(self):
@@ -35,12 +70,6 @@ class RegisterScreen(QWidget):
         # Create content frame
         content_frame = QFrame()
         content_frame.setObjectName("registerContentFrame")
-        content_frame.setStyleSheet("""
-            #registerContentFrame {
-                background-color: transparent;
-                border-radius: 10px;
-            }
-        """)
         
         # Content layout
         content_layout = QVBoxLayout(content_frame)
@@ -52,24 +81,16 @@ class RegisterScreen(QWidget):
         logo_layout.setAlignment(Qt.AlignmentFlag.AlignCenter)
         
         # Logo image if available
-        logo_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))), 
-                               'app', 'assets', 'images', 'logo.png')
-        if os.path.exists(logo_path):
+        logo_path = ':/images/logo.svg'
+        if QFile.exists(logo_path):
             logo_label = QLabel()
-            logo_pixmap = QPixmap(logo_path)
-            logo_label.setPixmap(logo_pixmap.scaled(QSize(80, 80), Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation))
+            logo_label.setPixmap(image_registry().pixmap(logo_path, QSize(80, 80)))
             logo_layout.addWidget(logo_label)
         
         # Title
         title_label = QLabel("Create Account")
         title_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        title_label.setStyleSheet("""
-            font-size: 28px;
-            font-weight: bold;
-            color: #ffffff;
-            margin-top: 10px;
-            margin-bottom: 20px;
-        """)
+        title_label.setObjectName("registerTitle")
         
         # Form layout
         form_layout = QVBoxLayout()
@@ -107,16 +128,10 @@ class RegisterScreen(QWidget):
         login_layout.setContentsMargins(0, 20, 0, 0)
         
         login_label = QLabel("Already have an account?")
-        login_label.setStyleSheet("color: #cccccc; font-size: 14px;")
+        login_label.setObjectName("registerLoginPrompt")
         
         self.login_link = QLabel("Login")
-        self.login_link.setStyleSheet("""
-            color: #3a86ff;
-            font-size: 14px;
-            font-weight: bold;
-            text-decoration: none;
-            margin-left: 5px;
-        """)
+        self.login_link.setObjectName("registerLoginLink")
         self.login_link.setCursor(Qt.CursorShape.PointingHandCursor)
         self.login_link.mousePressEvent = self.on_login_clicked
         
@@ -127,19 +142,22 @@ class RegisterScreen(QWidget):
         
         # Error message
         self.error_label = QLabel()
-        self.error_label.setStyleSheet("""
-            color: #ff3333;
-            font-size: 14px;
-            min-height: 20px;
-        """)
+        self.error_label.setObjectName("registerError")
         self.error_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
         self.error_label.setVisible(False)
         
+        # Validation hints, one under each field
+        self.field_hints = {}
+        for field in (self.username_edit, self.email_edit, self.password_edit, self.confirm_password_edit):
+            hint = QLabel()
+            hint.setObjectName("registerFieldHint")
+            hint.setVisible(False)
+            self.field_hints[field] = hint
+        
         # Add widgets to form layout
-        form_layout.addWidget(self.username_edit)
-        form_layout.addWidget(self.email_edit)
-        form_layout.addWidget(self.password_edit)
-        form_layout.addWidget(self.confirm_password_edit)
+        for field, hint in self.field_hints.items():
+            form_layout.addWidget(field)
+            form_layout.addWidget(hint)
         form_layout.addWidget(self.register_button)
         form_layout.addWidget(self.error_label)
         form_layout.addLayout(login_layout)
@@ -154,44 +172,163 @@ class RegisterScreen(QWidget):
         
         # Set layout
         self.setLayout(main_layout)
+    
+    def field_error(self, field):
+        """
+        Validation message for a field, or None when it is valid
+        """
+        if field is self.username_edit:
+            return validation.username_error(field.text())
+        if field is self.email_edit:
+            return validation.email_error(field.text())
+        if field is self.password_edit:
+            return validation.password_error(field.text())
+        return validation.confirm_password_error(self.password_edit.text(), field.text())
+    
+    def on_field_edited(self, field):
+        """
+        Restart the field's debounce timer; edits also invalidate a
+        confirmation typed before the password changed
+        """
+        self.validation_timers[field].start()
+        if field is self.password_edit and self.confirm_password_edit.text():
+            self.validation_timers[self.confirm_password_edit].start()
+        if field is self.username_edit:
+            self.username_checker.cancel()
+            self.cancel_pending_submit()
+    
+    def validate_field(self, field, live=True):
+        """
+        Show the hint for a field. While typing, empty fields are not
+        flagged and a well-formed username is checked for availability.
+        """
+        message = self.field_error(field)
+        if live and not field.text():
+            message = None
+        self.show_field_hint(field, message)
+        
+        if live and field is self.username_edit and message is None and field.text():
+            self.username_checker.check(field.text())
+        return message is None
+    
+    def show_field_hint(self, field, message):
+        hint = self.field_hints[field]
+        field.set_invalid(message is not None)
+        hint.setText(message or "")
+        hint.setVisible(message is not None)
+    
+    def on_username_checked(self, username, available):
+        """
+        Handle an availability answer for the username
+        """
+        if username != self.username_edit.text():
+            return
+        if available is False:
+            self.show_field_hint(self.username_edit, "Username is already taken")
         
-        # Set stylesheet
-        self.setStyleSheet("""
-            QWidget {
-                background-color: transparent;
-                color: #ffffff;
-                font-family: 'Segoe UI', Arial, sans-serif;
-            }
-        """)
+        if self.submit_pending:
+            self.submit_pending = False
+            self.register_button.stop_loading()
+            # An unknown answer leaves the decision to the server
+            if available is not False:
+                self.register()
+    
+    def cancel_pending_submit(self):
+        if self.submit_pending:
+            self.submit_pending = False
+            self.register_button.stop_loading()
     
     def on_register_clicked(self):
         """
         Handle register button click
         """
-        # Get form data
-        username = self.username_edit.text()
-        email = self.email_edit.text()
-        password = self.password_edit.text()
-        confirm_password = self.confirm_password_edit.text()
+        if self.cooldown.active:
+            return
+        
+        for timer in self.validation_timers.values():
+            timer.stop()
         
-        # Validate input
-        if not username or not email or not password or not confirm_password:
-            self.show_error("Please fill in all fields")
+        # Validate every field, so all hints show at once
+        results = [self.validate_field(field, live=False) for field in self.field_hints]
+        if not all(results):
             return
         
-        if password != confirm_password:
-            self.show_error("Passwords do not match")
+        # Never send a sign-up for a name known to be taken; wait for the
+        # availability answer if there is none yet
+        username = self.username_edit.text()
+        available = self.username_checker.cached(username)
+        if available is False:
+            self.show_field_hint(self.username_edit, "Username is already taken")
+            return
+        if available is None:
+            self.submit_pending = True
+            self.register_button.start_loading()
+            self.username_checker.check(username)
             return
         
+        self.register()
+    
+    def register(self):
+        """
+        Sign up with the validated form data
+        """
+        username = self.username_edit.text()
+        email = self.email_edit.text()
+        password = self.password_edit.text()
+        
         # Register with Supabase
-        logger.info(f"Attempting to register user: {email}")
+        logger.info("Attempting to register user: %s", email)
         self.register_button.start_loading()
-        success = self.supabase_service.sign_up(email, password, username)
+        operation = self.operations.add(self.supabase_service.start('sign_up', email, password, username))
+        operation.finished.connect(lambda success: self.on_sign_up_finished(username, success))
+        operation.aborted.connect(self.on_sign_up_aborted)
+    
+    def on_sign_up_finished(self, username, success):
+        """
+        Handle the end of a sign-up; errors are handled by on_auth_error
+        """
+        if not self.cooldown.active:
+            self.register_button.stop_loading()
+        if success:
+            self.username_checker.remember(username, False)
+    
+    def on_sign_up_aborted(self, state):
+        """
+        Handle a sign-up that was abandoned or timed out
+        """
         self.register_button.stop_loading()
-        
-        if not success:
-            # Error is handled by on_auth_error
-            pass
+        if state == 'timed_out':
+            self.show_error("The server took too long to respond, please try again")
+    
+    def on_rate_limited(self, operation, retry_after):
+        """
+        Queue the sign-up until the rate limiter allows it again
+        """
+        if operation != 'sign_up':
+            return
+        self.cooldown.start(retry_after, self.register)
+        self.show_error("Too many sign-up attempts, retrying shortly")
+    
+    def apply_settings(self, names):
+        """
+        Follow changes to the message and validation timings
+        """
+        if 'error_display_ms' in names:
+            self.error_timer.setInterval(settings().get('error_display_ms'))
+        if 'validation_delay_ms' in names:
+            for timer in self.validation_timers.values():
+                timer.setInterval(settings().get('validation_delay_ms'))
+    
+    def hideEvent(self, event):
+        """
+        Drop a queued sign-up and abandon requests when the screen is left
+        """
+        if not event.spontaneous():
+            self.cooldown.cancel()
+            self.cancel_pending_submit()
+            self.username_checker.cancel()
+            self.operations.cancel()
+        super().hideEvent(event)
     
     def on_login_clicked(self, event):
         """
@@ -205,7 +342,7 @@ class RegisterScreen(QWidget):
         Handle authentication error
         """
         self.show_error(error_message)
-        logger.warning(f"Authentication error: {error_message}")
+        logger.warning("Authentication error: %s", error_message)
     
     def show_error(self, message):
         """
@@ -213,7 +350,7 @@ class RegisterScreen(QWidget):
         """
         self.error_label.setText(message)
         self.error_label.setVisible(True)
-        logger.error(f"Displayed error message: {message}")
+        logger.error("Displayed error message: %s", message)
         
         # Hide error after 5 seconds
-        QTimer.singleShot(5000, lambda: self.error_label.setVisible(False))
\ No newline at end of file
+        self.error_timer.start()
\ No newline at end of file
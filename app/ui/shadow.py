@@ -0,0 +1,275 @@
+import math
+from PyQt6.QtWidgets import QWidget, QGraphicsScene, QGraphicsPixmapItem, QGraphicsBlurEffect
+from PyQt6.QtCore import Qt, QEvent, QMargins, QPointF, QRect, QRectF, QSize
+from PyQt6.QtGui import QColor, QImage, QPainter, QPainterPath, QPixmap, QPixmapCache
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+def render_shadow(shape_size, radius, blur_radius, color, device_pixel_ratio=1.0):
+    """
+    Render the blurred shadow of a rounded rectangle of shape_size (in
+    device-independent pixels). The image has a blur_radius margin around
+    the shape, like QGraphicsDropShadowEffect.
+    """
+    margin = math.ceil(blur_radius)
+    width = round((shape_size.width() + 2 * margin) * device_pixel_ratio)
+    height = round((shape_size.height() + 2 * margin) * device_pixel_ratio)
+
+    shape = QImage(width, height, QImage.Format.Format_ARGB32_Premultiplied)
+    shape.fill(Qt.GlobalColor.transparent)
+    painter = QPainter(shape)
+    painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+    painter.scale(device_pixel_ratio, device_pixel_ratio)
+    path = QPainterPath()
+    path.addRoundedRect(QRectF(margin, margin, shape_size.width(), shape_size.height()), radius, radius)
+    painter.fillPath(path, color)
+    painter.end()
+
+    if blur_radius <= 0:
+        shadow = shape
+    else:
+        # Same blur QGraphicsDropShadowEffect applies, done once per cache key
+        scene = QGraphicsScene()
+        item = QGraphicsPixmapItem(QPixmap.fromImage(shape))
+        blur = QGraphicsBlurEffect()
+        blur.setBlurRadius(blur_radius * device_pixel_ratio)
+        blur.setBlurHints(QGraphicsBlurEffect.BlurHint.PerformanceHint)
+        item.setGraphicsEffect(blur)
+        scene.addItem(item)
+
+        shadow = QImage(width, height, QImage.Format.Format_ARGB32_Premultiplied)
+        shadow.fill(Qt.GlobalColor.transparent)
+        painter = QPainter(shadow)
+        scene.render(painter, QRectF(0, 0, width, height), QRectF(0, 0, width, height))
+        painter.end()
+
+    shadow.setDevicePixelRatio(device_pixel_ratio)
+    return shadow
+
+class ShadowCache:
+    """
+    Shared cache of pre-blurred shadow pixmaps on top of QPixmapCache.
+
+    Shadows are rendered as 9-slice templates: a shape only as large as its
+    corners need, with one stretchable row and column in the middle. Every
+    widget with the same radius, blur and color shares one template whatever
+    its size.
+    """
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.rendered = 0
+
+    @staticmethod
+    def _key(width, height, radius, blur_radius, color, device_pixel_ratio):
+        return f"shadow:{width}x{height}@{radius:g}/{blur_radius:g}/{color.rgba():08x}@{device_pixel_ratio:g}"
+
+    @staticmethod
+    def template_extent(length, radius, blur_radius):
+        """
+        Template length along one axis: the full length when there is no
+        room for a uniform middle, otherwise corners plus one stretchable pixel
+        """
+        corner = math.ceil(radius) + 2 * math.ceil(blur_radius)
+        return min(length, 2 * corner + 1)
+
+    def template(self, shape_size, radius, blur_radius, color, device_pixel_ratio=1.0):
+        """
+        Get the shadow template for a shape; returns (pixmap, template shape size)
+        """
+        radius = min(radius, shape_size.width() / 2, shape_size.height() / 2)
+        width = self.template_extent(shape_size.width(), radius, blur_radius)
+        height = self.template_extent(shape_size.height(), radius, blur_radius)
+        key = self._key(width, height, radius, blur_radius, color, device_pixel_ratio)
+
+        pixmap = QPixmapCache.find(key)
+        if pixmap is not None:
+            self.hits += 1
+        else:
+            self.misses += 1
+            pixmap = QPixmap.fromImage(render_shadow(QSize(width, height), radius, blur_radius, color, device_pixel_ratio))
+            QPixmapCache.insert(key, pixmap)
+            self.rendered += 1
+        return pixmap, (width, height)
+
+    def draw(self, painter, shape_rect, radius, blur_radius, color, device_pixel_ratio=1.0):
+        """
+        Paint the shadow of shape_rect by stretching the cached template
+        """
+        shape_rect = QRect(shape_rect)
+        if shape_rect.isEmpty():
+            return
+
+        pixmap, (shape_width, shape_height) = self.template(shape_rect.size(), radius, blur_radius,
+                                                           color, device_pixel_ratio)
+        margin = math.ceil(blur_radius)
+        target = QRectF(shape_rect).adjusted(-margin, -margin, margin, margin)
+        source_width = shape_width + 2 * margin
+        source_height = shape_height + 2 * margin
+        left, right = self._slices(source_width, shape_width != shape_rect.width())
+        top, bottom = self._slices(source_height, shape_height != shape_rect.height())
+
+        source_columns = self._spans(source_width, left, right)
+        source_rows = self._spans(source_height, top, bottom)
+        target_columns = self._spans(target.width(), left, right, target.left())
+        target_rows = self._spans(target.height(), top, bottom, target.top())
+
+        ratio = device_pixel_ratio
+        for (source_y, source_h), (target_y, target_h) in zip(source_rows, target_rows):
+            for (source_x, source_w), (target_x, target_w) in zip(source_columns, target_columns):
+                if source_w <= 0 or source_h <= 0 or target_w <= 0 or target_h <= 0:
+                    continue
+                painter.drawPixmap(QRectF(target_x, target_y, target_w, target_h), pixmap,
+                                   QRectF(source_x * ratio, source_y * ratio, source_w * ratio, source_h * ratio))
+
+    @staticmethod
+    def _slices(length, stretched):
+        """
+        Leading and trailing slice lengths; a stretched template has a single
+        pixel in the middle, an unstretched one is split in half
+        """
+        start = (length - 1) // 2 if stretched else length // 2
+        return start, (start if stretched else length - start)
+
+    @staticmethod
+    def _spans(length, start, end, origin=0):
+        """
+        Start and length of the leading, middle and trailing slice
+        """
+        middle = length - start - end
+        return [(origin, start), (origin + start, middle), (origin + start + middle, end)]
+
+    def stats(self):
+        """
+        Cache usage and hit rates
+        """
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'rendered': self.rendered,
+        }
+
+_cache = None
+
+def shadow_cache():
+    """
+    Get the application-wide shadow cache
+    """
+    global _cache
+    if _cache is None:
+        _cache = ShadowCache()
+    return _cache
+
+class DropShadow(QWidget):
+    """
+    Drop shadow painted by a sibling widget stacked right below its target.
+
+    Replaces QGraphicsDropShadowEffect, which renders the target offscreen and
+    blurs it on every repaint. The shadow comes from the shared cache and is
+    only recomposited; a hover shadow can be cross-faded in with set_hover(),
+    which changes nothing but the opacity of the two layers.
+    """
+    def __init__(self, target, blur_radius, color, offset=QPointF(0, 0)):
+        super().__init__(target.parentWidget())
+        self.target = target
+        self.blur_radius = blur_radius
+        self.color = QColor(color)
+        self.offset = QPointF(offset)
+        self.hover_blur_radius = None
+        self.hover_color = None
+        self.hover = 0.0
+        self.radius = 0.0
+        self.shape_margins = QMargins()
+
+        self.setAttribute(Qt.WidgetAttribute.WA_TransparentForMouseEvents)
+        self.setFocusPolicy(Qt.FocusPolicy.NoFocus)
+
+        target.installEventFilter(self)
+        target.destroyed.connect(self.deleteLater)
+        self.sync()
+
+    def set_hover_shadow(self, blur_radius, color):
+        """
+        Shadow shown when hovered, faded in over the base shadow
+        """
+        self.hover_blur_radius = blur_radius
+        self.hover_color = QColor(color)
+        self.sync()
+
+    def set_hover(self, amount):
+        """
+        Cross-fade towards the hover shadow, amount from 0 to 1
+        """
+        amount = max(0.0, min(1.0, amount))
+        if amount != self.hover:
+            self.hover = amount
+            self.update()
+
+    def set_radius(self, radius):
+        """
+        Corner radius of the shadow shape
+        """
+        if radius != self.radius:
+            self.radius = radius
+            self.update()
+
+    def set_shape_margins(self, margins):
+        """
+        Inset of the shadow shape from the target geometry
+        """
+        self.shape_margins = QMargins(margins)
+        self.sync()
+
+    def _extent(self):
+        blur = self.blur_radius
+        if self.hover_blur_radius is not None:
+            blur = max(blur, self.hover_blur_radius)
+        return math.ceil(blur)
+
+    def _shape_rect(self):
+        return self.target.geometry().marginsRemoved(self.shape_margins)
+
+    def sync(self):
+        """
+        Follow the target's parent, geometry, visibility and stacking
+        """
+        parent = self.target.parentWidget()
+        if parent is not self.parentWidget():
+            self.setParent(parent)
+        if parent is None:
+            return
+
+        extent = self._extent()
+        shape = self._shape_rect()
+        offset = self.offset.toPoint()
+        self.setGeometry(shape.translated(offset).adjusted(-extent, -extent, extent, extent))
+
+        self.setVisible(self.target.isVisibleTo(parent))
+        self.stackUnder(self.target)
+
+    def eventFilter(self, obj, event):
+        if obj is self.target and event.type() in (QEvent.Type.Move, QEvent.Type.Resize, QEvent.Type.Show,
+                                                   QEvent.Type.Hide, QEvent.Type.ParentChange):
+            self.sync()
+        return False
+
+    def paintEvent(self, event):
+        """
+        Composite the base and hover shadows
+        """
+        shape = self._shape_rect().translated(self.offset.toPoint() - self.pos())
+        ratio = self.devicePixelRatioF()
+        cache = shadow_cache()
+
+        painter = QPainter(self)
+        if self.hover < 1.0 or self.hover_color is None:
+            painter.setOpacity(1.0 - self.hover if self.hover_color is not None else 1.0)
+            cache.draw(painter, shape, self.radius, self.blur_radius, self.color, ratio)
+        if self.hover > 0.0 and self.hover_color is not None:
+            painter.setOpacity(self.hover)
+            cache.draw(painter, shape, self.radius, self.hover_blur_radius, self.hover_color, ratio)
+        painter.end()
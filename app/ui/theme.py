@@ -0,0 +1,597 @@
+from PyQt6.QtCore import QObject, QEvent
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Application-wide style sheet. Widgets are addressed by class name and
+# objectName; state is carried in dynamic properties (provider, role, error)
+# and refreshed with set_state() instead of replacing per-widget sheets.
+#
+# Painted decorations (line edit borders, drop shadow radii) read their
+# values from qproperty-* declarations next to the matching border-radius.
+#
+# Screen scopes use "Screen *" (specificity 1) so that the widget defaults
+# further down, which have the same specificity, take precedence.
+STYLESHEET = """
+/* Main window */
+QMainWindow {
+    background-color: transparent;
+    color: #ffffff;
+}
+
+#mainContainer {
+    background-color: #121212;
+    border-radius: 15px;
+    border: none;
+}
+
+#titleBar, #titleBar QFrame {
+    background-color: #1e1e1e;
+    border-top-left-radius: 15px;
+    border-top-right-radius: 15px;
+    border-bottom: 1px solid #333333;
+}
+
+#titleBar QPushButton {
+    background-color: transparent;
+    color: #cccccc;
+    border: none;
+    font-size: 16px;
+    padding: 5px 10px;
+}
+
+#titleBar QPushButton:hover {
+    background-color: #333333;
+}
+
+#titleBar QPushButton#close_button {
+    border-radius: 10px;
+}
+
+#titleBar QPushButton#close_button:hover {
+    background-color: #e81123;
+    color: white;
+}
+
+#windowTitle {
+    color: #ffffff;
+    font-size: 14px;
+    font-weight: bold;
+}
+
+/* Screen scopes */
+LoginScreen, LoginScreen *,
+RegisterScreen, RegisterScreen *,
+ForgotPasswordScreen, ForgotPasswordScreen * {
+    background-color: transparent;
+    color: #ffffff;
+    font-family: 'Segoe UI', Arial, sans-serif;
+}
+
+DashboardScreen, DashboardScreen * {
+    background-color: #121212;
+    color: #ffffff;
+    font-family: 'Segoe UI', Arial, sans-serif;
+}
+
+/* Widget defaults */
+AnimatedButton {
+    background-color: #3a86ff;
+    color: white;
+    border: none;
+    border-radius: 25px;
+    font-size: 16px;
+    font-weight: bold;
+    padding: 10px 20px;
+    qproperty-shadowRadius: 25;
+}
+
+AnimatedButton:hover {
+    background-color: #4a96ff;
+}
+
+AnimatedButton:pressed {
+    background-color: #2a76ef;
+}
+
+AnimatedButton:disabled {
+    background-color: #555555;
+    color: #aaaaaa;
+}
+
+OAuthButton {
+    background-color: #555555;
+    color: white;
+    border: none;
+    border-radius: 25px;
+    font-size: 16px;
+    font-weight: bold;
+    padding: 10px 20px;
+    text-align: left;
+    padding-left: 50px;
+    qproperty-shadowRadius: 25;
+}
+
+OAuthButton:hover {
+    background-color: #666666;
+}
+
+OAuthButton:pressed {
+    background-color: #444444;
+}
+
+OAuthButton[provider="google"] {
+    background-color: #ffffff;
+    color: #333333;
+}
+
+OAuthButton[provider="google"]:hover {
+    background-color: #f0f0f0;
+}
+
+OAuthButton[provider="google"]:pressed {
+    background-color: #e0e0e0;
+}
+
+OAuthButton[provider="github"] {
+    background-color: #24292e;
+    color: white;
+}
+
+OAuthButton[provider="github"]:hover {
+    background-color: #2f363d;
+}
+
+OAuthButton[provider="github"]:pressed {
+    background-color: #1a1f23;
+}
+
+/* The border is painted by AnimatedLineEdit; the sheet reserves its space
+   and hands over the colors through qproperty-* */
+AnimatedLineEdit {
+    background-color: transparent;
+    color: white;
+    border: 2px solid transparent;
+    border-radius: 10px;
+    padding: 10px 15px;
+    font-size: 16px;
+    qproperty-idleBorderColor: #444444;
+    qproperty-filledBorderColor: #555555;
+    qproperty-focusBorderColor: #3a86ff;
+    qproperty-invalidBorderColor: #ff3333;
+    qproperty-borderRadius: 10;
+}
+
+/* Login screen */
+#loginContentFrame {
+    background-color: transparent;
+    border-radius: 15px;
+    border: none;
+}
+
+#loginTitle {
+    font-size: 24px;
+    font-weight: bold;
+    color: #ffffff;
+    margin-top: 10px;
+    margin-bottom: 15px;
+    text-transform: uppercase;
+    letter-spacing: 1px;
+}
+
+#loginEmail, #loginPassword {
+    background-color: transparent;
+    border: 2px solid transparent;
+    border-radius: 10px;
+    padding: 10px 20px;
+    color: #ffffff;
+    font-size: 15px;
+    margin-bottom: 5px;
+    qproperty-idleBorderColor: #333333;
+    qproperty-borderMargins: rect(0 0 0 5);
+}
+
+#loginEmail:focus, #loginPassword:focus {
+    background-color: #2a2a2a;
+}
+
+#rememberCheckbox {
+    color: #cccccc;
+    font-size: 15px;
+    margin-top: 5px;
+    margin-bottom: 5px;
+}
+
+#rememberCheckbox::indicator {
+    width: 20px;
+    height: 20px;
+    border-radius: 5px;
+    border: 2px solid #555555;
+}
+
+#rememberCheckbox::indicator:checked {
+    background-color: #3a86ff;
+    border: 2px solid #3a86ff;
+    image: url(:/icons/checkmark.svg);
+}
+
+#rememberCheckbox::indicator:hover {
+    border: 2px solid #4a96ff;
+}
+
+#forgotPasswordLink {
+    color: #3a86ff;
+    font-size: 15px;
+    text-decoration: none;
+}
+
+#loginButton {
+    background-color: #3a86ff;
+    color: white;
+    border-radius: 10px;
+    font-size: 16px;
+    font-weight: bold;
+    letter-spacing: 2px;
+    text-transform: uppercase;
+    qproperty-shadowRadius: 10;
+}
+
+#loginButton:hover {
+    background-color: #2a76ef;
+}
+
+#loginButton:pressed {
+    background-color: #1a66df;
+}
+
+#dividerLine {
+    background-color: #444444;
+    min-height: 2px;
+}
+
+#dividerLabel {
+    color: #aaaaaa;
+    font-size: 16px;
+    font-weight: bold;
+    margin: 0 15px;
+}
+
+#googleButton, #githubButton {
+    background-color: #ffffff;
+    color: #333333;
+    border-radius: 10px;
+    font-size: 15px;
+    font-weight: bold;
+    text-align: left;
+    padding-left: 20px;
+    padding-top: 5px;
+    padding-bottom: 5px;
+    border: none;
+    qproperty-shadowRadius: 10;
+}
+
+#googleButton:hover {
+    background-color: #e0e0e0;
+}
+
+#githubButton:hover {
+    background-color: #303030;
+    border: 1px solid #3a86ff;
+}
+
+#googleButton:pressed, #githubButton:pressed {
+    background-color: #202020;
+}
+
+#loginRegisterPrompt {
+    color: #cccccc;
+    font-size: 15px;
+}
+
+#registerLink {
+    color: #3a86ff;
+    font-size: 15px;
+    font-weight: bold;
+    text-decoration: none;
+    margin-left: 8px;
+}
+
+#loginError {
+    color: #ff3333;
+    font-size: 15px;
+    font-weight: bold;
+    min-height: 25px;
+    padding: 5px;
+    background-color: transparent;
+    border-radius: 5px;
+}
+
+/* Register screen */
+#registerContentFrame {
+    background-color: transparent;
+    border-radius: 10px;
+}
+
+#registerTitle {
+    font-size: 28px;
+    font-weight: bold;
+    color: #ffffff;
+    margin-top: 10px;
+    margin-bottom: 20px;
+}
+
+#registerLoginPrompt {
+    color: #cccccc;
+    font-size: 14px;
+}
+
+#registerLoginLink {
+    color: #3a86ff;
+    font-size: 14px;
+    font-weight: bold;
+    text-decoration: none;
+    margin-left: 5px;
+}
+
+#registerError {
+    color: #ff3333;
+    font-size: 14px;
+    min-height: 20px;
+}
+
+#registerFieldHint {
+    color: #ff3333;
+    font-size: 13px;
+    margin-left: 5px;
+}
+
+/* Forgot password screen */
+#forgotPasswordContentFrame {
+    background-color: transparent;
+    border-radius: 15px;
+    border: none;
+}
+
+#forgotPasswordTitle {
+    font-size: 24px;
+    font-weight: bold;
+    color: #ffffff;
+    margin-bottom: 15px;
+}
+
+#forgotPasswordEmail {
+    background-color: #252525;
+    border: 2px solid transparent;
+    border-radius: 10px;
+    padding: 10px 20px;
+    color: #ffffff;
+    font-size: 15px;
+    qproperty-idleBorderColor: #333333;
+}
+
+#forgotPasswordEmail:focus {
+    background-color: #2a2a2a;
+}
+
+#sendRecoveryButton {
+    background-color: #3a86ff;
+    color: white;
+    border-radius: 10px;
+    font-size: 16px;
+    font-weight: bold;
+    qproperty-shadowRadius: 10;
+}
+
+#sendRecoveryButton:hover {
+    background-color: #2a76ef;
+}
+
+#sendRecoveryButton:pressed {
+    background-color: #1a66df;
+}
+
+#backToLoginLink {
+    color: #3a86ff;
+    font-size: 15px;
+    font-weight: bold;
+    text-decoration: none;
+}
+
+#forgotPasswordMessage {
+    font-size: 15px;
+    font-weight: bold;
+    min-height: 25px;
+    padding: 5px;
+    border-radius: 5px;
+}
+
+#forgotPasswordMessage[error="true"] {
+    color: #ff3333;
+    background-color: transparent;
+}
+
+#forgotPasswordMessage[error="false"] {
+    color: #2ecc71;
+    background-color: transparent;
+}
+
+/* Dashboard screen */
+#dashboardContentFrame {
+    background-color: #1a1a1a;
+    border-radius: 15px;
+    border: 1px solid #333333;
+}
+
+#dashboardTitle {
+    font-size: 24px;
+    font-weight: bold;
+    color: #ffffff;
+}
+
+#logoutButton {
+    background-color: #333333;
+    color: white;
+    border-radius: 6px;
+    font-size: 12px;
+    font-weight: bold;
+    text-transform: uppercase;
+    letter-spacing: 1px;
+    qproperty-shadowRadius: 6;
+}
+
+#logoutButton:hover {
+    background-color: #444444;
+}
+
+#logoutButton:pressed {
+    background-color: #555555;
+}
+
+#dashboardAvatar {
+    background-color: #252525;
+    border-radius: 40px;
+    border: 2px solid #3a86ff;
+}
+
+#dashboardUsername {
+    font-size: 18px;
+    font-weight: bold;
+    color: #ffffff;
+}
+
+#dashboardEmail, #roleLabel {
+    font-size: 14px;
+    color: #cccccc;
+}
+
+#roleValue {
+    font-size: 14px;
+    font-weight: bold;
+    color: #ffffff;
+    background-color: transparent;
+    border-radius: 4px;
+    padding: 3px 10px;
+    text-transform: uppercase;
+    letter-spacing: 1px;
+}
+
+#roleValue[role="PRO"] {
+    color: #00cc66;
+    border-radius: 10px;
+    padding: 2px 10px;
+    letter-spacing: 0px;
+}
+
+#roleValue[role="FREE"] {
+    color: #ffaa00;
+    border-radius: 10px;
+    padding: 2px 10px;
+    letter-spacing: 0px;
+}
+
+#dashboardDivider {
+    background-color: #333333;
+}
+
+#planTitle {
+    font-size: 20px;
+    font-weight: bold;
+    color: #ffffff;
+    margin-bottom: 10px;
+}
+
+#planFeatures {
+    font-size: 16px;
+    color: #cccccc;
+    margin-bottom: 20px;
+}
+
+#upgradeButton {
+    background: qlineargradient(x1:0, y1:0, x2:1, y2:0, stop:0 #ff9500, stop:1 #ff3800);
+    color: #ffffff;
+    font-weight: bold;
+    font-size: 16px;
+    border-radius: 8px;
+    text-transform: uppercase;
+    letter-spacing: 1px;
+    qproperty-shadowRadius: 8;
+}
+
+#upgradeButton:hover {
+    background: qlineargradient(x1:0, y1:0, x2:1, y2:0, stop:0 #ffaa00, stop:1 #ff4500);
+}
+
+#upgradeButton:pressed {
+    background: qlineargradient(x1:0, y1:0, x2:1, y2:0, stop:0 #ff8000, stop:1 #ff2000);
+}
+
+#proStatus {
+    font-size: 16px;
+    font-weight: bold;
+    color: #00cc66;
+    margin-bottom: 10px;
+}
+"""
+
+# Number of property-driven re-polishes done through set_state()
+_repolish_count = 0
+
+def apply_theme(app):
+    """
+    Install the application style sheet; parsed once for the whole widget tree
+    """
+    app.setStyleSheet(STYLESHEET)
+    logger.info("Theme applied")
+
+def set_state(widget, name, value):
+    """
+    Set a dynamic style property and re-polish only this widget.
+    Does nothing when the property already has that value.
+    """
+    global _repolish_count
+    if widget.property(name) == value:
+        return False
+
+    widget.setProperty(name, value)
+    style = widget.style()
+    style.unpolish(widget)
+    style.polish(widget)
+    widget.update()
+    _repolish_count += 1
+    return True
+
+def repolish_count():
+    """
+    Re-polishes done through set_state()
+    """
+    return _repolish_count
+
+class PolishCounter(QObject):
+    """
+    Opt-in application event filter that counts style re-polishes:
+    StyleChange events (sent for every widget touched by setStyleSheet)
+    plus property refreshes done through set_state().
+    """
+    def __init__(self, app):
+        super().__init__(app)
+        self.app = app
+        self.style_changes = 0
+        self._repolish_base = _repolish_count
+        app.installEventFilter(self)
+
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Type.StyleChange:
+            self.style_changes += 1
+        return False
+
+    def reset(self):
+        self.style_changes = 0
+        self._repolish_base = _repolish_count
+
+    @property
+    def total(self):
+        return self.style_changes + _repolish_count - self._repolish_base
+
+    def uninstall(self):
+        self.app.removeEventFilter(self)
@@ -0,0 +1,119 @@
+import time
+from PyQt6.QtWidgets import QWidget
+from PyQt6.QtCore import Qt, QEasingCurve
+from PyQt6.QtGui import QPainter
+
+from app.ui.animation import animation_manager
+from app.utils import tracing
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+class ScreenTransition(QWidget):
+    """
+    Cross-fade between two pages of a QStackedWidget using snapshots.
+
+    Both pages are grabbed once into pixmaps and the fade is painted by this
+    overlay on top of the stack, so the live screens are not repainted while
+    it runs. The overlay hides itself when the fade ends.
+    """
+    def __init__(self, stacked_widget, duration=250, parent=None):
+        super().__init__(parent or stacked_widget.parentWidget())
+        self.stacked_widget = stacked_widget
+        self.duration = duration
+        self.progress = 0.0
+        self.from_pixmap = None
+        self.to_pixmap = None
+        self._frame_times = []
+        self._paint_time = 0.0
+        self._span = None
+
+        # Fully covers the stack; nothing underneath needs painting
+        self.setAttribute(Qt.WidgetAttribute.WA_OpaquePaintEvent)
+        self.hide()
+
+    def _snapshot(self):
+        # Grab through the parent so its background is part of the snapshot
+        return self.parentWidget().grab(self.stacked_widget.geometry())
+
+    def change(self, index):
+        """
+        Switch the stack to index, fading from the current page
+        """
+        if self.stacked_widget.currentIndex() == index:
+            return False
+
+        if self._span is not None:
+            self._span.end(interrupted=True)
+        self._span = tracing.begin('ScreenTransition', 'ui', to_index=index)
+
+        if self.duration <= 0 or not self.stacked_widget.isVisible():
+            self.stacked_widget.setCurrentIndex(index)
+            self._span.end(animated=False)
+            self._span = None
+            return True
+
+        # A transition in progress continues from what is on screen now
+        self.from_pixmap = self.grab() if self.isVisible() else self._snapshot()
+        self.hide()
+        self.stacked_widget.setCurrentIndex(index)
+        self.to_pixmap = self._snapshot()
+
+        self.setGeometry(self.stacked_widget.geometry())
+        self.raise_()
+        self.show()
+
+        self.progress = 0.0
+        self._frame_times = [time.perf_counter()]
+        self._paint_time = 0.0
+        animation_manager().animate(self, 'progress', self.set_progress, 0.0, 1.0, self.duration,
+                                    QEasingCurve.Type.OutCubic, on_finished=self.finish)
+        return True
+
+    def set_progress(self, progress):
+        self.progress = progress
+        self._frame_times.append(time.perf_counter())
+        self.update()
+
+    def finish(self):
+        """
+        Drop the snapshots and uncover the live page
+        """
+        self.hide()
+        self.from_pixmap = None
+        self.to_pixmap = None
+        if self._span is not None:
+            self._span.end(frames=len(self._frame_times) - 1)
+            self._span = None
+        self._log_frames()
+
+    def _log_frames(self):
+        intervals = [b - a for a, b in zip(self._frame_times, self._frame_times[1:])]
+        if not intervals:
+            return
+        total = self._frame_times[-1] - self._frame_times[0]
+        logger.info(
+            "Screen transition: %d frames in %.0f ms (%.1f fps), mean interval %.1f ms, "
+            "max interval %.1f ms, paint %.1f ms",
+            len(intervals), total * 1000, len(intervals) / total if total else 0,
+            sum(intervals) / len(intervals) * 1000, max(intervals) * 1000, self._paint_time * 1000
+        )
+
+    def paintEvent(self, event):
+        """
+        Paint the outgoing snapshot, then the incoming one on top
+        """
+        if self.from_pixmap is None or self.to_pixmap is None:
+            return
+        started = time.perf_counter()
+
+        painter = QPainter(self)
+        painter.setCompositionMode(QPainter.CompositionMode.CompositionMode_Source)
+        painter.drawPixmap(0, 0, self.from_pixmap)
+        painter.setCompositionMode(QPainter.CompositionMode.CompositionMode_SourceOver)
+        painter.setOpacity(self.progress)
+        painter.drawPixmap(0, 0, self.to_pixmap)
+        painter.end()
+
+        self._paint_time += time.perf_counter() - started
@@ -1,101 +1,198 @@
-from PyQt6.QtWidgets import QLineEdit, QGraphicsDropShadowEffect
-from PyQt6.QtCore import Qt, QPropertyAnimation, QEasingCurve, pyqtProperty
-from PyQt6.QtGui import QColor
+from PyQt6.QtWidgets import QLineEdit
+from PyQt6.QtCore import Qt, QMargins, QPointF, QRect, QRectF, pyqtProperty
+from PyQt6.QtGui import QColor, QPainter, QPen
+
+from app.ui.animation import animation_manager
+from app.ui.shadow import DropShadow
 
 class AnimatedLineEdit(QLineEdit):
+    """
+    Line edit with an animated border.
+
+    The border is painted in paintEvent, so an animation frame is a plain
+    repaint. Its colors come from the theme through qproperty-* rules
+    (idleBorderColor, filledBorderColor, focusBorderColor, invalidBorderColor,
+    borderRadius, borderMargins); the style sheet itself only reserves a
+    transparent border.
+    """
+    BORDER_WIDTH = 2
+
     def __init__(self, parent=None):
+        # Defaults until the theme polishes the widget
+        self._idle_border_color = QColor(68, 68, 68)  # #444444
+        self._filled_border_color = QColor(85, 85, 85)  # #555555
+        self._focus_border_color = QColor(58, 134, 255)  # #3a86ff
+        self._invalid_border_color = QColor(255, 51, 51)  # #ff3333
+        self._border_radius = 10.0
+        self._border_margins = QRect()
+        self._border_color = QColor(self._idle_border_color)
+
+        # Focus and validation state
+        self.is_focused = False
+        self.is_invalid = False
+
         super().__init__(parent)
         self.setup_ui()
-        
-        # Focus state
-        self.is_focused = False
-        
+
         # Connect signals
         self.textChanged.connect(self.on_text_changed)
-    
+
     def setup_ui(self):
-        # Set line edit style
-        self.setStyleSheet("""
-            QLineEdit {
-                background-color: transparent;
-                color: white;
-                border: 2px solid #444444;
-                border-radius: 10px;
-                padding: 10px 15px;
-                font-size: 16px;
-            }
-            
-            QLineEdit:focus {
-                border: 2px solid #3a86ff;
-            }
-        """)
-        
-        # Add drop shadow effect
-        shadow = QGraphicsDropShadowEffect(self)
-        shadow.setBlurRadius(10)
-        shadow.setColor(QColor(0, 0, 0, 50))
-        shadow.setOffset(0, 2)
-        self.setGraphicsEffect(shadow)
-        
-        # Create focus animation
-        self._border_color = QColor(68, 68, 68)  # #444444
-        self.border_animation = QPropertyAnimation(self, b"border_color")
-        self.border_animation.setDuration(200)
-        self.border_animation.setEasingCurve(QEasingCurve.Type.OutCubic)
-    
+        # Add drop shadow
+        self.drop_shadow = DropShadow(self, 10, QColor(0, 0, 0, 50), QPointF(0, 2))
+        self.drop_shadow.set_radius(self._border_radius)
+
+    def target_border_color(self):
+        """
+        Border color for the current validation, focus and content state
+        """
+        if self.is_invalid:
+            return self._invalid_border_color
+        if self.is_focused:
+            return self._focus_border_color
+        if self.text():
+            return self._filled_border_color
+        return self._idle_border_color
+
+    def update_border(self, animate=True):
+        """
+        Move the border towards the color for the current state.
+        Returns False when it is already there or already heading there.
+        """
+        target = self.target_border_color()
+        manager = animation_manager()
+        running_to = manager.target(self, 'border_color')
+
+        if running_to is not None and running_to == target:
+            return False
+        if running_to is None and self._border_color == target:
+            return False
+
+        if not animate or not self.isVisible():
+            manager.stop(self, 'border_color')
+            self.set_border_color(QColor(target))
+            return True
+
+        manager.animate(self, 'border_color', self.set_border_color, self._border_color, QColor(target), 200)
+        return True
+
+    def set_invalid(self, invalid):
+        """
+        Mark the content as invalid (or valid again) by the border color
+        """
+        if self.is_invalid == invalid:
+            return
+        self.is_invalid = invalid
+        self.update_border()
+
     def focusInEvent(self, event):
         """
         Handle focus in event
         """
         self.is_focused = True
-        self.border_animation.setStartValue(self._border_color)
-        self.border_animation.setEndValue(QColor(58, 134, 255))  # #3a86ff
-        self.border_animation.start()
+        self.update_border()
         super().focusInEvent(event)
-    
+
     def focusOutEvent(self, event):
         """
         Handle focus out event
         """
         self.is_focused = False
-        self.border_animation.setStartValue(self._border_color)
-        self.border_animation.setEndValue(QColor(68, 68, 68))  # #444444
-        self.border_animation.start()
+        self.update_border()
         super().focusOutEvent(event)
-    
+
     def on_text_changed(self, text):
         """
         Handle text changed event
         """
-        # Update border color based on content
-        if text and not self.is_focused:
-            self.border_animation.setStartValue(self._border_color)
-            self.border_animation.setEndValue(QColor(85, 85, 85))  # #555555
-            self.border_animation.start()
-        elif not text and not self.is_focused:
-            self.border_animation.setStartValue(self._border_color)
-            self.border_animation.setEndValue(QColor(68, 68, 68))  # #444444
-            self.border_animation.start()
-    
+        # Update border color based on content; a no-op while typing
+        if not self.is_focused:
+            self.update_border()
+
+    def paintEvent(self, event):
+        """
+        Paint the line edit, then its border on top
+        """
+        super().paintEvent(event)
+
+        margins = self._border_margins
+        inset = self.BORDER_WIDTH / 2
+        rect = QRectF(self.rect()).adjusted(margins.left() + inset, margins.top() + inset,
+                                            -margins.width() - inset, -margins.height() - inset)
+        radius = max(0.0, self._border_radius - inset)
+
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.setPen(QPen(self._border_color, self.BORDER_WIDTH))
+        painter.setBrush(Qt.BrushStyle.NoBrush)
+        painter.drawRoundedRect(rect, radius, radius)
+        painter.end()
+
     # Border color property for animation
     def get_border_color(self):
         return self._border_color
-    
+
     def set_border_color(self, color):
         self._border_color = color
-        self.setStyleSheet(f"""
-            QLineEdit {{
-                background-color: transparent;
-                color: white;
-                border: 2px solid {color.name()};
-                border-radius: 10px;
-                padding: 10px 15px;
-                font-size: 16px;
-            }}
-            
-            QLineEdit:focus {{
-                border: 2px solid #3a86ff;
-            }}
-        """)
-    
-    border_color = pyqtProperty(QColor, get_border_color, set_border_color)
\ No newline at end of file
+        self.update()
+
+    border_color = pyqtProperty(QColor, get_border_color, set_border_color)
+
+    # Theme properties, set from the style sheet with qproperty-*
+    def get_idle_border_color(self):
+        return self._idle_border_color
+
+    def set_idle_border_color(self, color):
+        self._idle_border_color = QColor(color)
+        self.update_border()
+
+    idleBorderColor = pyqtProperty(QColor, get_idle_border_color, set_idle_border_color)
+
+    def get_filled_border_color(self):
+        return self._filled_border_color
+
+    def set_filled_border_color(self, color):
+        self._filled_border_color = QColor(color)
+        self.update_border()
+
+    filledBorderColor = pyqtProperty(QColor, get_filled_border_color, set_filled_border_color)
+
+    def get_focus_border_color(self):
+        return self._focus_border_color
+
+    def set_focus_border_color(self, color):
+        self._focus_border_color = QColor(color)
+        self.update_border()
+
+    focusBorderColor = pyqtProperty(QColor, get_focus_border_color, set_focus_border_color)
+
+    def get_invalid_border_color(self):
+        return self._invalid_border_color
+
+    def set_invalid_border_color(self, color):
+        self._invalid_border_color = QColor(color)
+        self.update_border()
+
+    invalidBorderColor = pyqtProperty(QColor, get_invalid_border_color, set_invalid_border_color)
+
+    def get_border_radius(self):
+        return self._border_radius
+
+    def set_border_radius(self, radius):
+        self._border_radius = float(radius)
+        self.drop_shadow.set_radius(self._border_radius)
+        self.update()
+
+    borderRadius = pyqtProperty(float, get_border_radius, set_border_radius)
+
+    # Space kept outside the border, e.g. for a margin in the style sheet.
+    # Stored as a QRect holding (left, top, right, bottom): rect(0 0 0 5) in QSS.
+    def get_border_margins(self):
+        return self._border_margins
+
+    def set_border_margins(self, margins):
+        self._border_margins = QRect(margins)
+        self.drop_shadow.set_shape_margins(QMargins(margins.left(), margins.top(), margins.width(), margins.height()))
+        self.update()
+
+    borderMargins = pyqtProperty(QRect, get_border_margins, set_border_margins)
@@ -1,9 +1,21 @@
-import os
-from PyQt6.QtWidgets import QPushButton, QGraphicsDropShadowEffect, QLabel, QHBoxLayout
-from PyQt6.QtCore import Qt, QPropertyAnimation, QEasingCurve, QSize, pyqtProperty
-from PyQt6.QtGui import QColor, QIcon
+from PyQt6.QtWidgets import QPushButton, QLabel, QHBoxLayout
+from PyQt6.QtCore import Qt, QEasingCurve, QSize, QFile, QPointF, pyqtProperty
+from PyQt6.QtGui import QColor
+
+from app.ui.image_registry import image_registry
+from app.ui.animation import animation_manager
+from app.ui.shadow import DropShadow
+from app.ui.widgets.press_effect import PRESSED_SCALE, PRESS_DURATION, paint_scaled_button
 
 class OAuthButton(QPushButton):
+    ICON_SIZE = QSize(24, 24)
+    
+    # Hover shadow color per provider
+    HOVER_SHADOW_COLORS = {
+        "google": QColor(66, 133, 244, 130),
+        "github": QColor(36, 41, 46, 130),
+    }
+    
     def __init__(self, text, provider, parent=None):
         super().__init__(text, parent)
         self.provider = provider
@@ -14,86 +26,17 @@ class OAuthButton(QPushButton):
         self.released.connect(self.on_released)
     
     def setup_ui(self):
-        # Set button style based on provider
-        if self.provider == "google":
-            self.setStyleSheet("""
-                QPushButton {
-                    background-color: #ffffff;
-                    color: #333333;
-                    border: none;
-                    border-radius: 25px;
-                    font-size: 16px;
-                    font-weight: bold;
-                    padding: 10px 20px;
-                    text-align: left;
-                    padding-left: 50px;
-                }
-                
-                QPushButton:hover {
-                    background-color: #f0f0f0;
-                }
-                
-                QPushButton:pressed {
-                    background-color: #e0e0e0;
-                }
-            """)
-        elif self.provider == "github":
-            self.setStyleSheet("""
-                QPushButton {
-                    background-color: #24292e;
-                    color: white;
-                    border: none;
-                    border-radius: 25px;
-                    font-size: 16px;
-                    font-weight: bold;
-                    padding: 10px 20px;
-                    text-align: left;
-                    padding-left: 50px;
-                }
-                
-                QPushButton:hover {
-                    background-color: #2f363d;
-                }
-                
-                QPushButton:pressed {
-                    background-color: #1a1f23;
-                }
-            """)
-        else:
-            self.setStyleSheet("""
-                QPushButton {
-                    background-color: #555555;
-                    color: white;
-                    border: none;
-                    border-radius: 25px;
-                    font-size: 16px;
-                    font-weight: bold;
-                    padding: 10px 20px;
-                    text-align: left;
-                    padding-left: 50px;
-                }
-                
-                QPushButton:hover {
-                    background-color: #666666;
-                }
-                
-                QPushButton:pressed {
-                    background-color: #444444;
-                }
-            """)
+        # Style is picked by the theme from the provider property
+        self.setProperty("provider", self.provider)
         
-        # Add drop shadow effect
-        shadow = QGraphicsDropShadowEffect(self)
-        shadow.setBlurRadius(15)
-        shadow.setColor(QColor(0, 0, 0, 80))
-        shadow.setOffset(0, 5)
-        self.setGraphicsEffect(shadow)
+        # Add drop shadow; hovering fades in the provider colored shadow
+        self.drop_shadow = DropShadow(self, 15, QColor(0, 0, 0, 80), QPointF(0, 5))
+        self.drop_shadow.set_hover_shadow(25, self.HOVER_SHADOW_COLORS.get(self.provider, QColor(85, 85, 85, 130)))
+        self.drop_shadow.set_radius(25)
         
-        # Create hover animation
+        # Hover and press animation state, driven by the shared animation manager
         self._shadow_strength = 0
-        self.shadow_animation = QPropertyAnimation(self, b"shadow_strength")
-        self.shadow_animation.setDuration(200)
-        self.shadow_animation.setEasingCurve(QEasingCurve.Type.OutCubic)
+        self._press_scale = 1.0
         
         # Add provider icon
         self.update_icon()
@@ -103,55 +46,57 @@ class OAuthButton(QPushButton):
         Add provider icon to button
         """
         # Get icon path
-        icon_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))), 
-                               'app', 'assets', 'icons', f"{self.provider}.svg")
+        icon_path = f":/icons/{self.provider}.svg"
         
-        # If icon exists, set it
-        if os.path.exists(icon_path):
-            self.setIcon(QIcon(icon_path))
-            self.setIconSize(QSize(24, 24))
+        # If icon exists, set it (shared, rasterized once per size and DPR)
+        if QFile.exists(icon_path):
+            self.setIcon(image_registry().icon(icon_path, self.ICON_SIZE))
+            self.setIconSize(self.ICON_SIZE)
     
     def enterEvent(self, event):
         """
         Handle mouse enter event
         """
-        self.shadow_animation.setStartValue(self._shadow_strength)
-        self.shadow_animation.setEndValue(100)
-        self.shadow_animation.start()
+        self.animate_shadow(100)
         super().enterEvent(event)
     
     def leaveEvent(self, event):
         """
         Handle mouse leave event
         """
-        self.shadow_animation.setStartValue(self._shadow_strength)
-        self.shadow_animation.setEndValue(0)
-        self.shadow_animation.start()
+        self.animate_shadow(0)
         super().leaveEvent(event)
     
     def on_pressed(self):
         """
         Handle button press
         """
-        # Scale down animation
-        self.scale_animation = QPropertyAnimation(self, b"size")
-        self.scale_animation.setDuration(100)
-        self.scale_animation.setStartValue(self.size())
-        self.scale_animation.setEndValue(QSize(int(self.width() * 0.95), int(self.height() * 0.95)))
-        self.scale_animation.setEasingCurve(QEasingCurve.Type.OutQuad)
-        self.scale_animation.start()
+        # Shrink at paint time; the layout geometry is left alone
+        animation_manager().animate(self, 'press_scale', self.set_press_scale, self._press_scale,
+                                    PRESSED_SCALE, PRESS_DURATION, QEasingCurve.Type.OutQuad)
     
     def on_released(self):
         """
         Handle button release
         """
-        # Scale up animation
-        self.scale_animation = QPropertyAnimation(self, b"size")
-        self.scale_animation.setDuration(100)
-        self.scale_animation.setStartValue(self.size())
-        self.scale_animation.setEndValue(QSize(int(self.width() / 0.95), int(self.height() / 0.95)))
-        self.scale_animation.setEasingCurve(QEasingCurve.Type.OutQuad)
-        self.scale_animation.start()
+        animation_manager().animate(self, 'press_scale', self.set_press_scale, self._press_scale,
+                                    1.0, PRESS_DURATION, QEasingCurve.Type.OutQuad)
+    
+    def paintEvent(self, event):
+        """
+        Paint normally, or scaled about the center while pressed
+        """
+        if self._press_scale >= 1.0:
+            super().paintEvent(event)
+        else:
+            paint_scaled_button(self, self._press_scale)
+    
+    def animate_shadow(self, strength):
+        """
+        Animate the hover shadow towards strength (0-100)
+        """
+        animation_manager().animate(self, 'shadow_strength', self.set_shadow_strength,
+                                    self._shadow_strength, strength, 200)
     
     # Shadow strength property for animation
     def get_shadow_strength(self):
@@ -159,16 +104,25 @@ class OAuthButton(QPushButton):
     
     def set_shadow_strength(self, value):
         self._shadow_strength = value
-        shadow = self.graphicsEffect()
-        if shadow:
-            shadow.setBlurRadius(15 + value / 10)
-            
-            # Set shadow color based on provider
-            if self.provider == "google":
-                shadow.setColor(QColor(66, 133, 244, 80 + int(value / 2)))
-            elif self.provider == "github":
-                shadow.setColor(QColor(36, 41, 46, 80 + int(value / 2)))
-            else:
-                shadow.setColor(QColor(85, 85, 85, 80 + int(value / 2)))
-    
-    shadow_strength = pyqtProperty(float, get_shadow_strength, set_shadow_strength)
\ No newline at end of file
+        self.drop_shadow.set_hover(value / 100)
+    
+    shadow_strength = pyqtProperty(float, get_shadow_strength, set_shadow_strength)
+    
+    # Paint-time scale for the press effect
+    def get_press_scale(self):
+        return self._press_scale
+    
+    def set_press_scale(self, value):
+        self._press_scale = value
+        self.update()
+    
+    press_scale = pyqtProperty(float, get_press_scale, set_press_scale)
+    
+    # Shadow corner radius, set from the style sheet with qproperty-shadowRadius
+    def get_shadow_radius(self):
+        return self.drop_shadow.radius
+    
+    def set_shadow_radius(self, radius):
+        self.drop_shadow.set_radius(radius)
+    
+    shadowRadius = pyqtProperty(float, get_shadow_radius, set_shadow_radius)
\ No newline at end of file
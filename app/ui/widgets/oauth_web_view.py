@@ -0,0 +1,105 @@
+"""
+The embedded OAuth browser window.
+
+Importing this module loads Qt WebEngine, which costs more than the rest
+of startup together; only app.ui.embedded_oauth imports it, on demand.
+"""
+from PyQt6.QtCore import QUrl, pyqtSignal
+from PyQt6.QtWidgets import QDialog, QVBoxLayout
+from PyQt6.QtWebEngineCore import QWebEnginePage, QWebEngineProfile
+from PyQt6.QtWebEngineWidgets import QWebEngineView
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+PROFILE_NAME = 'oauth'
+BLANK = QUrl('about:blank')
+
+def persistent_profile(parent=None):
+    """
+    A disk-backed profile, so the provider's cookies outlive the window and
+    the app and a returning user is not asked to sign in at Google again
+    """
+    profile = QWebEngineProfile(PROFILE_NAME, parent)
+    profile.setPersistentCookiesPolicy(QWebEngineProfile.PersistentCookiesPolicy.ForcePersistentCookies)
+    logger.debug("OAuth web profile stored in %s", profile.persistentStoragePath())
+    return profile
+
+class RedirectInterceptingPage(QWebEnginePage):
+    """
+    Page that hands navigations to redirect_prefix to the app instead of
+    loading them, whether they are links or server redirects
+    """
+    redirected = pyqtSignal(str)
+
+    def __init__(self, profile, redirect_prefix, parent=None):
+        super().__init__(profile, parent)
+        self.redirect_prefix = redirect_prefix
+
+    def acceptNavigationRequest(self, url, navigation_type, is_main_frame):
+        target = url.toString()
+        if target.startswith(self.redirect_prefix):
+            self.redirected.emit(target)
+            return False
+        return super().acceptNavigationRequest(url, navigation_type, is_main_frame)
+
+class OAuthWebView(QDialog):
+    """
+    Window showing the provider's sign-in pages. It is hidden, not closed,
+    between attempts and starts its renderer process on construction, so
+    every sign-in after the first (or after a prewarm) opens at once.
+    """
+    # The redirect URL with the authorization code or the provider's error
+    redirected = pyqtSignal(str)
+    # Closed by the user before the provider redirected back
+    dismissed = pyqtSignal()
+
+    def __init__(self, redirect_prefix, parent=None):
+        super().__init__(parent)
+        self.setObjectName("oauthWebView")
+        self.setWindowTitle("Sign in")
+        self.resize(480, 640)
+
+        # Created before the profile so that, as children are deleted in
+        # order, the page goes first; WebEngine warns about the reverse
+        self.view = QWebEngineView(self)
+        self.profile = persistent_profile(self)
+        self.page = RedirectInterceptingPage(self.profile, redirect_prefix, self.view)
+        self.page.redirected.connect(self.on_redirected)
+        self.view.setPage(self.page)
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addWidget(self.view)
+
+        # Start the renderer process now rather than on the first sign-in
+        self.view.setUrl(BLANK)
+
+    def sign_in(self, url):
+        """
+        Show the window on the provider's authorize URL
+        """
+        self.view.setUrl(QUrl(url))
+        self.show()
+        self.raise_()
+        self.activateWindow()
+
+    def abandon(self):
+        """
+        Hide the window without reporting a dismissal
+        """
+        self.hide()
+        self.view.setUrl(BLANK)
+
+    def on_redirected(self, url):
+        self.abandon()
+        self.redirected.emit(url)
+
+    def reject(self):
+        # Escape or the window's close button
+        was_visible = self.isVisible()
+        super().reject()
+        self.view.setUrl(BLANK)
+        if was_visible:
+            self.dismissed.emit()
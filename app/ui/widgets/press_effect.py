@@ -0,0 +1,28 @@
+from PyQt6.QtCore import QRectF
+from PyQt6.QtGui import QPainter
+from PyQt6.QtWidgets import QStyle, QStyleOptionButton, QStylePainter
+
+# Size of a pressed button relative to its layout geometry
+PRESSED_SCALE = 0.95
+
+# Duration (ms) of the press and release animations
+PRESS_DURATION = 100
+
+def paint_scaled_button(button, scale):
+    """
+    Paint a push button as QPushButton.paintEvent does, scaled about its
+    center. The geometry stays as laid out; the parent shows around it.
+    """
+    painter = QStylePainter(button)
+    painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+    painter.setRenderHint(QPainter.RenderHint.SmoothPixmapTransform)
+
+    center = QRectF(button.rect()).center()
+    painter.translate(center)
+    painter.scale(scale, scale)
+    painter.translate(-center)
+
+    option = QStyleOptionButton()
+    button.initStyleOption(option)
+    painter.drawControl(QStyle.ControlElement.CE_PushButton, option)
+    painter.end()
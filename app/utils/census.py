@@ -0,0 +1,217 @@
+"""
+Live object census for finding leaks over long sessions.
+
+A census counts live QObjects by class: everything reachable from the
+application and its top-level widgets, plus QObjects Python still holds a
+wrapper for. Together with a tracemalloc snapshot it is kept as a Snapshot.
+Comparing snapshots taken at the same point of a repeated flow (e.g. after
+every logout) shows what each cycle leaves behind. A class whose count
+never drops and keeps rising is flagged as growing.
+
+    CS2_LOGIN_CENSUS=1          take snapshots on login/logout and periodically
+    CS2_LOGIN_CENSUS_MS=60000   period of the background snapshots
+
+tools/soak.py drives hundreds of login/logout cycles headless and reports
+the result.
+"""
+import gc
+import os
+import time
+import tracemalloc
+from collections import Counter, deque
+from PyQt6 import sip
+from PyQt6.QtCore import QObject, QTimer
+from PyQt6.QtWidgets import QApplication
+
+from app.utils import metrics
+from app.utils.settings import settings
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+LIVE_QOBJECTS = metrics.gauge('app_live_qobjects', 'QObjects counted by the last census')
+TRACED_MEMORY = metrics.gauge('app_traced_python_bytes', 'Python memory traced by tracemalloc at the last census')
+
+def live_qobjects():
+    """
+    Live QObjects: the object trees of the application, its top-level
+    widgets and every parentless QObject Python holds, plus any other
+    QObject Python holds a wrapper for
+    """
+    app = QApplication.instance()
+    held = [obj for obj in gc.get_objects() if isinstance(obj, QObject) and not sip.isdeleted(obj)]
+
+    roots = [app] if app is not None else []
+    if isinstance(app, QApplication):
+        roots += app.topLevelWidgets()
+    roots += [obj for obj in held if obj.parent() is None]
+
+    found = {}
+    for root in roots:
+        found[sip.unwrapinstance(root)] = root
+        for child in root.findChildren(QObject):
+            found[sip.unwrapinstance(child)] = child
+    for obj in held:
+        found.setdefault(sip.unwrapinstance(obj), obj)
+    return list(found.values())
+
+def qobject_counts():
+    """
+    Live QObjects by class name
+    """
+    return Counter(obj.metaObject().className() for obj in live_qobjects())
+
+class Snapshot:
+    """
+    QObject counts and (when tracing) Python allocations at one moment
+    """
+    def __init__(self, label, counts, memory):
+        self.label = label
+        self.time = time.time()
+        self.counts = counts
+        self.memory = memory
+        self.qobjects = sum(counts.values())
+        self.traced_bytes = sum(stat.size for stat in memory.statistics('filename')) if memory else None
+
+def take_snapshot(label=''):
+    """
+    Census plus a tracemalloc snapshot if tracemalloc is running
+    """
+    gc.collect()
+    memory = None
+    if tracemalloc.is_tracing():
+        # Leave out the bookkeeping of tracemalloc and of the census itself
+        memory = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+        ))
+    return Snapshot(label, qobject_counts(), memory)
+
+def count_diff(before, after):
+    """
+    Per-class change in live QObjects, largest growth first
+    """
+    classes = set(before.counts) | set(after.counts)
+    changes = {name: after.counts.get(name, 0) - before.counts.get(name, 0) for name in classes}
+    return dict(sorted(((name, change) for name, change in changes.items() if change),
+                       key=lambda item: (-item[1], item[0])))
+
+def memory_diff(before, after, limit=10):
+    """
+    Source lines whose traced allocations grew the most between two snapshots
+    """
+    if before.memory is None or after.memory is None:
+        return []
+    growth = []
+    for stat in after.memory.compare_to(before.memory, 'lineno'):
+        if stat.size_diff <= 0:
+            continue
+        frame = stat.traceback[0]
+        growth.append({
+            'location': f"{os.path.relpath(frame.filename)}:{frame.lineno}",
+            'size_diff_kb': round(stat.size_diff / 1024, 1),
+            'count_diff': stat.count_diff,
+        })
+        if len(growth) >= limit:
+            break
+    return growth
+
+def growing_types(snapshots, min_increases=3):
+    """
+    Classes whose count never went down over the snapshots and went up at
+    least min_increases times, with their counts
+    """
+    if len(snapshots) < 2:
+        return {}
+    growing = {}
+    for name in snapshots[-1].counts:
+        series = [snapshot.counts.get(name, 0) for snapshot in snapshots]
+        steps = [b - a for a, b in zip(series, series[1:])]
+        if min(steps) >= 0 and sum(1 for step in steps if step > 0) >= min_increases:
+            growing[name] = series
+    return growing
+
+class ObjectCensus(QObject):
+    """
+    Takes snapshots periodically and at login/logout, and logs what grew
+    since the previous snapshot with the same label
+    """
+    def __init__(self, interval_ms=60000, trace_frames=1, keep=100, parent=None):
+        super().__init__(parent)
+        self.trace_frames = trace_frames
+        self.history = deque(maxlen=keep)
+        self._started_tracing = False
+
+        self._timer = QTimer(self)
+        self._timer.setInterval(interval_ms)
+        self._timer.timeout.connect(lambda: self.snapshot('periodic'))
+
+    def start(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.trace_frames)
+            self._started_tracing = True
+        self.snapshot('start')
+        if self._timer.interval() > 0:
+            self._timer.start()
+        logger.info("Object census started")
+
+    def stop(self):
+        """
+        Take a last snapshot and log what changed over the whole session
+        """
+        self._timer.stop()
+        first, last = self.history[0], self.snapshot('stop')
+        logger.info("Census over the session: %d -> %d QObjects, changes: %s, largest memory growth: %s",
+                    first.qobjects, last.qobjects, count_diff(first, last) or 'none', memory_diff(first, last, 5))
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def watch(self, supabase_service):
+        """
+        Snapshot after every login and logout
+        """
+        supabase_service.auth_state_changed.connect(
+            lambda state: self.snapshot('login' if state.get('user') else 'logout'))
+
+    def labelled(self, label):
+        return [snapshot for snapshot in self.history if snapshot.label == label]
+
+    def snapshot(self, label):
+        """
+        Take a snapshot and log the change since the last one with this label
+        """
+        started = time.perf_counter()
+        previous = self.labelled(label)
+        current = take_snapshot(label)
+        self.history.append(current)
+        LIVE_QOBJECTS.set(current.qobjects)
+        if current.traced_bytes is not None:
+            TRACED_MEMORY.set(current.traced_bytes)
+
+        if previous:
+            changes = count_diff(previous[-1], current)
+            logger.info("Census (%s): %d QObjects, changes since last %s: %s, took %.0f ms",
+                        label, current.qobjects, label, changes or 'none',
+                        (time.perf_counter() - started) * 1000)
+            growing = growing_types(previous + [current])
+            if growing:
+                logger.warning("Census (%s): steadily growing QObject types: %s", label,
+                               {name: series[-1] for name, series in growing.items()})
+        return current
+
+def census_from_settings(parent=None):
+    """
+    Start a census when the census setting is on (CS2_LOGIN_CENSUS); the
+    period comes from census_ms (default 60000)
+    """
+    app_settings = settings()
+    if not app_settings.get('census'):
+        return None
+
+    census = ObjectCensus(app_settings.get('census_ms'), parent=parent)
+    census.start()
+    return census
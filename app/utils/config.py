@@ -1,30 +1,31 @@
-import os
-import sys
-from dotenv import load_dotenv
+from app.utils.settings import settings
 
 def load_config():
     """
-    Load configuration from environment variables
+    Load configuration from the settings (.env, settings file, environment)
     """
-    # Ensure environment variables are loaded
-    load_dotenv()
-    
+    app_settings = settings()
+    if not app_settings.loaded:
+        app_settings.load()
+
     # Get Supabase configuration
-    supabase_url = os.getenv('SUPABASE_URL')
-    supabase_key = os.getenv('SUPABASE_KEY')
-    
+    supabase_url = app_settings.get('supabase_url')
+    supabase_key = app_settings.get('supabase_key')
+
     # If configuration is missing, use demo values
     if not supabase_url or not supabase_key:
         print("WARNING: Supabase configuration is missing in .env file.")
         print("Using DEMO MODE with limited functionality.")
         print("To use full functionality, create a .env file with SUPABASE_URL and SUPABASE_KEY.")
         print("")
-        
+
         # Demo values for testing - these won't connect to a real Supabase instance
         supabase_url = "https://demo.supabase.co"
         supabase_key = "demo-anon-key"
-    
+
     return {
         'supabase_url': supabase_url,
-        'supabase_key': supabase_key
-    }
\ No newline at end of file
+        'supabase_key': supabase_key,
+        'transition_duration_ms': app_settings.get('transition_duration_ms'),
+        'oauth_embedded': app_settings.get('oauth_embedded')
+    }
@@ -0,0 +1,165 @@
+"""
+Size-based log rotation with background compression and retention.
+
+The active file is renamed to a timestamped archive when it reaches its size
+limit. That is a single rename on the logging listener thread, with no chain
+of .1 .. .N renames. A separate archiver thread gzips the archive and then
+deletes the oldest archives until they fit the total size and age limits.
+"""
+import glob
+import gzip
+import os
+import queue
+import shutil
+import sys
+import threading
+import time
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
+
+from app.utils.settings import APP_ID
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+def user_log_dir():
+    """
+    Per-user log directory, overridable with CS2_LOGIN_LOG_DIR:
+    %LOCALAPPDATA%\\cs2_login_app\\logs on Windows, ~/Library/Logs/cs2_login_app
+    on macOS and $XDG_STATE_HOME/cs2_login_app/logs elsewhere
+    """
+    override = os.getenv('CS2_LOGIN_LOG_DIR')
+    if override:
+        return os.path.abspath(os.path.expanduser(override))
+    if sys.platform == 'win32':
+        base = os.getenv('LOCALAPPDATA') or os.path.expanduser('~\\AppData\\Local')
+        return os.path.join(base, APP_ID, 'logs')
+    if sys.platform == 'darwin':
+        return os.path.expanduser(os.path.join('~', 'Library', 'Logs', APP_ID))
+    base = os.getenv('XDG_STATE_HOME') or os.path.expanduser(os.path.join('~', '.local', 'state'))
+    return os.path.join(base, APP_ID, 'logs')
+
+class LogArchiver:
+    """
+    Background thread compressing rotated logs and enforcing retention
+    """
+    def __init__(self, base_filename, max_total_bytes=20 * 1024 * 1024, max_age_days=14):
+        self.base_filename = base_filename
+        self.max_total_bytes = max_total_bytes
+        self.max_age = max_age_days * 86400
+        self.compressed = 0
+        self.deleted = 0
+        self._queue = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name='log-archiver', daemon=True)
+        self._thread.start()
+
+        # Leftovers of a previous run that rotated or was compressing on exit
+        for path in glob.glob(self.archive_pattern() + '.tmp'):
+            os.remove(path)
+        for path in self.archives(compressed=False):
+            self.submit(path)
+        self.submit(None)
+
+    def archive_pattern(self, compressed=True):
+        root, ext = os.path.splitext(self.base_filename)
+        return f"{root}-*{ext}" + ('.gz' if compressed else '')
+
+    def archives(self, compressed=True):
+        return sorted(glob.glob(self.archive_pattern(compressed)))
+
+    def submit(self, path):
+        """
+        Compress path (if given) and apply retention
+        """
+        self._queue.put(path)
+
+    def stop(self, timeout=5.0):
+        """
+        Finish the queued work and stop the thread
+        """
+        self._queue.put(StopIteration)
+        self._thread.join(timeout)
+
+    def _run(self):
+        while True:
+            path = self._queue.get()
+            if path is StopIteration:
+                return
+            try:
+                if path is not None:
+                    self._compress(path)
+                self._prune()
+            except OSError as e:
+                logger.warning("Log archiving failed for %s: %s", path, e)
+
+    def _compress(self, path):
+        tmp_path = path + '.gz.tmp'
+        with open(path, 'rb') as source, gzip.open(tmp_path, 'wb') as target:
+            shutil.copyfileobj(source, target, 1024 * 1024)
+        # Keep the rotation time, retention goes by it
+        stat = os.stat(path)
+        os.utime(tmp_path, (stat.st_atime, stat.st_mtime))
+        os.replace(tmp_path, path + '.gz')
+        os.remove(path)
+        self.compressed += 1
+
+    def _prune(self):
+        now = time.time()
+        entries = []
+        for path in self.archives():
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((path, stat.st_mtime, stat.st_size))
+
+        # Newest first (archive names sort by rotation time); everything past
+        # the size budget or too old goes
+        total = 0
+        for path, mtime, size in sorted(entries, reverse=True):
+            total += size
+            if total > self.max_total_bytes or now - mtime > self.max_age:
+                os.remove(path)
+                self.deleted += 1
+
+class CompressingRotatingFileHandler(RotatingFileHandler):
+    """
+    RotatingFileHandler that rotates to timestamped archives gzipped in the
+    background, with total size and age retention instead of a backup count
+    """
+    def __init__(self, filename, max_bytes=1024 * 1024, max_total_bytes=20 * 1024 * 1024,
+                 max_age_days=14, encoding='utf-8'):
+        super().__init__(filename, maxBytes=max_bytes, encoding=encoding)
+        self.archiver = LogArchiver(self.baseFilename, max_total_bytes, max_age_days)
+        self.rotations = 0
+
+    def shouldRollover(self, record):
+        # Checked after the fact from the file position, so records are
+        # formatted once instead of a second time to measure them
+        return bool(self.maxBytes) and self.stream is not None and self.stream.tell() >= self.maxBytes
+
+    def archive_name(self):
+        root, ext = os.path.splitext(self.baseFilename)
+        stamp = datetime.now().strftime('%Y%m%d-%H%M%S-%f')
+        name = f"{root}-{stamp}{ext}"
+        index = 1
+        while os.path.exists(name) or os.path.exists(name + '.gz'):
+            index += 1
+            name = f"{root}-{stamp}-{index}{ext}"
+        return name
+
+    def doRollover(self):
+        if self.stream:
+            self.stream.close()
+            self.stream = None
+        if os.path.exists(self.baseFilename):
+            archive = self.archive_name()
+            os.replace(self.baseFilename, archive)
+            self.archiver.submit(archive)
+            self.rotations += 1
+        self.stream = self._open()
+
+    def close(self):
+        super().close()
+        self.archiver.stop()
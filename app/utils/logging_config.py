@@ -1,32 +1,275 @@
+import atexit
+import copy
+import json
 import logging
 import os
-from logging.handlers import RotatingFileHandler
+import queue
+import threading
+import time
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
 
-def setup_logging():
+from app.utils import metrics
+from app.utils.log_rotation import CompressingRotatingFileHandler, user_log_dir
+from app.utils.rate_limit import RateLimiter
+from app.utils.settings import settings
+
+# Every module logs through a child of this logger (app.ui..., app.services...)
+APP_LOGGER = 'app'
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# Record attributes that are not user-supplied extras
+_RECORD_ATTRIBUTES = frozenset(vars(logging.makeLogRecord({}))) | {'message', 'asctime'}
+
+# Argument types that cannot change between enqueueing and formatting
+_IMMUTABLE_TYPES = (str, int, float, bool, type(None), bytes)
+
+SUPPRESSED_RECORDS = metrics.counter('app_log_records_suppressed_total',
+                                     'Log records dropped by the storm filter', ('reason',))
+
+_listener = None
+_queue_handler = None
+
+def _immutable_args(args):
+    values = args.values() if isinstance(args, dict) else args
+    return all(isinstance(arg, _IMMUTABLE_TYPES) for arg in values)
+
+class JsonFormatter(logging.Formatter):
     """
-    Set up logging for the application
+    One JSON object per line; extra fields passed to a log call are included
     """
-    # Create logs directory if it doesn't exist
-    if not os.path.exists('logs'):
-        os.makedirs('logs')
+    def format(self, record):
+        entry = {
+            'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'thread': record.threadName,
+            'message': record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        if record.stack_info:
+            entry['stack'] = self.formatStack(record.stack_info)
+        return json.dumps(entry, default=str)
 
-    # Create a logger
-    logger = logging.getLogger('cs2_tool_logger')
-    logger.setLevel(logging.DEBUG)
+class LazyQueueHandler(QueueHandler):
+    """
+    Hand records to the listener thread without formatting them.
+
+    The stock QueueHandler renders the message on the calling thread. Here
+    only records whose arguments could be mutated before the listener gets to
+    them are rendered early; everything else is merged and formatted on the
+    listener thread.
+    """
+    def prepare(self, record):
+        record = copy.copy(record)
+        if record.args and not _immutable_args(record.args):
+            record.msg = record.getMessage()
+            record.args = None
+        return record
+
+class LogStormFilter(logging.Filter):
+    """
+    Keep log volume bounded when the same thing fails over and over.
+
+    A record identical to one passed less than ``window`` seconds ago (same
+    logger, level, message and arguments) is dropped and counted. On top of
+    that every logger gets a token bucket of ``burst`` records refilled at
+    ``rate`` per second. Dropped records are reported as one summary record
+    per message or logger once the window has passed, or on flush(). CRITICAL
+    records always pass.
+    """
+    def __init__(self, window=10.0, rate=10.0, burst=50, clock=time.monotonic):
+        super().__init__()
+        self.window = window
+        self.limiter = RateLimiter(rate, burst, clock)
+        self.sink = None
+        self._clock = clock
+        self._recent = {}
+        self._rate_dropped = {}
+        self._next_sweep = clock() + window
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def _key(record):
+        if not record.args or (isinstance(record.args, tuple) and _immutable_args(record.args)):
+            return (record.name, record.levelno, record.msg, record.args)
+        # Objects such as exceptions compare by identity; go by the text
+        return (record.name, record.levelno, record.getMessage(), None)
+
+    def filter(self, record):
+        if getattr(record, 'storm_summary', False) or record.levelno >= logging.CRITICAL:
+            return True
+
+        now = self._clock()
+        key = self._key(record)
+        with self._lock:
+            if now >= self._next_sweep:
+                self._sweep(now)
+
+            entry = self._recent.get(key)
+            if entry is not None and now - entry[0] < self.window:
+                entry[1] += 1
+                entry[2] = record
+                SUPPRESSED_RECORDS.inc(reason='duplicate')
+                return False
+
+            if not self.limiter.try_acquire(record.name):
+                dropped = self._rate_dropped.setdefault(record.name, [0, record])
+                dropped[0] += 1
+                SUPPRESSED_RECORDS.inc(reason='rate_limit')
+                return False
+
+            if entry is not None and entry[1]:
+                self._summarize(entry)
+            self._recent[key] = [now, 0, None, record.created]
+        return True
+
+    def _sweep(self, now, everything=False):
+        for key, entry in list(self._recent.items()):
+            if everything or now - entry[0] >= self.window:
+                del self._recent[key]
+                if entry[1]:
+                    self._summarize(entry)
 
-    # Create a rotating file handler
-    handler = RotatingFileHandler('logs/app.log', maxBytes=1024 * 1024, backupCount=5)
-    handler.setLevel(logging.DEBUG)
+        for name, (count, record) in list(self._rate_dropped.items()):
+            del self._rate_dropped[name]
+            self._emit(record, logging.WARNING, "Rate limit dropped %d records from %s",
+                       (count, name), count)
+        self._next_sweep = now + self.window
+
+    def _summarize(self, entry):
+        count, record, first_created = entry[1:]
+        self._emit(record, record.levelno, "%s (repeated %d more times over %.1f s)",
+                   (record.getMessage(), count, record.created - first_created), count)
+
+    def _emit(self, record, level, msg, args, count):
+        if self.sink is None:
+            return
+        summary = logging.makeLogRecord({
+            'name': record.name,
+            'levelno': level,
+            'levelname': logging.getLevelName(level),
+            'msg': msg,
+            'args': args,
+            'pathname': record.pathname,
+            'lineno': record.lineno,
+            'funcName': record.funcName,
+            'storm_summary': True,
+            'suppressed': count,
+        })
+        self.sink(summary)
+
+    def flush(self):
+        """
+        Report everything suppressed so far
+        """
+        with self._lock:
+            self._sweep(self._clock(), everything=True)
+
+class LogListener(QueueListener):
+    """
+    QueueListener on a named daemon thread
+    """
+    def start(self):
+        self._thread = threading.Thread(target=self._monitor, name='log-listener', daemon=True)
+        self._thread.start()
+
+def setup_logging(log_format=None, log_dir=None):
+    """
+    Set up logging for the application.
+
+    Log calls only put the record on a queue; a listener thread formats it
+    and writes the file and console output. The format is plain text, or one
+    JSON object per line with the log_format setting (CS2_LOGIN_LOG_FORMAT)
+    set to json. The file goes to the per-user log directory and is rotated
+    and compressed in the background. The console level and the rotation
+    limits follow the settings while running.
+    """
+    global _listener, _queue_handler
+    if _listener is not None:
+        return _listener
+
+    app_settings = settings()
+    log_format = (log_format or app_settings.get('log_format')).lower()
+    formatter = JsonFormatter() if log_format == 'json' else logging.Formatter(TEXT_FORMAT)
+
+    # Create logs directory if it doesn't exist
+    log_dir = log_dir or user_log_dir()
+    os.makedirs(log_dir, exist_ok=True)
+
+    # Rotates at log_max_kb (1 MB); archives are kept up to log_total_mb
+    # (20 MB) in total and log_max_age_days (14)
+    file_handler = CompressingRotatingFileHandler(
+        os.path.join(log_dir, 'app.log'),
+        max_bytes=app_settings.get('log_max_kb') * 1024,
+        max_total_bytes=app_settings.get('log_total_mb') * 1024 * 1024,
+        max_age_days=app_settings.get('log_max_age_days'))
+    file_handler.setLevel(logging.DEBUG)
+    file_handler.setFormatter(formatter)
 
     # Create a console handler
     console_handler = logging.StreamHandler()
-    console_handler.setLevel(logging.INFO)
-
-    # Create a formatter
-    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-    handler.setFormatter(formatter)
+    console_handler.setLevel(app_settings.get('log_level').upper())
     console_handler.setFormatter(formatter)
 
-    # Add the handlers to the logger
-    logger.addHandler(handler)
-    logger.addHandler(console_handler)
\ No newline at end of file
+    log_queue = queue.SimpleQueue()
+    _listener = LogListener(log_queue, file_handler, console_handler, respect_handler_level=True)
+    _listener.start()
+
+    logger = logging.getLogger(APP_LOGGER)
+    logger.setLevel(logging.DEBUG)
+    _queue_handler = LazyQueueHandler(log_queue)
+    storm_filter = LogStormFilter()
+    storm_filter.sink = _queue_handler.handle
+    _queue_handler.addFilter(storm_filter)
+    logger.addHandler(_queue_handler)
+    logger.propagate = False
+
+    app_settings.changed.connect(_apply_settings)
+    atexit.register(shutdown_logging)
+    logger.debug("Logging to %s", file_handler.baseFilename)
+    return _listener
+
+def _apply_settings(names):
+    """
+    Follow changes to the console level and the rotation limits. The
+    handlers belong to the listener thread, which only reads these values.
+    """
+    if _listener is None:
+        return
+    app_settings = settings()
+    file_handler, console_handler = _listener.handlers
+    if 'log_level' in names:
+        console_handler.setLevel(app_settings.get('log_level').upper())
+    if 'log_max_kb' in names:
+        file_handler.maxBytes = app_settings.get('log_max_kb') * 1024
+    if 'log_total_mb' in names:
+        file_handler.archiver.max_total_bytes = app_settings.get('log_total_mb') * 1024 * 1024
+    if 'log_max_age_days' in names:
+        file_handler.archiver.max_age = app_settings.get('log_max_age_days') * 86400
+
+def shutdown_logging():
+    """
+    Write out queued records and stop the listener thread
+    """
+    global _listener, _queue_handler
+    if _listener is None:
+        return
+    listener, _listener = _listener, None
+    try:
+        settings().changed.disconnect(_apply_settings)
+    except TypeError:
+        pass
+    for log_filter in _queue_handler.filters:
+        if isinstance(log_filter, LogStormFilter):
+            log_filter.flush()
+    logging.getLogger(APP_LOGGER).removeHandler(_queue_handler)
+    _queue_handler = None
+    listener.stop()
+    for handler in listener.handlers:
+        handler.close()
@@ -0,0 +1,379 @@
+"""
+In-process metrics with Prometheus text exposition.
+
+Counters, gauges and log-bucketed histograms are kept in one registry and
+are cheap enough to leave on: an update is a dict lookup and an addition
+under a per-metric lock. Nothing is exported unless asked for:
+
+    CS2_LOGIN_METRICS_FILE=metrics.prom   rewrite the file every few seconds
+    CS2_LOGIN_METRICS_PORT=9464           serve http://127.0.0.1:9464/metrics
+"""
+import abc
+import bisect
+import functools
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from PyQt6.QtCore import Qt, QObject, QTimer
+
+from app.utils.settings import settings
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+def log_buckets(start=0.0005, factor=2.0, count=18):
+    """
+    Exponentially growing bucket bounds; the defaults span 0.5 ms to ~65 s
+    """
+    return tuple(start * factor ** index for index in range(count))
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _format_labels(names, values, extra=None):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(f'{extra[0]}="{extra[1]}"')
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+class _Metric(abc.ABC):
+    type_name = 'untyped'
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    @abc.abstractmethod
+    def _samples(self):
+        """
+        (suffix, label values, extra labels, value) for every sample
+        """
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        for suffix, label_values, extra, value in self._samples():
+            lines.append(f"{self.name}{suffix}{_format_labels(self.labelnames, label_values, extra)} "
+                         f"{_format_value(value)}")
+        return '\n'.join(lines)
+
+class Counter(_Metric):
+    """
+    Monotonically increasing count
+    """
+    type_name = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(self._key(labels), 0)
+
+    def _samples(self):
+        with self._lock:
+            items = list(self._values.items())
+        return [('', key, None, value) for key, value in items]
+
+class Gauge(_Metric):
+    """
+    Value that goes up and down; can be computed at scrape time with set_function
+    """
+    type_name = 'gauge'
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self._function = None
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def set_function(self, function):
+        """
+        Compute the (unlabelled) value when metrics are rendered
+        """
+        self._function = function
+
+    def value(self, **labels):
+        if self._function is not None:
+            return self._function()
+        return self._values.get(self._key(labels), 0)
+
+    def _samples(self):
+        if self._function is not None:
+            return [('', (), None, self._function())]
+        with self._lock:
+            items = list(self._values.items())
+        return [('', key, None, value) for key, value in items]
+
+class Histogram(_Metric):
+    """
+    Distribution over exponentially growing buckets
+    """
+    type_name = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=None):
+        super().__init__(name, documentation, labelnames)
+        self.bounds = tuple(sorted(buckets or log_buckets()))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.bounds, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * (len(self.bounds) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """
+        Observe the duration of the enclosed block in seconds
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def timed(self, **labels):
+        """
+        Decorator observing the duration of every call
+        """
+        def decorate(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.time(**labels):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorate
+
+    def count(self, **labels):
+        state = self._values.get(self._key(labels))
+        return state[2] if state else 0
+
+    def _samples(self):
+        with self._lock:
+            items = [(key, (list(state[0]), state[1], state[2])) for key, state in self._values.items()]
+
+        samples = []
+        for key, (buckets, total, count) in items:
+            cumulative = 0
+            for bound, bucket in zip(self.bounds + (float('inf'),), buckets):
+                cumulative += bucket
+                samples.append(('_bucket', key, ('le', _format_value(float(bound))), cumulative))
+            samples.append(('_sum', key, None, total))
+            samples.append(('_count', key, None, count))
+        return samples
+
+class Registry:
+    """
+    Named metrics; asking twice for the same name returns the same metric
+    """
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, metric_class, name, documentation, labelnames, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = metric_class(name, documentation, labelnames, **kwargs)
+                self._metrics[name] = metric
+            elif not isinstance(metric, metric_class):
+                raise ValueError(f"Metric {name} is already registered as a {metric.type_name}")
+            return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._get_or_create(Counter, name, documentation, labelnames)
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self._get_or_create(Gauge, name, documentation, labelnames)
+
+    def histogram(self, name, documentation, labelnames=(), buckets=None):
+        return self._get_or_create(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def get(self, name):
+        return self._metrics.get(name)
+
+    def render(self):
+        """
+        All metrics in the Prometheus text exposition format
+        """
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda metric: metric.name)
+        return '\n'.join(metric.render() for metric in metrics) + '\n'
+
+REGISTRY = Registry()
+
+def counter(name, documentation, labelnames=()):
+    return REGISTRY.counter(name, documentation, labelnames)
+
+def gauge(name, documentation, labelnames=()):
+    return REGISTRY.gauge(name, documentation, labelnames)
+
+def histogram(name, documentation, labelnames=(), buckets=None):
+    return REGISTRY.histogram(name, documentation, labelnames, buckets)
+
+EVENT_LOOP_LAG = histogram('app_event_loop_lag_seconds', 'Delay of the lag probe timer beyond its interval')
+
+class EventLoopLagProbe(QObject):
+    """
+    Periodic timer measuring how late the GUI event loop delivers it
+    """
+    def __init__(self, interval_ms=500, parent=None):
+        super().__init__(parent)
+        self.interval = interval_ms / 1000.0
+        self._expected = None
+        self._timer = QTimer(self)
+        self._timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self._timer.setInterval(interval_ms)
+        self._timer.timeout.connect(self._probe)
+
+    def start(self):
+        self._expected = time.perf_counter() + self.interval
+        self._timer.start()
+
+    def stop(self):
+        self._timer.stop()
+
+    def _probe(self):
+        now = time.perf_counter()
+        EVENT_LOOP_LAG.observe(max(0.0, now - self._expected))
+        self._expected = now + self.interval
+
+class MetricsFileExporter(QObject):
+    """
+    Rewrite a text exposition file periodically, e.g. for node_exporter's
+    textfile collector
+    """
+    def __init__(self, path, interval_ms=5000, registry=REGISTRY, parent=None):
+        super().__init__(parent)
+        self.path = path
+        self.registry = registry
+        self._timer = QTimer(self)
+        self._timer.setInterval(interval_ms)
+        self._timer.timeout.connect(self.write)
+
+    def start(self):
+        self.write()
+        self._timer.start()
+
+    def stop(self):
+        self._timer.stop()
+        self.write()
+
+    def write(self):
+        tmp_path = self.path + '.tmp'
+        try:
+            with open(tmp_path, 'w') as metrics_file:
+                metrics_file.write(self.registry.render())
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.error("Could not write metrics to %s: %s", self.path, e)
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    registry = REGISTRY
+
+    def do_GET(self):
+        if self.path.split('?')[0] not in ('/', '/metrics'):
+            self.send_error(404)
+            return
+        body = self.registry.render().encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+class MetricsServer:
+    """
+    Serve /metrics on localhost from a background thread
+    """
+    def __init__(self, port, host='127.0.0.1'):
+        self.server = ThreadingHTTPServer((host, port), _MetricsHandler)
+        self.server.daemon_threads = True
+        self._thread = threading.Thread(target=self.server.serve_forever, name='metrics-server', daemon=True)
+
+    @property
+    def port(self):
+        return self.server.server_address[1]
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+class MetricsExport:
+    """
+    Lag probe plus the exporters configured from the environment
+    """
+    def __init__(self, parts):
+        self.parts = parts
+
+    def stop(self):
+        for part in self.parts:
+            part.stop()
+
+def export_from_settings(parent=None):
+    """
+    Start the lag probe and exporters when the metrics_file or metrics_port
+    setting is set (CS2_LOGIN_METRICS_FILE, CS2_LOGIN_METRICS_PORT); returns
+    a handle to stop them, or None
+    """
+    path = settings().get('metrics_file')
+    port = settings().get('metrics_port')
+    if not path and not port:
+        return None
+
+    parts = [EventLoopLagProbe(parent=parent)]
+    if path:
+        parts.append(MetricsFileExporter(path, parent=parent))
+        logger.info("Writing metrics to %s", path)
+    if port:
+        try:
+            server = MetricsServer(port)
+        except OSError as e:
+            logger.error("Could not serve metrics on port %s: %s", port, e)
+        else:
+            parts.append(server)
+            logger.info("Serving metrics on http://127.0.0.1:%s/metrics", server.port)
+
+    for part in parts:
+        part.start()
+    return MetricsExport(parts)
@@ -0,0 +1,97 @@
+"""
+Token buckets for client-side rate limiting.
+
+A bucket holds up to ``capacity`` tokens and refills at ``rate`` tokens per
+second; an action is allowed when a token can be taken. ``RateLimiter``
+keeps one bucket per key (a logger name, an endpoint, ...).
+"""
+import threading
+import time
+
+class TokenBucket:
+    """
+    Thread-safe token bucket; starts full
+    """
+    def __init__(self, rate, capacity, clock=time.monotonic):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self._clock = clock
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        elapsed = now - self._updated
+        if elapsed > 0:
+            self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+            self._updated = now
+
+    @property
+    def tokens(self):
+        with self._lock:
+            self._refill(self._clock())
+            return self._tokens
+
+    def try_acquire(self, tokens=1):
+        """
+        Take tokens if they are available; returns whether they were
+        """
+        with self._lock:
+            self._refill(self._clock())
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return True
+            return False
+
+    def wait_time(self, tokens=1):
+        """
+        Seconds until tokens will be available (0 if they are now)
+        """
+        with self._lock:
+            self._refill(self._clock())
+            missing = tokens - self._tokens
+            if missing <= 0:
+                return 0.0
+            return missing / self.rate if self.rate > 0 else float('inf')
+
+    def drain(self):
+        """
+        Empty the bucket, e.g. when the server reports its own limit
+        """
+        with self._lock:
+            self._tokens = 0.0
+            self._updated = self._clock()
+
+    def reset(self):
+        """
+        Refill the bucket completely
+        """
+        with self._lock:
+            self._tokens = self.capacity
+            self._updated = self._clock()
+
+class RateLimiter:
+    """
+    One token bucket per key, created on first use
+    """
+    def __init__(self, rate, capacity, clock=time.monotonic):
+        self.rate = rate
+        self.capacity = capacity
+        self._clock = clock
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, key):
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            with self._lock:
+                bucket = self._buckets.get(key)
+                if bucket is None:
+                    bucket = self._buckets[key] = TokenBucket(self.rate, self.capacity, self._clock)
+        return bucket
+
+    def try_acquire(self, key, tokens=1):
+        return self.bucket(key).try_acquire(tokens)
+
+    def wait_time(self, key, tokens=1):
+        return self.bucket(key).wait_time(tokens)
@@ -0,0 +1,185 @@
+"""
+Compile the app/assets tree into a binary Qt resource bundle.
+
+Writes the same format as ``rcc --binary`` (format version 2), so the
+bundle can be registered with ``QResource.registerResource`` and addressed
+through ``:/`` paths, e.g. ``:/icons/google.svg``. Implemented in pure
+Python because PyQt6 does not ship the rcc tool.
+
+    python -m app.utils.resource_compiler
+"""
+import os
+import struct
+import time
+import zlib
+
+ASSETS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'assets')
+BUNDLE_NAME = 'resources.rcc'
+BUNDLE_PATH = os.path.join(ASSETS_DIR, BUNDLE_NAME)
+
+FORMAT_VERSION = 2
+
+# Node flags
+FLAG_COMPRESSED = 0x01
+FLAG_DIRECTORY = 0x02
+
+# Locale of every entry: QLocale.Territory.AnyTerritory, QLocale.Language.C
+TERRITORY_ANY = 0
+LANGUAGE_C = 1
+
+# Same policy as rcc: compress only when it saves at least 70%
+COMPRESS_THRESHOLD = 70
+COMPRESS_LEVEL = 9
+
+
+def qt_hash(name):
+    """
+    Hash used by QResource to binary-search directory entries
+    """
+    h = 0
+    for (unit,) in struct.iter_unpack('>H', name.encode('utf-16-be')):
+        h = ((h << 4) + unit) & 0xffffffff
+        h ^= (h & 0xf0000000) >> 23
+        h &= 0x0fffffff
+    return h
+
+
+class _Node:
+    def __init__(self, name, path=None):
+        self.name = name
+        self.path = path
+        self.children = {}
+        self.name_offset = 0
+        self.data_offset = 0
+        self.flags = 0 if path else FLAG_DIRECTORY
+        self.mtime_ms = 0
+
+    @property
+    def is_dir(self):
+        return self.path is None
+
+    def sorted_children(self):
+        return sorted(self.children.values(), key=lambda node: qt_hash(node.name))
+
+
+def _collect(source_dir):
+    """
+    Build the node tree for every file under source_dir
+    """
+    root = _Node('')
+    for dir_path, dir_names, file_names in os.walk(source_dir):
+        dir_names.sort()
+        for file_name in sorted(file_names):
+            if file_name == BUNDLE_NAME:
+                continue
+            file_path = os.path.join(dir_path, file_name)
+            parts = os.path.relpath(file_path, source_dir).split(os.sep)
+
+            parent = root
+            for part in parts[:-1]:
+                parent = parent.children.setdefault(part, _Node(part))
+            parent.children[parts[-1]] = _Node(parts[-1], file_path)
+    return root
+
+
+def compile_resources(source_dir, output_path):
+    """
+    Compile every file under source_dir into a binary resource bundle
+    """
+    root = _collect(source_dir)
+
+    # Breadth-first order: children of a directory are stored contiguously,
+    # sorted by hash, as QResource expects
+    ordered = [root]
+    index = 0
+    while index < len(ordered):
+        node = ordered[index]
+        if node.is_dir:
+            ordered.extend(node.sorted_children())
+        index += 1
+
+    names = bytearray()
+    name_offsets = {}
+    data = bytearray()
+
+    for node in ordered[1:]:
+        if node.name not in name_offsets:
+            name_offsets[node.name] = len(names)
+            encoded = node.name.encode('utf-16-be')
+            names += struct.pack('>HI', len(encoded) // 2, qt_hash(node.name)) + encoded
+        node.name_offset = name_offsets[node.name]
+
+        if node.is_dir:
+            continue
+
+        with open(node.path, 'rb') as source_file:
+            payload = source_file.read()
+        node.mtime_ms = int(os.path.getmtime(node.path) * 1000)
+
+        if payload:
+            compressed = zlib.compress(payload, COMPRESS_LEVEL)
+            saved = 100 * (len(payload) - len(compressed) - 4) // len(payload)
+            if saved >= COMPRESS_THRESHOLD:
+                payload = struct.pack('>I', len(payload)) + compressed
+                node.flags |= FLAG_COMPRESSED
+
+        node.data_offset = len(data)
+        data += struct.pack('>I', len(payload)) + payload
+
+    tree = bytearray()
+    positions = {id(node): position for position, node in enumerate(ordered)}
+    for node in ordered:
+        tree += struct.pack('>IH', node.name_offset, node.flags)
+        if node.is_dir:
+            children = node.sorted_children()
+            first_child = positions[id(children[0])] if children else 0
+            tree += struct.pack('>II', len(children), first_child)
+        else:
+            tree += struct.pack('>HHI', TERRITORY_ANY, LANGUAGE_C, node.data_offset)
+        tree += struct.pack('>Q', node.mtime_ms)
+
+    header_size = 20
+    tree_offset = header_size
+    data_offset = tree_offset + len(tree)
+    names_offset = data_offset + len(data)
+    header = b'qres' + struct.pack('>IIII', FORMAT_VERSION, tree_offset, data_offset, names_offset)
+
+    tmp_path = output_path + '.tmp'
+    with open(tmp_path, 'wb') as output_file:
+        output_file.write(header + tree + data + names)
+    os.replace(tmp_path, output_path)
+
+    return output_path
+
+
+def is_stale(source_dir=ASSETS_DIR, output_path=BUNDLE_PATH):
+    """
+    Check whether the bundle is missing or older than any asset. Directory
+    mtimes catch removed and renamed assets, except for the directory the
+    bundle is written to, which writing it touches.
+    """
+    if not os.path.exists(output_path):
+        return True
+
+    built = os.path.getmtime(output_path)
+    bundle_dir = os.path.dirname(os.path.abspath(output_path))
+    for dir_path, dir_names, file_names in os.walk(source_dir):
+        if os.path.abspath(dir_path) != bundle_dir and os.path.getmtime(dir_path) > built:
+            return True
+        for file_name in file_names:
+            if file_name != BUNDLE_NAME and os.path.getmtime(os.path.join(dir_path, file_name)) > built:
+                return True
+    return False
+
+
+def compile_assets():
+    """
+    Regenerate the bundle for app/assets
+    """
+    return compile_resources(ASSETS_DIR, BUNDLE_PATH)
+
+
+if __name__ == '__main__':
+    started = time.perf_counter()
+    path = compile_assets()
+    print(f"Wrote {path} ({os.path.getsize(path)} bytes) in {(time.perf_counter() - started) * 1000:.1f} ms")
@@ -0,0 +1,39 @@
+import os
+import sys
+import logging
+from PyQt6.QtCore import QResource
+
+from app.utils import resource_compiler
+
+logger = logging.getLogger(__name__)
+
+_loaded = False
+
+def bundle_path():
+    """
+    Location of the compiled resource bundle for source and frozen runs
+    """
+    if getattr(sys, 'frozen', False):
+        return os.path.join(sys._MEIPASS, 'app', 'assets', resource_compiler.BUNDLE_NAME)
+    return resource_compiler.BUNDLE_PATH
+
+def load_resources():
+    """
+    Register the compiled asset bundle once so assets resolve through :/ paths.
+    Qt memory-maps the file where the platform allows it.
+    """
+    global _loaded
+    if _loaded:
+        return True
+
+    path = bundle_path()
+
+    # Source checkouts rebuild the bundle when assets changed; frozen builds ship it prebuilt
+    if not getattr(sys, 'frozen', False) and resource_compiler.is_stale():
+        resource_compiler.compile_assets()
+        logger.info("Rebuilt resource bundle: %s", path)
+
+    _loaded = QResource.registerResource(path)
+    if not _loaded:
+        logger.error("Could not register resource bundle: %s", path)
+    return _loaded
@@ -0,0 +1,391 @@
+"""
+Typed application settings with hot reload.
+
+Every tuning knob is declared once in SETTINGS with its type, default,
+bounds and environment variable. Values come from, in rising precedence:
+
+1. the defaults below
+2. the .env file
+3. the per-user settings file, a JSON object of setting names to values
+   (settings.json in user_config_dir(), or the path in CS2_LOGIN_SETTINGS)
+4. the process environment
+
+Settings.watch() follows the .env and settings files; when either changes
+the layers are read again and changed is emitted with the names of the
+settings whose value changed. Components read settings() when they are
+built and connect to changed for the live ones. Settings marked restart
+are only read at startup: a reload keeps their startup value and logs the
+new one as pending until the next launch.
+
+Tracing is not here: CS2_LOGIN_TRACE has to be in the environment before
+the app is imported, see app.utils.tracing.
+"""
+import json
+import os
+import sys
+from dotenv import dotenv_values, find_dotenv
+from PyQt6.QtCore import QFileSystemWatcher, QObject, QTimer, pyqtSignal
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Name of the per-user configuration, log and socket locations
+APP_ID = 'cs2_login_app'
+
+TRUE_WORDS = ('1', 'true', 'yes', 'on')
+FALSE_WORDS = ('', '0', 'false', 'no', 'off')
+
+# Editors save by writing a new file and renaming it over the old one, in
+# several steps; wait for them to settle before reading
+RELOAD_DELAY_MS = 250
+
+class Setting:
+    """
+    Declaration of one setting. kind is bool, int, float or str; choices
+    restricts a str to a fixed set of values.
+    """
+    def __init__(self, name, kind, default, env=None, minimum=None, maximum=None, choices=None,
+                 restart=False, description=''):
+        self.name = name
+        self.kind = kind
+        self.default = default
+        self.env = env
+        self.minimum = minimum
+        self.maximum = maximum
+        self.choices = choices
+        self.restart = restart
+        self.description = description
+
+    def parse(self, raw):
+        """
+        Convert a value from a file or the environment; raises ValueError
+        """
+        if self.kind is bool:
+            if isinstance(raw, bool):
+                return raw
+            word = str(raw).strip().lower()
+            if word in TRUE_WORDS:
+                return True
+            if word in FALSE_WORDS:
+                return False
+            raise ValueError(f"expected a boolean, got {raw!r}")
+
+        if self.kind in (int, float):
+            if isinstance(raw, bool):
+                raise ValueError(f"expected a number, got {raw!r}")
+            value = self.kind(raw.strip() if isinstance(raw, str) else raw)
+            if self.minimum is not None and value < self.minimum:
+                raise ValueError(f"{value} is below the minimum of {self.minimum}")
+            if self.maximum is not None and value > self.maximum:
+                raise ValueError(f"{value} is above the maximum of {self.maximum}")
+            return value
+
+        value = str(raw).strip()
+        if self.choices is not None:
+            value = value.lower()
+            if value not in self.choices:
+                raise ValueError(f"expected one of {', '.join(self.choices)}, got {raw!r}")
+        return value
+
+SETTINGS = [
+    # Connection
+    Setting('supabase_url', str, '', 'SUPABASE_URL', restart=True,
+            description="Supabase project URL; without it the app runs in demo mode"),
+    Setting('supabase_key', str, '', 'SUPABASE_KEY', restart=True,
+            description="Supabase anon key"),
+
+    # Requests
+    Setting('request_timeout', float, 30.0, 'CS2_LOGIN_REQUEST_TIMEOUT', minimum=1, maximum=600,
+            description="Seconds before a background request is abandoned; database requests "
+                        "pick up a change on the next launch"),
+    Setting('oauth_timeout', float, 300.0, 'CS2_LOGIN_OAUTH_TIMEOUT', minimum=10, maximum=3600,
+            description="Seconds the user has to finish signing in at the OAuth provider"),
+    Setting('token_refresh_margin', float, 300.0, 'CS2_LOGIN_TOKEN_REFRESH_MARGIN', minimum=10, maximum=3000,
+            description="Seconds before the access token expires that the session is refreshed"),
+    Setting('worker_threads', int, 4, 'CS2_LOGIN_WORKER_THREADS', minimum=1, maximum=32,
+            description="Threads running auth and database requests"),
+    Setting('username_check_threads', int, 2, 'CS2_LOGIN_USERNAME_CHECK_THREADS', minimum=1, maximum=8,
+            description="Threads checking username availability while registering"),
+
+    # Caches
+    Setting('role_cache_ttl', float, 60.0, 'CS2_LOGIN_ROLE_CACHE_TTL', minimum=0, maximum=86400,
+            description="Seconds a fetched user role is reused; 0 always asks the database"),
+    Setting('username_cache_size', int, 128, 'CS2_LOGIN_USERNAME_CACHE_SIZE', minimum=0, maximum=100000,
+            description="Username availability answers kept"),
+    Setting('image_cache_kb', int, 10240, 'CS2_LOGIN_IMAGE_CACHE_KB', minimum=1024, maximum=1048576,
+            description="Size of the pixmap cache holding icons, logos and shadows"),
+
+    # UI
+    Setting('animations', str, 'full', 'CS2_LOGIN_ANIMATIONS', choices=('full', 'reduced', 'off'),
+            description="full, reduced (half as long, at most 30 fps) or off"),
+    Setting('animation_fps', int, 60, 'CS2_LOGIN_ANIMATION_FPS', minimum=10, maximum=240,
+            description="Frame rate of the shared animation clock"),
+    Setting('transition_duration_ms', int, 250, 'SCREEN_TRANSITION_MS', minimum=0, maximum=5000,
+            description="Screen cross-fade duration; 0 switches screens without a transition"),
+    Setting('error_display_ms', int, 5000, 'CS2_LOGIN_ERROR_DISPLAY_MS', minimum=500, maximum=60000,
+            description="How long error and status messages stay on screen"),
+    Setting('validation_delay_ms', int, 400, 'CS2_LOGIN_VALIDATION_DELAY_MS', minimum=0, maximum=5000,
+            description="Typing pause before a registration field is validated"),
+    Setting('oauth_embedded', bool, True, 'OAUTH_EMBEDDED',
+            description="Sign in with OAuth in an embedded browser window when WebEngine is available"),
+    Setting('oauth_prewarm_idle_ms', int, 2000, 'CS2_LOGIN_OAUTH_PREWARM_IDLE_MS', minimum=0, maximum=600000,
+            description="Idle time on the login screen before the embedded OAuth view is loaded"),
+    Setting('single_instance', bool, True, 'CS2_LOGIN_SINGLE_INSTANCE', restart=True,
+            description="Hand later launches over to the running app instead of starting another"),
+    Setting('token_broker', bool, False, 'CS2_LOGIN_TOKEN_BROKER', restart=True,
+            description="Serve the signed-in user's access token and role to other local CS2 tools"),
+
+    # Logging
+    Setting('log_level', str, 'info', 'CS2_LOGIN_LOG_LEVEL', choices=('debug', 'info', 'warning', 'error'),
+            description="Console log level; the log file always gets everything"),
+    Setting('log_format', str, 'text', 'CS2_LOGIN_LOG_FORMAT', choices=('text', 'json'), restart=True,
+            description="Plain text, or one JSON object per line"),
+    Setting('log_max_kb', int, 1024, 'CS2_LOGIN_LOG_MAX_KB', minimum=16, maximum=1048576,
+            description="Size at which the log file is rotated"),
+    Setting('log_total_mb', int, 20, 'CS2_LOGIN_LOG_TOTAL_MB', minimum=1, maximum=10240,
+            description="Total size of the compressed log archives kept"),
+    Setting('log_max_age_days', int, 14, 'CS2_LOGIN_LOG_MAX_AGE_DAYS', minimum=1, maximum=3650,
+            description="Age after which log archives are deleted"),
+
+    # Diagnostics
+    Setting('watchdog', bool, False, 'CS2_LOGIN_WATCHDOG', restart=True,
+            description="Report GUI thread stalls with the stack of the stalled code"),
+    Setting('watchdog_ms', float, 250.0, 'CS2_LOGIN_WATCHDOG_MS', minimum=10, restart=True,
+            description="Stall threshold of the watchdog"),
+    Setting('census', bool, False, 'CS2_LOGIN_CENSUS', restart=True,
+            description="Count live QObjects and take tracemalloc snapshots"),
+    Setting('census_ms', int, 60000, 'CS2_LOGIN_CENSUS_MS', minimum=1000, restart=True,
+            description="Period of the census"),
+    Setting('metrics_file', str, '', 'CS2_LOGIN_METRICS_FILE', restart=True,
+            description="File the Prometheus metrics are rewritten to every few seconds"),
+    Setting('metrics_port', int, 0, 'CS2_LOGIN_METRICS_PORT', minimum=0, maximum=65535, restart=True,
+            description="Serve the metrics on http://127.0.0.1:<port>/metrics; 0 does not"),
+]
+
+SETTINGS_BY_NAME = {setting.name: setting for setting in SETTINGS}
+
+def user_config_dir():
+    """
+    Per-user configuration directory: %APPDATA%\\cs2_login_app on Windows,
+    ~/Library/Application Support/cs2_login_app on macOS and
+    $XDG_CONFIG_HOME/cs2_login_app elsewhere
+    """
+    if sys.platform == 'win32':
+        base = os.getenv('APPDATA') or os.path.expanduser('~\\AppData\\Roaming')
+        return os.path.join(base, APP_ID)
+    if sys.platform == 'darwin':
+        return os.path.expanduser(os.path.join('~', 'Library', 'Application Support', APP_ID))
+    base = os.getenv('XDG_CONFIG_HOME') or os.path.expanduser(os.path.join('~', '.config'))
+    return os.path.join(base, APP_ID)
+
+def user_settings_path():
+    override = os.getenv('CS2_LOGIN_SETTINGS')
+    if override:
+        return os.path.abspath(os.path.expanduser(override))
+    return os.path.join(user_config_dir(), 'settings.json')
+
+class Settings(QObject):
+    """
+    The current value of every setting and where it came from.
+
+    Until load() is called only the defaults are set, which is what
+    benchmarks and tools that never load get.
+    """
+    # frozenset of the names whose value changed
+    changed = pyqtSignal(object)
+
+    def __init__(self, env_file=None, user_file=None, environ=None, parent=None):
+        super().__init__(parent)
+        self.env_file = env_file
+        self.user_file = user_file
+        self.environ = os.environ if environ is None else environ
+        self.loaded = False
+        self._values = {setting.name: setting.default for setting in SETTINGS}
+        self._sources = {setting.name: 'default' for setting in SETTINGS}
+        # New values of restart settings, applied on the next launch
+        self._pending = {}
+        # Last readable contents of each file, kept while one is half-written
+        self._layers = {'.env': {}, 'settings file': {}}
+        self._dotenv_initial = None
+        self._watcher = None
+        self._reload_timer = None
+
+    def get(self, name):
+        return self._values[name]
+
+    def __getitem__(self, name):
+        return self._values[name]
+
+    def source(self, name):
+        """
+        'default', '.env', 'settings file' or 'environment'
+        """
+        return self._sources[name]
+
+    def as_dict(self):
+        return dict(self._values)
+
+    def load(self):
+        """
+        Read the .env and settings files and the environment; returns the
+        names of the settings whose value changed. After the first load,
+        restart settings keep their value and a new one is only pending.
+        """
+        if self.env_file is None:
+            self.env_file = find_dotenv(usecwd=True) or os.path.abspath('.env')
+        if self.user_file is None:
+            self.user_file = user_settings_path()
+
+        self._layers['.env'] = self._read_env_file()
+        self._layers['settings file'] = self._read_user_file()
+        if self._dotenv_initial is None:
+            self._dotenv_initial = dict(self._layers['.env'])
+
+        values = {}
+        sources = {}
+        for setting in SETTINGS:
+            value, source = setting.default, 'default'
+            for layer, raw in self._candidates(setting):
+                try:
+                    value, source = setting.parse(raw), layer
+                except ValueError as e:
+                    logger.warning("Ignoring %s from the %s: %s", setting.name, layer, e)
+            values[setting.name] = value
+            sources[setting.name] = source
+
+        if self.loaded:
+            self._pending = {}
+            for setting in SETTINGS:
+                if setting.restart and values[setting.name] != self._values[setting.name]:
+                    self._pending[setting.name] = values[setting.name]
+                    values[setting.name] = self._values[setting.name]
+                    sources[setting.name] = self._sources[setting.name]
+
+        changed = frozenset(name for name in values if values[name] != self._values[name])
+        self._values = values
+        self._sources = sources
+        self.loaded = True
+        return changed
+
+    def _candidates(self, setting):
+        """
+        Raw values for setting from the layers, lowest precedence first
+        """
+        env_layer = self._layers['.env']
+        if setting.env and setting.env in env_layer:
+            yield '.env', env_layer[setting.env]
+
+        user_layer = self._layers['settings file']
+        if setting.name in user_layer:
+            yield 'settings file', user_layer[setting.name]
+
+        if setting.env and setting.env in self.environ:
+            raw = self.environ[setting.env]
+            # load_dotenv() copied the .env values into the environment at
+            # startup; those copies must not mask later edits to the file
+            if self._dotenv_initial.get(setting.env) != raw:
+                yield 'environment', raw
+
+    def _read_env_file(self):
+        if not os.path.isfile(self.env_file):
+            return {}
+        try:
+            return {key: value for key, value in dotenv_values(self.env_file).items() if value is not None}
+        except (OSError, ValueError) as e:
+            logger.warning("Could not read %s, keeping its previous values: %s", self.env_file, e)
+            return self._layers['.env']
+
+    def _read_user_file(self):
+        if not os.path.isfile(self.user_file):
+            return {}
+        try:
+            with open(self.user_file, encoding='utf-8') as settings_file:
+                layer = json.load(settings_file)
+            if not isinstance(layer, dict):
+                raise ValueError("expected a JSON object")
+        except (OSError, ValueError) as e:
+            logger.warning("Could not read %s, keeping its previous values: %s", self.user_file, e)
+            return self._layers['settings file']
+
+        for name in layer:
+            if name not in SETTINGS_BY_NAME:
+                logger.warning("Unknown setting %r in %s", name, self.user_file)
+        return layer
+
+    def watch(self):
+        """
+        Reload whenever the .env or settings file changes
+        """
+        if self._watcher is not None:
+            return
+        if not self.loaded:
+            self.load()
+        self._reload_timer = QTimer(self)
+        self._reload_timer.setSingleShot(True)
+        self._reload_timer.setInterval(RELOAD_DELAY_MS)
+        self._reload_timer.timeout.connect(self.reload)
+
+        self._watcher = QFileSystemWatcher(self)
+        self._watcher.fileChanged.connect(self._on_path_changed)
+        self._watcher.directoryChanged.connect(self._on_path_changed)
+        self._watch_paths()
+        logger.info("Watching %s and %s for setting changes", self.env_file, self.user_file)
+
+    def stop(self):
+        if self._watcher is None:
+            return
+        self._reload_timer.stop()
+        self._watcher.deleteLater()
+        self._watcher = None
+
+    def _watch_paths(self):
+        # The directories too: a file replaced by rename, or created later,
+        # is only noticed through its directory
+        paths = []
+        for path in (self.env_file, self.user_file):
+            directory = os.path.dirname(path)
+            if os.path.isdir(directory):
+                paths.append(directory)
+            if os.path.isfile(path):
+                paths.append(path)
+        watched = set(self._watcher.files()) | set(self._watcher.directories())
+        missing = [path for path in dict.fromkeys(paths) if path not in watched]
+        if missing:
+            self._watcher.addPaths(missing)
+
+    def _on_path_changed(self, path):
+        self._reload_timer.start()
+
+    def reload(self):
+        """
+        Read everything again and announce what changed
+        """
+        if self._watcher is not None:
+            self._watch_paths()
+        pending = self._pending
+        changed = self.load()
+
+        for name, value in sorted(self._pending.items()):
+            if name not in pending or pending[name] != value:
+                logger.warning("Setting %s changed to %r; it takes effect after a restart", name, value)
+        for name in sorted(set(pending) - set(self._pending)):
+            logger.info("Setting %s is back to its startup value %r", name, self._values[name])
+        if not changed:
+            return changed
+
+        for name in sorted(changed):
+            logger.info("Setting %s changed to %r (%s)", name, self._values[name], self._sources[name])
+        self.changed.emit(changed)
+        return changed
+
+_settings = None
+
+def settings():
+    """
+    Get the application-wide settings
+    """
+    global _settings
+    if _settings is None:
+        _settings = Settings()
+    return _settings
@@ -0,0 +1,133 @@
+"""
+One running app per user.
+
+The first launch listens on a local socket (a Unix domain socket, or a
+named pipe on Windows) reachable only by the same user. A later launch
+connects to it, forwards its command line, for example an OAuth callback
+URL, and exits; the running app comes to the front and handles the
+arguments. The check needs no QApplication and runs before the UI modules
+are imported, so the hand-off takes milliseconds.
+
+Checking and listening happen under a lock file, so two launches at the
+same moment cannot both become the running app.
+"""
+import getpass
+import hashlib
+import json
+import os
+from PyQt6.QtCore import QDir, QLockFile, QObject, pyqtSignal
+from PyQt6.QtNetwork import QLocalServer, QLocalSocket
+
+from app.utils.settings import APP_ID, user_config_dir
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Longest command line accepted from another launch
+MAX_MESSAGE_BYTES = 64 * 1024
+
+def server_name():
+    """
+    Name of the local socket, per user and configuration directory
+    """
+    owner = f"{getpass.getuser()}:{user_config_dir()}"
+    return f"{APP_ID}-{hashlib.sha1(owner.encode()).hexdigest()[:12]}"
+
+class SingleInstance(QObject):
+    """
+    The local socket of the running app.
+
+    hand_off() is called first: it returns True when a running app took
+    over the command line, and the launch should exit. Otherwise this
+    launch is the running app and calls listen() once the QApplication
+    exists; arguments_received then carries the command line of every
+    later launch.
+    """
+    arguments_received = pyqtSignal(list)
+
+    def __init__(self, name=None, timeout_ms=2000):
+        super().__init__()
+        self.name = name or server_name()
+        self.timeout_ms = timeout_ms
+        self.server = None
+        self._lock = QLockFile(os.path.join(QDir.tempPath(), self.name + '.lock'))
+        self._locked = False
+
+    def hand_off(self, argv):
+        """
+        Forward argv to the running app; False when there is none
+        """
+        # Held until listen(), so a launch racing this one waits and then
+        # finds our socket
+        self._locked = self._lock.tryLock(self.timeout_ms * 2)
+        if not self._locked:
+            logger.warning("Could not lock %s, checking for a running app anyway", self._lock.fileName())
+
+        socket = QLocalSocket()
+        socket.connectToServer(self.name)
+        if not socket.waitForConnected(self.timeout_ms):
+            # Nobody listening, or the socket of an app that crashed
+            return False
+
+        socket.write(json.dumps({'argv': list(argv)}).encode() + b'\n')
+        acknowledged = (socket.waitForBytesWritten(self.timeout_ms) and
+                        socket.waitForReadyRead(self.timeout_ms) and
+                        socket.readLine(16).strip() == b'ok')
+        socket.disconnectFromServer()
+        if not acknowledged:
+            # Starting a second app anyway would race it on the stored session
+            logger.warning("The running app did not respond, not starting another one")
+        return True
+
+    def listen(self):
+        """
+        Become the running app; call after hand_off() returned False
+        """
+        if self._locked:
+            # Only a crashed app leaves the socket behind while we hold the lock
+            QLocalServer.removeServer(self.name)
+
+        self.server = QLocalServer(self)
+        self.server.setSocketOptions(QLocalServer.SocketOption.UserAccessOption)
+        self.server.newConnection.connect(self._on_new_connection)
+        if not self.server.listen(self.name):
+            logger.warning("Could not listen on %s: %s", self.name, self.server.errorString())
+            self.server = None
+
+        if self._locked:
+            self._lock.unlock()
+            self._locked = False
+        return self.server is not None
+
+    def close(self):
+        if self.server is not None:
+            self.server.close()
+            self.server = None
+
+    def _on_new_connection(self):
+        while self.server.hasPendingConnections():
+            socket = self.server.nextPendingConnection()
+            socket.readyRead.connect(self._on_ready_read)
+            socket.disconnected.connect(socket.deleteLater)
+
+    def _on_ready_read(self):
+        socket = self.sender()
+        if not socket.canReadLine():
+            if socket.bytesAvailable() > MAX_MESSAGE_BYTES:
+                socket.abort()
+            return
+
+        try:
+            argv = json.loads(socket.readLine(MAX_MESSAGE_BYTES))['argv']
+            if not isinstance(argv, list):
+                raise TypeError("argv is not a list")
+        except (ValueError, KeyError, TypeError) as e:
+            logger.warning("Ignoring a malformed message from another launch: %s", e)
+            socket.abort()
+            return
+
+        socket.write(b'ok\n')
+        socket.disconnectFromServer()
+        logger.info("Another launch handed over its command line (%d arguments)", len(argv) - 1)
+        self.arguments_received.emit([str(arg) for arg in argv])
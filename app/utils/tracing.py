@@ -0,0 +1,171 @@
+"""
+Span-based tracing exported as Chrome trace-event JSON.
+
+Open the output in https://ui.perfetto.dev or chrome://tracing. Tracing is
+enabled by pointing CS2_LOGIN_TRACE at the file to write:
+
+    CS2_LOGIN_TRACE=trace.json python main.py
+
+The switch is read once at import. When it is off, ``traced`` returns the
+function unchanged and ``span``/``begin`` return a shared no-op object, so
+instrumented code costs one attribute lookup and call.
+"""
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+TRACE_PATH = os.getenv('CS2_LOGIN_TRACE') or None
+ENABLED = TRACE_PATH is not None
+
+_events = []
+_thread_names = {}
+_origin = time.perf_counter()
+
+def _now_us():
+    return (time.perf_counter() - _origin) * 1e6
+
+def _thread_id():
+    thread = threading.current_thread()
+    ident = thread.ident
+    if ident not in _thread_names:
+        _thread_names[ident] = thread.name
+    return ident
+
+class Span:
+    """
+    One timed region, recorded as a complete ("X") event when it ends
+    """
+    __slots__ = ('name', 'category', 'args', 'start', 'thread_id')
+
+    def __init__(self, name, category, args):
+        self.name = name
+        self.category = category
+        self.args = args
+        self.thread_id = _thread_id()
+        self.start = _now_us()
+
+    def end(self, **args):
+        """
+        Close the span; keyword arguments are added to its args
+        """
+        if args:
+            self.args = dict(self.args or {}, **args)
+        event = {
+            'name': self.name,
+            'cat': self.category,
+            'ph': 'X',
+            'ts': self.start,
+            'dur': _now_us() - self.start,
+            'pid': os.getpid(),
+            'tid': self.thread_id,
+        }
+        if self.args:
+            event['args'] = self.args
+        _events.append(event)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.end(error=exc_type.__name__)
+        else:
+            self.end()
+        return False
+
+class _NullSpan:
+    """
+    Stand-in returned while tracing is off
+    """
+    __slots__ = ()
+
+    def end(self, **args):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+_NULL_SPAN = _NullSpan()
+
+def begin(name, category='app', **args):
+    """
+    Start a span that is ended later with .end(), e.g. across event loop turns
+    """
+    if not ENABLED:
+        return _NULL_SPAN
+    return Span(name, category, args or None)
+
+def span(name, category='app', **args):
+    """
+    Context manager timing the enclosed block
+    """
+    if not ENABLED:
+        return _NULL_SPAN
+    return Span(name, category, args or None)
+
+def instant(name, category='app', **args):
+    """
+    Record a point in time
+    """
+    if not ENABLED:
+        return
+    event = {'name': name, 'cat': category, 'ph': 'i', 's': 't',
+             'ts': _now_us(), 'pid': os.getpid(), 'tid': _thread_id()}
+    if args:
+        event['args'] = args
+    _events.append(event)
+
+def traced(name=None, category='app'):
+    """
+    Decorator recording every call as a span; returns the function untouched
+    when tracing is off
+    """
+    def decorate(func):
+        if not ENABLED:
+            return func
+
+        span_name = name or func.__qualname__
+
+        # PyQt hands every signal argument (e.g. clicked's checked flag) to a
+        # slot whose signature it cannot see; drop the ones func does not take
+        code = func.__code__
+        max_args = None if code.co_flags & inspect.CO_VARARGS else code.co_argcount
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with Span(span_name, category, None):
+                return func(*args[:max_args], **kwargs)
+        return wrapper
+    return decorate
+
+def events():
+    """
+    Recorded events plus thread name metadata
+    """
+    pid = os.getpid()
+    metadata = [{'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': ident, 'args': {'name': thread_name}}
+                for ident, thread_name in list(_thread_names.items())]
+    return metadata + list(_events)
+
+def export(path=None):
+    """
+    Write the trace as Chrome trace-event JSON; returns the path or None
+    """
+    path = path or TRACE_PATH
+    if not ENABLED or not path:
+        return None
+
+    with open(path, 'w') as trace_file:
+        json.dump({'traceEvents': events(), 'displayTimeUnit': 'ms'}, trace_file)
+    logger.info("Wrote %s trace events to %s", len(_events), path)
+    return path
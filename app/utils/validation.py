@@ -0,0 +1,45 @@
+"""
+Field rules for the registration form. Each check returns the message to
+show for the value, or None when it is valid.
+"""
+import re
+
+USERNAME_MIN_LENGTH = 3
+USERNAME_MAX_LENGTH = 20
+PASSWORD_MIN_LENGTH = 8
+
+# Deliberately loose: the confirmation email is the real check
+EMAIL_PATTERN = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+USERNAME_PATTERN = re.compile(r"^[A-Za-z0-9_]+$")
+
+def email_error(email):
+    if not email:
+        return "Please enter your email"
+    if not EMAIL_PATTERN.match(email):
+        return "Please enter a valid email address"
+    return None
+
+def username_error(username):
+    if not username:
+        return "Please choose a username"
+    if not USERNAME_MIN_LENGTH <= len(username) <= USERNAME_MAX_LENGTH:
+        return f"Username must be {USERNAME_MIN_LENGTH} to {USERNAME_MAX_LENGTH} characters"
+    if not USERNAME_PATTERN.match(username):
+        return "Username may only contain letters, numbers and underscores"
+    return None
+
+def password_error(password):
+    if not password:
+        return "Please enter a password"
+    if len(password) < PASSWORD_MIN_LENGTH:
+        return f"Password must be at least {PASSWORD_MIN_LENGTH} characters"
+    if not any(char.isalpha() for char in password) or not any(char.isdigit() for char in password):
+        return "Password must contain a letter and a number"
+    return None
+
+def confirm_password_error(password, confirm_password):
+    if not confirm_password:
+        return "Please confirm your password"
+    if password != confirm_password:
+        return "Passwords do not match"
+    return None
@@ -0,0 +1,168 @@
+import os
+import sys
+import threading
+import time
+import traceback
+from PyQt6.QtCore import QObject, QTimer
+
+from app.utils import metrics
+from app.utils.settings import settings
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Upper bounds (ms) of the stall duration histogram buckets
+STALL_BUCKETS_MS = (100, 250, 500, 1000, 2500, 5000, 10000, float('inf'))
+
+GUI_STALLS = metrics.histogram('app_gui_stall_seconds', 'Duration of GUI thread stalls seen by the watchdog',
+                               buckets=tuple(bound / 1000 for bound in STALL_BUCKETS_MS[:-1]))
+STALL_CULPRITS = metrics.counter('app_gui_stall_samples_total', 'Stall stack samples by innermost app function',
+                                 ('function',))
+
+def culprit_frame(frame):
+    """
+    Innermost frame of the stack that belongs to the app package
+    """
+    while frame is not None:
+        if os.path.abspath(frame.f_code.co_filename).startswith(APP_DIR + os.sep):
+            return frame
+        frame = frame.f_back
+    return None
+
+def describe_frame(frame):
+    """
+    Qualified function name and location of a frame, e.g.
+    SupabaseService.get_user_role (app/services/supabase_service.py:520)
+    """
+    code = frame.f_code
+    name = getattr(code, 'co_qualname', code.co_name)
+    path = os.path.relpath(code.co_filename, os.path.dirname(APP_DIR))
+    return f"{name} ({path}:{frame.f_lineno})"
+
+class StallWatchdog(QObject):
+    """
+    Opt-in detector for a blocked GUI thread.
+
+    A QTimer on the GUI thread records a heartbeat; a monitor thread checks
+    it and, when the event loop has not run for longer than the threshold,
+    samples the GUI thread's Python stack with sys._current_frames() and logs
+    it. Stall durations are collected in a histogram when the loop recovers.
+    """
+    def __init__(self, threshold_ms=250, interval_ms=50, parent=None):
+        super().__init__(parent)
+        self.threshold = threshold_ms / 1000.0
+        self.interval = interval_ms / 1000.0
+        self.main_thread_id = threading.main_thread().ident
+
+        self.histogram = [0] * len(STALL_BUCKETS_MS)
+        self.stalls = 0
+        self.total_stall_time = 0.0
+        self.max_stall_time = 0.0
+        self.culprits = {}
+
+        self._last_beat = time.monotonic()
+        self._reported_beat = None
+        self._stopping = threading.Event()
+        self._thread = None
+
+        self._heartbeat = QTimer(self)
+        self._heartbeat.setInterval(interval_ms)
+        self._heartbeat.timeout.connect(self._beat)
+
+    def start(self):
+        """
+        Start the heartbeat and the monitor thread
+        """
+        self._last_beat = time.monotonic()
+        self._heartbeat.start()
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._monitor, name='stall-watchdog', daemon=True)
+        self._thread.start()
+        logger.info("Stall watchdog started (threshold %.0f ms)", self.threshold * 1000)
+
+    def stop(self):
+        """
+        Stop monitoring and log a summary
+        """
+        self._heartbeat.stop()
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+        logger.info("Stall watchdog: %s", self.stats())
+
+    def _beat(self):
+        now = time.monotonic()
+        stalled = now - self._last_beat - self.interval
+        self._last_beat = now
+        if stalled >= self.threshold:
+            self._record(stalled)
+
+    def _record(self, duration):
+        duration_ms = duration * 1000
+        for index, bound in enumerate(STALL_BUCKETS_MS):
+            if duration_ms <= bound:
+                self.histogram[index] += 1
+                break
+        self.stalls += 1
+        self.total_stall_time += duration
+        self.max_stall_time = max(self.max_stall_time, duration)
+        GUI_STALLS.observe(duration)
+        logger.warning("GUI thread was blocked for %.0f ms", duration_ms)
+
+    def _monitor(self):
+        check_every = min(self.interval, self.threshold / 2)
+        while not self._stopping.wait(check_every):
+            beat = self._last_beat
+            blocked = time.monotonic() - beat
+            if blocked < self.threshold or beat == self._reported_beat:
+                continue
+
+            # One stack sample per stall
+            self._reported_beat = beat
+            self._report(blocked)
+
+    def _report(self, blocked):
+        frame = sys._current_frames().get(self.main_thread_id)
+        if frame is None:
+            return
+
+        culprit = culprit_frame(frame)
+        where = describe_frame(culprit) if culprit is not None else describe_frame(frame)
+        if culprit is not None:
+            name = getattr(culprit.f_code, 'co_qualname', culprit.f_code.co_name)
+            self.culprits[name] = self.culprits.get(name, 0) + 1
+            STALL_CULPRITS.inc(function=name)
+
+        stack = ''.join(traceback.format_stack(frame))
+        del frame, culprit
+        logger.warning("GUI thread blocked for %.0f ms in %s\n%s", blocked * 1000, where, stack)
+
+    def stats(self):
+        """
+        Stall counts, durations and the functions they were caught in
+        """
+        return {
+            'stalls': self.stalls,
+            'total_ms': round(self.total_stall_time * 1000, 1),
+            'max_ms': round(self.max_stall_time * 1000, 1),
+            'histogram_ms': {('+Inf' if bound == float('inf') else str(bound)): count
+                             for bound, count in zip(STALL_BUCKETS_MS, self.histogram)},
+            'culprits': dict(self.culprits),
+        }
+
+def watchdog_from_settings(parent=None):
+    """
+    Start a watchdog when the watchdog setting is on (CS2_LOGIN_WATCHDOG);
+    the threshold comes from watchdog_ms (default 250)
+    """
+    app_settings = settings()
+    if not app_settings.get('watchdog'):
+        return None
+
+    watchdog = StallWatchdog(app_settings.get('watchdog_ms'), parent=parent)
+    watchdog.start()
+    return watchdog
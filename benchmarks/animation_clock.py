@@ -0,0 +1,146 @@
+"""
+Cost of running many UI animations at once.
+
+Starts the same hover-style animations for several rounds, once with a new
+QPropertyAnimation per start (as the widgets used to) and once on the shared
+AnimationManager clock, optionally with a busy event loop (--load-ms of work
+every 10 ms). Reports the animation objects allocated, the updates delivered
+and, for the manager, its per-tick cost and dropped frames.
+
+Usage (from the repository root):
+
+    python -m benchmarks.animation_clock --animations 50 --load-ms 12
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PyQt6.QtWidgets import QApplication
+from PyQt6.QtCore import QObject, QTimer, QPropertyAnimation, QEasingCurve, pyqtProperty
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from app.ui.animation import AnimationManager
+
+
+class Target(QObject):
+    """
+    Animated value that counts its updates
+    """
+    def __init__(self):
+        super().__init__()
+        self._value = 0.0
+        self.updates = 0
+
+    def get_value(self):
+        return self._value
+
+    def set_value(self, value):
+        self._value = value
+        self.updates += 1
+
+    value = pyqtProperty(float, get_value, set_value)
+
+
+def busy_loop(load_ms):
+    """
+    Simulate other main-thread work stealing time from the animations
+    """
+    timer = QTimer()
+    timer.setInterval(10)
+    timer.timeout.connect(lambda: time.sleep(load_ms / 1000.0))
+    if load_ms > 0:
+        timer.start()
+    return timer
+
+
+def run_until(app, done, timeout=5.0):
+    deadline = time.perf_counter() + timeout
+    while not done() and time.perf_counter() < deadline:
+        app.processEvents()
+        time.sleep(0.0005)
+
+
+def measure_property_animations(app, count, duration, load_ms, rounds):
+    targets = [Target() for _ in range(count)]
+    allocated = 0
+    load = busy_loop(load_ms)
+    started = time.perf_counter()
+    for round_index in range(rounds):
+        # Like the widgets did: a new animation object for every start
+        animations = []
+        for target in targets:
+            animation = QPropertyAnimation(target, b"value")
+            animation.setDuration(duration)
+            animation.setStartValue(target.get_value())
+            animation.setEndValue(0.0 if round_index % 2 else 100.0)
+            animation.setEasingCurve(QEasingCurve.Type.OutCubic)
+            animation.start()
+            animations.append(animation)
+        allocated += len(animations)
+        run_until(app, lambda: all(a.state() == QPropertyAnimation.State.Stopped for a in animations))
+    elapsed = time.perf_counter() - started
+    load.stop()
+
+    return {
+        'implementation': 'QPropertyAnimation',
+        'animations': count,
+        'rounds': rounds,
+        'objects_allocated': allocated,
+        'wall_ms': round(elapsed * 1000, 1),
+        'updates': sum(target.updates for target in targets),
+    }
+
+
+def measure_manager(app, count, duration, load_ms, rounds):
+    manager = AnimationManager()
+    targets = [Target() for _ in range(count)]
+    load = busy_loop(load_ms)
+    started = time.perf_counter()
+    for round_index in range(rounds):
+        # Finished tweens go back to the pool and are reused by the next round
+        for target in targets:
+            manager.animate(target, 'value', target.set_value, target.get_value(),
+                            0.0 if round_index % 2 else 100.0, duration)
+        run_until(app, lambda: manager.active_count == 0)
+    elapsed = time.perf_counter() - started
+    load.stop()
+
+    stats = manager.stats()
+    return {
+        'implementation': 'AnimationManager',
+        'animations': count,
+        'rounds': rounds,
+        'objects_allocated': stats['pooled'],
+        'wall_ms': round(elapsed * 1000, 1),
+        'updates': sum(target.updates for target in targets),
+        'ticks': stats['ticks'],
+        'dropped_frames': stats['dropped_frames'],
+        'mean_tick_ms': round(stats['mean_tick_ms'], 3),
+        'max_tick_ms': round(stats['max_tick_ms'], 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--animations', type=int, default=50, help='animations running together')
+    parser.add_argument('--duration', type=int, default=200, help='animation duration in ms')
+    parser.add_argument('--rounds', type=int, default=4, help='times every animation is started')
+    parser.add_argument('--load-ms', type=float, default=0.0, help='busy work every 10 ms on the GUI thread')
+    args = parser.parse_args()
+
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    results = [
+        measure_property_animations(app, args.animations, args.duration, args.load_ms, args.rounds),
+        measure_manager(app, args.animations, args.duration, args.load_ms, args.rounds),
+    ]
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,163 @@
+"""
+Shared setup for the UI benchmarks: an offscreen QApplication with the
+theme and resources installed, a stand-in for SupabaseService and small
+measuring helpers.
+"""
+import os
+import platform
+import statistics
+import sys
+import time
+import uuid
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PyQt6.QtWidgets import QApplication
+from PyQt6.QtCore import QObject, QEvent, pyqtSignal, QT_VERSION_STR, PYQT_VERSION_STR
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from app.ui.theme import apply_theme
+from app.utils.resources import load_resources
+
+# Config for MainWindow; the service is replaced by the stub
+BENCHMARK_CONFIG = {
+    'supabase_url': 'https://demo.supabase.co',
+    'supabase_key': 'demo-anon-key',
+    'transition_duration_ms': 250,
+}
+
+
+class StubUser:
+    """
+    The parts of a Supabase user the screens read
+    """
+    def __init__(self, email='bench@example.com', username='bench_user'):
+        self.id = str(uuid.uuid4())
+        self.email = email
+        self.user_metadata = {'username': username}
+
+
+class StubSupabaseService(QObject):
+    """
+    SupabaseService stand-in: same signals and methods, no network, keyring
+    or logging, so only UI work is measured
+    """
+    auth_state_changed = pyqtSignal(dict)
+    auth_error = pyqtSignal(str)
+    rate_limited = pyqtSignal(str, float)
+    session_refreshed = pyqtSignal(dict)
+
+    def __init__(self, role='FREE'):
+        super().__init__()
+        self.demo_mode = True
+        self.current_user = StubUser()
+        self.current_session = None
+        self.role = role
+
+    def sign_up(self, email, password, username):
+        return True
+
+    def sign_in(self, email, password, remember=False):
+        return True
+
+    def sign_in_with_oauth(self, provider, remember=False):
+        return True
+
+    def is_username_available(self, username):
+        return True
+
+    def send_password_reset_email(self, email):
+        return True
+
+    def oauth_authorize_url(self, provider, redirect_to):
+        return f"{redirect_to}?code=stub"
+
+    def handle_oauth_callback(self, url, remember=False):
+        return True
+
+    def cancel_oauth(self):
+        pass
+
+    def sign_out(self):
+        return True
+
+    def refresh_session(self):
+        return True
+
+    def cancel_all(self):
+        pass
+
+    def get_user_role(self):
+        return self.role
+
+    def upgrade_to_pro(self):
+        self.role = 'PRO'
+        return True
+
+
+def application():
+    """
+    The QApplication with the app theme and resource bundle installed
+    """
+    app = QApplication.instance()
+    if app is None:
+        app = QApplication(sys.argv[:1])
+        load_resources()
+        apply_theme(app)
+    return app
+
+
+def environment():
+    """
+    What the numbers were measured on
+    """
+    return {
+        'platform': platform.platform(),
+        'python': platform.python_version(),
+        'qt': QT_VERSION_STR,
+        'pyqt': PYQT_VERSION_STR,
+        'qpa_platform': os.environ.get('QT_QPA_PLATFORM'),
+    }
+
+
+def destroy(app, widget):
+    """
+    Close and delete a widget now rather than on the next event loop turn
+    """
+    widget.close()
+    widget.deleteLater()
+    app.sendPostedEvents(None, QEvent.Type.DeferredDelete.value)
+    app.processEvents()
+
+
+def rss_bytes():
+    """
+    Resident set size of this process, or None where /proc is not available
+    """
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def run_until(app, done, timeout=5.0):
+    deadline = time.perf_counter() + timeout
+    while not done() and time.perf_counter() < deadline:
+        app.processEvents()
+        time.sleep(0.0005)
+
+
+def summarize_ms(samples):
+    """
+    Stable summary of durations given in seconds
+    """
+    samples = sorted(samples)
+    return {
+        'runs': len(samples),
+        'median_ms': round(statistics.median(samples) * 1000, 3),
+        'min_ms': round(samples[0] * 1000, 3),
+        'p90_ms': round(samples[min(len(samples) - 1, int(len(samples) * 0.9))] * 1000, 3),
+    }
@@ -0,0 +1,159 @@
+"""
+Frame cost of the AnimatedLineEdit border animation.
+
+Compares the previous implementation, which replaced the widget style sheet
+on every animation frame, with the painted border: each frame sets the
+interpolated color and repaints the widget synchronously. Also counts the
+animations started while typing into an unfocused and a focused field.
+
+Usage (from the repository root):
+
+    python -m benchmarks.line_edit_frames --frames 240
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PyQt6.QtWidgets import QApplication, QLineEdit, QWidget, QVBoxLayout
+from PyQt6.QtGui import QColor
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from app.ui.animation import animation_manager
+from app.ui.theme import apply_theme, PolishCounter
+from app.ui.widgets.animated_line_edit import AnimatedLineEdit
+
+
+class StyleSheetLineEdit(AnimatedLineEdit):
+    """
+    The previous border path: one style sheet per animation frame
+    """
+    def paintEvent(self, event):
+        QLineEdit.paintEvent(self, event)
+
+    def set_border_color(self, color):
+        self._border_color = color
+        self.setStyleSheet(f"""
+            QLineEdit {{
+                background-color: transparent;
+                color: white;
+                border: 2px solid {color.name()};
+                border-radius: 10px;
+                padding: 10px 15px;
+                font-size: 16px;
+            }}
+
+            QLineEdit:focus {{
+                border: 2px solid #3a86ff;
+            }}
+        """)
+
+
+def frame_colors(frames):
+    """
+    Interpolated colors of one idle-to-focus transition
+    """
+    start, end = QColor('#444444'), QColor('#3a86ff')
+    colors = []
+    for index in range(frames):
+        t = index / max(1, frames - 1)
+        colors.append(QColor(
+            round(start.red() + (end.red() - start.red()) * t),
+            round(start.green() + (end.green() - start.green()) * t),
+            round(start.blue() + (end.blue() - start.blue()) * t),
+        ))
+    return colors
+
+
+def measure_frames(app, widget_class, frames):
+    """
+    Time set_border_color plus a synchronous repaint for every frame
+    """
+    container = QWidget()
+    layout = QVBoxLayout(container)
+    line_edit = widget_class()
+    layout.addWidget(line_edit)
+    container.resize(360, 80)
+    container.show()
+    app.processEvents()
+
+    counter = PolishCounter(app)
+    samples = []
+    for color in frame_colors(frames):
+        started = time.perf_counter()
+        line_edit.set_border_color(color)
+        line_edit.repaint()
+        samples.append(time.perf_counter() - started)
+    polishes = counter.total
+    counter.uninstall()
+
+    container.close()
+    container.deleteLater()
+    app.processEvents()
+
+    return {
+        'implementation': widget_class.__name__,
+        'frames': frames,
+        'mean_frame_us': round(statistics.mean(samples) * 1e6, 1),
+        'median_frame_us': round(statistics.median(samples) * 1e6, 1),
+        'p95_frame_us': round(sorted(samples)[int(len(samples) * 0.95) - 1] * 1e6, 1),
+        'style_repolishes': polishes,
+    }
+
+
+def count_animations(app, text):
+    """
+    Animations started while typing text, unfocused and focused
+    """
+    container = QWidget()
+    layout = QVBoxLayout(container)
+    line_edit = AnimatedLineEdit()
+    layout.addWidget(line_edit)
+    container.show()
+    app.processEvents()
+
+    manager = animation_manager()
+    result = {}
+    for focused in (False, True):
+        line_edit.is_focused = focused
+        line_edit.update_border(animate=False)
+        line_edit.clear()
+        started = manager.started + manager.retargeted
+        for index in range(1, len(text) + 1):
+            line_edit.setText(text[:index])
+        result['unfocused_keystrokes' if not focused else 'focused_keystrokes'] = len(text)
+        result['unfocused_animations' if not focused else 'focused_animations'] = \
+            manager.started + manager.retargeted - started
+        manager.stop(line_edit, 'border_color')
+
+    line_edit.is_focused = False
+    container.close()
+    container.deleteLater()
+    app.processEvents()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--frames', type=int, default=240, help='animation frames per implementation')
+    args = parser.parse_args()
+
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    apply_theme(app)
+
+    results = {
+        'frames': [measure_frames(app, widget_class, args.frames)
+                   for widget_class in (StyleSheetLineEdit, AnimatedLineEdit)],
+        'typing': count_animations(app, 'player@example.com'),
+    }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
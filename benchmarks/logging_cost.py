@@ -0,0 +1,180 @@
+"""
+Cost of a log call on the calling (GUI) thread.
+
+Compares the previous setup, where the rotating file handler and console
+handler were attached directly to the logger and messages were f-strings,
+with the queue handler used now, where the call only enqueues the record and
+a listener thread formats and writes it (as text and as JSON) through the
+compressing rotating handler. A small rotation size makes both rotate during
+the run, as they would in the field; the bytes left on disk are reported.
+The storm filter setup logs the same record every time, like a failing
+backend does, and shows how many records it lets through. Also reports the cost of a suppressed DEBUG call with an f-string
+against a lazily formatted one.
+
+Usage (from the repository root):
+
+    python -m benchmarks.logging_cost --calls 20000
+"""
+import argparse
+import gzip
+import json
+import logging
+import os
+import queue
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from logging.handlers import RotatingFileHandler
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from app.utils.logging_config import TEXT_FORMAT, JsonFormatter, LazyQueueHandler, LogListener, LogStormFilter
+from app.utils.log_rotation import CompressingRotatingFileHandler
+
+
+def make_handlers(file_handler, formatter):
+    file_handler.setLevel(logging.DEBUG)
+    console_handler = logging.StreamHandler(open(os.devnull, 'w'))
+    console_handler.setLevel(logging.INFO)
+    for handler in (file_handler, console_handler):
+        handler.setFormatter(formatter)
+    return [file_handler, console_handler]
+
+
+def make_logger(name, level=logging.DEBUG):
+    logger = logging.getLogger(name)
+    logger.handlers.clear()
+    logger.setLevel(level)
+    logger.propagate = False
+    return logger
+
+
+def disk_bytes(log_dir):
+    return sum(os.path.getsize(os.path.join(log_dir, name)) for name in os.listdir(log_dir))
+
+
+def records_written(log_dir):
+    count = 0
+    for name in os.listdir(log_dir):
+        opener = gzip.open if name.endswith('.gz') else open
+        with opener(os.path.join(log_dir, name), 'rb') as log_file:
+            count += sum(1 for _ in log_file)
+    return count
+
+
+def summarize(name, durations, drain_ms=None):
+    durations = sorted(durations)
+    result = {
+        'setup': name,
+        'calls': len(durations),
+        'mean_us': round(statistics.fmean(durations) * 1e6, 2),
+        'p50_us': round(durations[len(durations) // 2] * 1e6, 2),
+        'p99_us': round(durations[int(len(durations) * 0.99)] * 1e6, 2),
+        'max_us': round(durations[-1] * 1e6, 1),
+    }
+    if drain_ms is not None:
+        result['listener_drain_ms'] = round(drain_ms, 1)
+    return result
+
+
+def measure_direct(log_dir, calls, rotate_bytes):
+    logger = make_logger('bench.direct')
+    file_handler = RotatingFileHandler(os.path.join(log_dir, 'app.log'), maxBytes=rotate_bytes, backupCount=5)
+    handlers = make_handlers(file_handler, logging.Formatter(TEXT_FORMAT))
+    for handler in handlers:
+        logger.addHandler(handler)
+
+    user_id, role = str(uuid.uuid4()), 'FREE'
+    durations = []
+    for _ in range(calls):
+        started = time.perf_counter()
+        logger.info(f"Retrieved role for user {user_id}: {role}")
+        durations.append(time.perf_counter() - started)
+
+    for handler in handlers:
+        handler.close()
+    return dict(summarize('direct handlers, f-string', durations), disk_bytes=disk_bytes(log_dir),
+                records_written=records_written(log_dir))
+
+
+def measure_queue(log_dir, calls, rotate_bytes, formatter, name, storm_filter=False):
+    logger = make_logger('bench.' + name)
+    log_queue = queue.SimpleQueue()
+    file_handler = CompressingRotatingFileHandler(os.path.join(log_dir, 'app.log'), max_bytes=rotate_bytes)
+    handlers = make_handlers(file_handler, formatter)
+    listener = LogListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    queue_handler = LazyQueueHandler(log_queue)
+    if storm_filter:
+        log_filter = LogStormFilter()
+        log_filter.sink = queue_handler.handle
+        queue_handler.addFilter(log_filter)
+    logger.addHandler(queue_handler)
+
+    user_id, role = str(uuid.uuid4()), 'FREE'
+    durations = []
+    for _ in range(calls):
+        started = time.perf_counter()
+        logger.info("Retrieved role for user %s: %s", user_id, role)
+        durations.append(time.perf_counter() - started)
+
+    if storm_filter:
+        log_filter.flush()
+
+    # Time the listener still needs to write what was queued
+    started = time.perf_counter()
+    listener.stop()
+    drain_ms = (time.perf_counter() - started) * 1000
+    for handler in handlers:
+        handler.close()
+    return dict(summarize(name, durations, drain_ms), disk_bytes=disk_bytes(log_dir),
+                records_written=records_written(log_dir))
+
+
+def measure_suppressed(calls):
+    logger = make_logger('bench.suppressed', logging.INFO)
+    stats = {'role': 'FREE', 'active': 3, 'pooled': 12}
+
+    durations = []
+    for _ in range(calls):
+        started = time.perf_counter()
+        logger.debug(f"Animation stats: {stats}")
+        durations.append(time.perf_counter() - started)
+    eager = summarize('suppressed DEBUG, f-string', durations)
+
+    durations = []
+    for _ in range(calls):
+        started = time.perf_counter()
+        logger.debug("Animation stats: %s", stats)
+        durations.append(time.perf_counter() - started)
+    return [eager, summarize('suppressed DEBUG, lazy', durations)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--calls', type=int, default=20000, help='log calls per setup')
+    parser.add_argument('--rotate-kb', type=int, default=256, help='rotation size of the log file')
+    args = parser.parse_args()
+
+    rotate_bytes = args.rotate_kb * 1024
+    with tempfile.TemporaryDirectory() as log_dir:
+        for name in ('direct', 'text', 'json', 'storm'):
+            os.makedirs(os.path.join(log_dir, name))
+        results = [
+            measure_direct(os.path.join(log_dir, 'direct'), args.calls, rotate_bytes),
+            measure_queue(os.path.join(log_dir, 'text'), args.calls, rotate_bytes,
+                          logging.Formatter(TEXT_FORMAT), 'queue handler, text'),
+            measure_queue(os.path.join(log_dir, 'json'), args.calls, rotate_bytes,
+                          JsonFormatter(), 'queue handler, JSON'),
+            measure_queue(os.path.join(log_dir, 'storm'), args.calls, rotate_bytes,
+                          logging.Formatter(TEXT_FORMAT), 'queue handler, storm filter', storm_filter=True),
+        ]
+    results.extend(measure_suppressed(args.calls))
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
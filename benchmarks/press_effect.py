@@ -0,0 +1,158 @@
+"""
+Layout work caused by the button press effect.
+
+Compares the previous press effect, which animated the button's size with
+resize() inside its layout, with the paint-time scale. Both buttons sit in
+a small login-like form. Every click (press and release animations) runs
+on the shared animation clock with the event loop processing layout and
+paint work after each frame. Counts the layout requests and resize/move
+events the clicks cause, the frame cost and how far the button's size has
+drifted after all clicks.
+
+Usage (from the repository root):
+
+    python -m benchmarks.press_effect --clicks 20
+"""
+import argparse
+import json
+import time
+
+from benchmarks.common import application, destroy, summarize_ms
+
+from PyQt6.QtWidgets import QPushButton, QWidget, QVBoxLayout
+from PyQt6.QtCore import QObject, QEvent, QSize, QEasingCurve
+
+from app.ui.animation import animation_manager
+from app.ui.widgets.animated_button import AnimatedButton
+from app.ui.widgets.animated_line_edit import AnimatedLineEdit
+from app.ui.widgets.oauth_button import OAuthButton
+
+
+class ResizeOnPress:
+    """
+    The previous press effect: animate the widget size by 0.95 and back
+    """
+    def on_pressed(self):
+        animation_manager().animate(self, 'size', self.resize, self.size(),
+                                    QSize(int(self.width() * 0.95), int(self.height() * 0.95)),
+                                    100, QEasingCurve.Type.OutQuad)
+
+    def on_released(self):
+        animation_manager().animate(self, 'size', self.resize, self.size(),
+                                    QSize(int(self.width() / 0.95), int(self.height() / 0.95)),
+                                    100, QEasingCurve.Type.OutQuad)
+
+    def paintEvent(self, event):
+        QPushButton.paintEvent(self, event)
+
+
+class ResizingButton(ResizeOnPress, AnimatedButton):
+    pass
+
+
+class ResizingOAuthButton(ResizeOnPress, OAuthButton):
+    pass
+
+
+class LayoutEventCounter(QObject):
+    """
+    Application-wide count of layout requests and geometry events
+    """
+    COUNTED = {
+        QEvent.Type.LayoutRequest: 'layout_requests',
+        QEvent.Type.Resize: 'resize_events',
+        QEvent.Type.Move: 'move_events',
+    }
+
+    def __init__(self):
+        super().__init__()
+        self.counts = dict.fromkeys(self.COUNTED.values(), 0)
+
+    def eventFilter(self, obj, event):
+        name = self.COUNTED.get(event.type())
+        if name is not None:
+            self.counts[name] += 1
+        return False
+
+
+def run_frames(app, manager):
+    """
+    Step the animation clock at its frame rate until idle, letting the event
+    loop do the layout and paint work of every frame
+    """
+    samples = []
+    next_frame = time.perf_counter()
+    while manager.active_count:
+        next_frame += manager.frame_interval
+        time.sleep(max(0.0, next_frame - time.perf_counter()))
+        started = time.perf_counter()
+        manager._tick()
+        app.processEvents()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def measure(app, name, button_class, clicks):
+    form = QWidget()
+    layout = QVBoxLayout(form)
+    layout.setContentsMargins(30, 30, 30, 30)
+    layout.setSpacing(15)
+    for _ in range(2):
+        line_edit = AnimatedLineEdit()
+        line_edit.setMinimumHeight(50)
+        layout.addWidget(line_edit)
+    button = button_class()
+    button.setMinimumHeight(50)
+    layout.addWidget(button)
+    layout.addStretch()
+    form.resize(400, 400)
+    form.show()
+    app.processEvents()
+
+    manager = animation_manager()
+    size_before = button.size()
+    counter = LayoutEventCounter()
+    app.installEventFilter(counter)
+
+    samples = []
+    for _ in range(clicks):
+        button.pressed.emit()
+        samples += run_frames(app, manager)
+        button.released.emit()
+        samples += run_frames(app, manager)
+
+    app.removeEventFilter(counter)
+    size_after = button.size()
+    destroy(app, form)
+
+    result = {
+        'implementation': name,
+        'clicks': clicks,
+        'frame': summarize_ms(samples),
+        'size_before': [size_before.width(), size_before.height()],
+        'size_after': [size_after.width(), size_after.height()],
+    }
+    for key, count in counter.counts.items():
+        result[key + '_per_click'] = round(count / clicks, 2)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--clicks', type=int, default=20, help='clicks per implementation')
+    args = parser.parse_args()
+
+    app = application()
+    results = [
+        measure(app, 'AnimatedButton, resize', lambda: ResizingButton("LOGIN"), args.clicks),
+        measure(app, 'AnimatedButton, paint-time scale', lambda: AnimatedButton("LOGIN"), args.clicks),
+        measure(app, 'OAuthButton, resize', lambda: ResizingOAuthButton("Continue with Google", 'google'),
+                args.clicks),
+        measure(app, 'OAuthButton, paint-time scale', lambda: OAuthButton("Continue with Google", 'google'),
+                args.clicks),
+    ]
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,129 @@
+"""
+Frame cost of the button hover shadow under software rendering.
+
+Compares QGraphicsDropShadowEffect, which re-renders and blurs the button on
+every repaint and had its blur radius changed on every hover frame, with the
+cached 9-slice DropShadow, where a hover frame only changes the opacity of
+two pre-blurred layers. Each frame updates the shadow strength and repaints
+the container synchronously on the raster (offscreen) backend.
+
+Usage (from the repository root):
+
+    python -m benchmarks.shadow_frames --frames 120 --buttons 4
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PyQt6.QtWidgets import QApplication, QGraphicsDropShadowEffect, QWidget, QVBoxLayout
+from PyQt6.QtGui import QColor
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from app.ui.shadow import shadow_cache
+from app.ui.widgets.animated_button import AnimatedButton
+
+STYLESHEET = """
+QWidget#container { background-color: #121212; }
+AnimatedButton { background-color: #3a86ff; color: white; border: none; border-radius: 10px; }
+"""
+
+
+class EffectButton(AnimatedButton):
+    """
+    The previous shadow path: a graphics effect re-blurred on every frame
+    """
+    def setup_ui(self):
+        super().setup_ui()
+        self.drop_shadow.hide()
+        self.drop_shadow.target = None
+        self.removeEventFilter(self.drop_shadow)
+
+        shadow = QGraphicsDropShadowEffect(self)
+        shadow.setBlurRadius(15)
+        shadow.setColor(QColor(0, 0, 0, 80))
+        shadow.setOffset(0, 5)
+        self.setGraphicsEffect(shadow)
+
+    def set_shadow_strength(self, value):
+        self._shadow_strength = value
+        shadow = self.graphicsEffect()
+        if shadow:
+            shadow.setBlurRadius(15 + value / 10)
+            shadow.setColor(QColor(58, 134, 255, 80 + int(value / 2)))
+
+
+def measure(app, button_class, frames, buttons):
+    """
+    Time hover frames (in and back out) for a column of buttons
+    """
+    container = QWidget()
+    container.setObjectName('container')
+    layout = QVBoxLayout(container)
+    layout.setContentsMargins(30, 30, 30, 30)
+    layout.setSpacing(20)
+    widgets = []
+    for index in range(buttons):
+        button = button_class(f"Button {index + 1}")
+        button.setMinimumHeight(50)
+        button.set_shadow_radius(10)
+        layout.addWidget(button)
+        widgets.append(button)
+    container.resize(380, 70 * buttons + 60)
+    container.show()
+    app.processEvents()
+
+    cache = shadow_cache()
+    rendered_before = cache.rendered
+
+    half = max(1, frames // 2)
+    values = [100 * index / half for index in range(half + 1)]
+    values += list(reversed(values))
+
+    samples = []
+    for value in values:
+        started = time.perf_counter()
+        for button in widgets:
+            button.set_shadow_strength(value)
+        container.repaint()
+        samples.append(time.perf_counter() - started)
+
+    container.close()
+    container.deleteLater()
+    app.processEvents()
+
+    return {
+        'implementation': 'QGraphicsDropShadowEffect' if button_class is EffectButton else 'DropShadow',
+        'buttons': buttons,
+        'frames': len(samples),
+        'first_frame_us': round(samples[0] * 1e6, 1),
+        'mean_frame_us': round(statistics.mean(samples) * 1e6, 1),
+        'median_frame_us': round(statistics.median(samples) * 1e6, 1),
+        'p95_frame_us': round(sorted(samples)[int(len(samples) * 0.95) - 1] * 1e6, 1),
+        'shadows_rendered': cache.rendered - rendered_before,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--frames', type=int, default=120, help='hover frames per implementation')
+    parser.add_argument('--buttons', type=int, default=4, help='buttons animated together')
+    args = parser.parse_args()
+
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    app.setStyleSheet(STYLESHEET)
+
+    results = [measure(app, button_class, args.frames, args.buttons)
+               for button_class in (EffectButton, AnimatedButton)]
+    results.append({'shadow_cache': shadow_cache().stats()})
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
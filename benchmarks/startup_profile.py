@@ -0,0 +1,141 @@
+"""
+Compare the one-file and the startup-optimized PyInstaller profiles.
+
+Measures time-to-window (process spawn until the main window has been shown
+and the event loop has run once) and on-disk size for each build.
+
+Usage (from the repository root):
+
+    python -m benchmarks.startup_profile --build --runs 10
+
+Runs headless on Linux through the offscreen Qt platform. The session
+keyring is replaced by the null backend so runs never touch stored sessions.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DIST_DIR = os.path.join(ROOT_DIR, 'dist')
+EXE_SUFFIX = '.exe' if sys.platform == 'win32' else ''
+
+PROFILES = {
+    'onefile': {
+        'spec': 'cs2_login.spec',
+        'executable': os.path.join(DIST_DIR, 'CS2_Tool_Login' + EXE_SUFFIX),
+        'footprint': os.path.join(DIST_DIR, 'CS2_Tool_Login' + EXE_SUFFIX),
+    },
+    'fast': {
+        'spec': 'cs2_login_fast.spec',
+        'executable': os.path.join(DIST_DIR, 'CS2_Tool_Login_fast', 'CS2_Tool_Login_fast' + EXE_SUFFIX),
+        'footprint': os.path.join(DIST_DIR, 'CS2_Tool_Login_fast'),
+    },
+}
+
+
+def build(profile):
+    """
+    Build a profile with PyInstaller
+    """
+    spec = PROFILES[profile]['spec']
+    command = [sys.executable, '-m', 'PyInstaller', '--noconfirm', spec]
+    if profile == 'fast':
+        # Pre-6.6 PyInstaller takes the bytecode optimization level from the build interpreter
+        command.insert(1, '-O')
+    subprocess.run(command, cwd=ROOT_DIR, check=True)
+
+
+def disk_size(path):
+    """
+    Total size in bytes of a file or directory tree
+    """
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+
+    total = 0
+    for root, dirs, files in os.walk(path):
+        for file in files:
+            file_path = os.path.join(root, file)
+            if not os.path.islink(file_path):
+                total += os.path.getsize(file_path)
+    return total
+
+
+def measure_launch(command, timeout):
+    """
+    Launch the app once and return seconds until the window was shown
+    """
+    fd, probe_path = tempfile.mkstemp(prefix='cs2_startup_', suffix='.txt')
+    os.close(fd)
+    os.unlink(probe_path)
+
+    env = dict(os.environ)
+    env.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    env.setdefault('PYTHON_KEYRING_BACKEND', 'keyring.backends.null.Keyring')
+    env['CS2_LOGIN_STARTUP_PROBE'] = probe_path
+
+    started = time.time()
+    process = subprocess.run(command, cwd=ROOT_DIR, env=env, timeout=timeout,
+                             stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        with open(probe_path) as probe_file:
+            shown = float(probe_file.read())
+    except (OSError, ValueError):
+        raise RuntimeError(f"{command[0]} exited with {process.returncode} before showing a window")
+    finally:
+        if os.path.exists(probe_path):
+            os.unlink(probe_path)
+
+    return shown - started
+
+
+def measure(name, command, footprint, runs, timeout):
+    """
+    Collect time-to-window samples and size for one launch command
+    """
+    # First launch warms the OS file cache; it is reported separately
+    cold = measure_launch(command, timeout)
+    samples = [measure_launch(command, timeout) for _ in range(runs)]
+
+    return {
+        'profile': name,
+        'cold_start_ms': round(cold * 1000, 1),
+        'warm_median_ms': round(statistics.median(samples) * 1000, 1),
+        'warm_min_ms': round(min(samples) * 1000, 1),
+        'warm_max_ms': round(max(samples) * 1000, 1),
+        'disk_bytes': disk_size(footprint) if footprint else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--build', action='store_true', help='build both profiles before measuring')
+    parser.add_argument('--runs', type=int, default=5, help='warm launches per profile')
+    parser.add_argument('--timeout', type=float, default=60.0, help='seconds before a launch is aborted')
+    parser.add_argument('--source', action='store_true', help='also measure python main.py as a baseline')
+    args = parser.parse_args()
+
+    results = []
+    if args.source:
+        results.append(measure('source', [sys.executable, os.path.join(ROOT_DIR, 'main.py')],
+                               None, args.runs, args.timeout))
+
+    for profile, paths in PROFILES.items():
+        if args.build:
+            build(profile)
+        if not os.path.exists(paths['executable']):
+            print(f"Skipping {profile}: {paths['executable']} not built", file=sys.stderr)
+            continue
+        results.append(measure(profile, [paths['executable']], paths['footprint'],
+                               args.runs, args.timeout))
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
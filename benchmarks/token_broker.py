@@ -0,0 +1,244 @@
+"""
+Latency of getting credentials from the token broker.
+
+A child process plays the app: a demo-mode SupabaseService whose user is
+signed in before the TokenBroker is created, as with a session restored at
+startup. This process first checks that the broker serves that user's
+role, then plays the other tool and measures
+BrokerClient.credentials() on a kept connection, on a new connection per
+call (reading broker.json, connecting and sending the secret each time),
+and the reply for a client with the wrong secret.
+
+Last, outside demo mode against tools/oauth_standin.py, it checks the
+refresh the broker relies on: a remembered sign-in is refreshed, the
+keyring holds the new (single use) refresh token, and a second service
+restores the session from it.
+
+Usage (from the repository root):
+
+    python -m benchmarks.token_broker --calls 5000
+
+broker.json goes to a temporary configuration directory and the keyring
+is the null backend, or an in-memory one for the refresh check, so a
+running app and stored sessions are untouched.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+import keyring
+from keyring.backend import KeyringBackend
+from keyring.errors import PasswordDeleteError
+from PyQt6.QtCore import QCoreApplication
+from PyQt6.QtNetwork import QLocalSocket
+
+from app.services.supabase_service import SupabaseService, session_field
+from app.services.token_broker import BrokerClient, BrokerError, broker_file
+from tools.oauth_standin import STANDIN_KEY, StandInProvider, follow
+
+
+class MemoryKeyring(KeyringBackend):
+    """
+    Keyring for the refresh check, gone with the process
+    """
+    priority = 1
+
+    def __init__(self):
+        super().__init__()
+        self.passwords = {}
+
+    def get_password(self, service, username):
+        return self.passwords.get((service, username))
+
+    def set_password(self, service, username, password):
+        self.passwords[(service, username)] = password
+
+    def delete_password(self, service, username):
+        if self.passwords.pop((service, username), None) is None:
+            raise PasswordDeleteError(username)
+
+
+def summarize(name, durations):
+    durations = sorted(durations)
+    return {
+        'setup': name,
+        'calls': len(durations),
+        'mean_us': round(statistics.fmean(durations) * 1e6, 2),
+        'p50_us': round(durations[len(durations) // 2] * 1e6, 2),
+        'p99_us': round(durations[int(len(durations) * 0.99)] * 1e6, 2),
+        'max_us': round(durations[-1] * 1e6, 1),
+    }
+
+
+def serve():
+    """
+    The app side: sign in the demo PRO user, start the broker on that
+    session and serve until stdin closes
+    """
+    from PyQt6.QtCore import QCoreApplication, QSocketNotifier
+    from app.services.supabase_service import SupabaseService
+    from app.services.token_broker import TokenBroker
+    from app.utils.settings import settings
+
+    app = QCoreApplication(sys.argv[:1])
+    settings().load()
+    service = SupabaseService({'supabase_url': 'https://demo.supabase.co', 'supabase_key': 'demo-anon-key'})
+    service.sign_in('pro@example.com', 'password123')
+    broker = TokenBroker(service)
+    if not broker.start():
+        sys.exit(1)
+
+    stdin = QSocketNotifier(sys.stdin.fileno(), QSocketNotifier.Type.Read)
+    stdin.activated.connect(app.quit)
+    print('ready', flush=True)
+    app.exec()
+    broker.stop()
+
+
+def check_existing_session_role(timeout=2.0):
+    """
+    The role of a session that existed before the broker started is
+    served once the broker has fetched it
+    """
+    deadline = time.perf_counter() + timeout
+    with BrokerClient() as client:
+        while True:
+            credentials = client.credentials()
+            if credentials and credentials['role']:
+                return credentials['role']
+            if time.perf_counter() > deadline:
+                raise BrokerError(f"No role served for an existing session: {credentials}")
+            time.sleep(0.01)
+
+
+def measure_kept(calls):
+    durations = []
+    with BrokerClient() as client:
+        started = time.perf_counter()
+        first = client.credentials()
+        first_call = time.perf_counter() - started
+        for _ in range(calls):
+            started = time.perf_counter()
+            client.credentials()
+            durations.append(time.perf_counter() - started)
+    return first, first_call, summarize('kept connection', durations)
+
+
+def measure_fresh(calls):
+    durations = []
+    for _ in range(calls):
+        started = time.perf_counter()
+        with BrokerClient() as client:
+            client.credentials()
+        durations.append(time.perf_counter() - started)
+    return summarize('new connection per call', durations)
+
+
+def measure_wrong_secret():
+    with open(broker_file()) as info_file:
+        server = json.load(info_file)['server']
+    socket = QLocalSocket()
+    socket.connectToServer(server)
+    socket.waitForConnected(1000)
+    socket.write(b'{"secret": "guess"}\ncredentials\n')
+    socket.flush()
+    socket.waitForReadyRead(1000)
+    return json.loads(socket.readLine(4096))
+
+
+def wait(app, handle, timeout):
+    deadline = time.perf_counter() + timeout
+    while not handle.done and time.perf_counter() < deadline:
+        app.processEvents()
+        time.sleep(0.002)
+    return handle
+
+
+def stored_refresh_token(service):
+    encrypted = keyring.get_password('cs2_login_app', 'session')
+    if encrypted is None:
+        return None
+    return json.loads(service._get_fernet().decrypt(encrypted.encode()))['refresh_token']
+
+
+def check_refreshed_session_saved(timeout=15.0):
+    """
+    Sign in with "Remember me" against the stand-in, refresh, and restore
+    the saved session in a second service
+    """
+    app = QCoreApplication.instance() or QCoreApplication(sys.argv[:1])
+    keyring.set_keyring(MemoryKeyring())
+    provider = StandInProvider()
+    threading.Thread(target=provider.serve_forever, daemon=True).start()
+    config = {'supabase_url': provider.url, 'supabase_key': STANDIN_KEY}
+    try:
+        service = SupabaseService(config)
+        service.browser_open = follow
+        wait(app, service.start('sign_in_with_oauth', 'google', True, deadline=timeout), timeout)
+        signed_in_token = stored_refresh_token(service)
+        refresh = wait(app, service.start('refresh_session'), timeout)
+        saved_token = stored_refresh_token(service)
+        restored = SupabaseService(config)
+    finally:
+        provider.shutdown()
+        provider.server_close()
+
+    report = {
+        'refreshed': refresh.result is True,
+        'saved_token_rotated': (signed_in_token is not None and saved_token != signed_in_token and
+                                saved_token == session_field(service.current_session, 'refresh_token')),
+        'restored_as': getattr(restored.current_user, 'email', None),
+        'refresh_grants': provider.refreshes,
+    }
+    if not (report['refreshed'] and report['saved_token_rotated'] and report['restored_as']):
+        raise RuntimeError(f"The refreshed session was not saved and restored: {report}")
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--calls', type=int, default=5000, help='credential requests per setup')
+    parser.add_argument('--serve', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve()
+        return
+
+    with tempfile.TemporaryDirectory() as config_dir:
+        os.environ['XDG_CONFIG_HOME'] = config_dir
+        os.environ['APPDATA'] = config_dir
+        env = dict(os.environ, PYTHON_KEYRING_BACKEND='keyring.backends.null.Keyring',
+                   CS2_LOGIN_LOG_DIR=os.path.join(config_dir, 'logs'))
+        child = subprocess.Popen([sys.executable, '-m', 'benchmarks.token_broker', '--serve'], cwd=ROOT_DIR,
+                                 env=env, stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+        try:
+            if child.stdout.readline().strip() != 'ready':
+                raise BrokerError("The broker process did not start")
+            existing_role = check_existing_session_role()
+            first, first_call, kept = measure_kept(args.calls)
+            results = {
+                'existing_session_role': existing_role,
+                'credentials': dict(first, access_token=first['access_token'][:12] + '...'),
+                'first_call_ms': round(first_call * 1000, 3),
+                'setups': [kept, measure_fresh(max(1, args.calls // 10))],
+                'wrong_secret': measure_wrong_secret(),
+            }
+        finally:
+            child.stdin.close()
+            child.wait(10)
+        results['refreshed_session'] = check_refreshed_session_saved()
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,235 @@
+"""
+Headless UI benchmark suite.
+
+Measures, with a stubbed SupabaseService so only UI work is timed:
+
+- construction time and memory of every screen and of MainWindow
+- change_screen: the synchronous call and the frames of the cross-fade
+- hover frames of AnimatedButton and OAuthButton and focus frames of
+  AnimatedLineEdit (animation tick plus synchronous repaint)
+- DashboardScreen.update_user_info with and without a role change
+
+Output is JSON with sorted keys and fixed rounding, so two runs can be
+diffed directly. Memory is reported as Python allocations (tracemalloc),
+resident set growth (Linux only, null elsewhere) and QObjects created.
+
+Usage (from the repository root):
+
+    python -m benchmarks.ui_suite --repeat 20 --output ui_suite.json
+"""
+import argparse
+import json
+import statistics
+import time
+import tracemalloc
+
+from benchmarks.common import (BENCHMARK_CONFIG, StubSupabaseService, application, destroy,
+                               environment, rss_bytes, run_until, summarize_ms)
+
+from PyQt6.QtWidgets import QApplication, QWidget, QVBoxLayout
+from PyQt6.QtCore import Qt, QObject, QEvent, QPointF
+from PyQt6.QtGui import QEnterEvent, QFocusEvent
+
+from app.ui.animation import animation_manager
+from app.ui.main_window import MainWindow
+from app.ui.screens.login_screen import LoginScreen
+from app.ui.screens.register_screen import RegisterScreen
+from app.ui.screens.dashboard_screen import DashboardScreen
+from app.ui.screens.forgot_password_screen import ForgotPasswordScreen
+from app.ui.widgets.animated_button import AnimatedButton
+from app.ui.widgets.animated_line_edit import AnimatedLineEdit
+from app.ui.widgets.oauth_button import OAuthButton
+
+SCHEMA_VERSION = 1
+
+FACTORIES = {
+    'LoginScreen': LoginScreen,
+    'RegisterScreen': RegisterScreen,
+    'DashboardScreen': DashboardScreen,
+    'ForgotPasswordScreen': ForgotPasswordScreen,
+    'MainWindow': lambda service: MainWindow(BENCHMARK_CONFIG, service),
+}
+
+
+def measure_construction(app, name, factory, repeat):
+    service = StubSupabaseService()
+
+    # The first instance also pays for style sheet matching and image caches
+    started = time.perf_counter()
+    widget = factory(service)
+    cold = time.perf_counter() - started
+    destroy(app, widget)
+
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        widget = factory(service)
+        samples.append(time.perf_counter() - started)
+        destroy(app, widget)
+
+    # Memory of one more instance, measured separately so tracing does not
+    # slow down the timed runs
+    rss_before = rss_bytes()
+    tracemalloc.start()
+    widget = factory(service)
+    app.processEvents()
+    python_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    rss_after = rss_bytes()
+    qobjects = 1 + len(widget.findChildren(QObject))
+    destroy(app, widget)
+
+    return dict(summarize_ms(samples), **{
+        'cold_ms': round(cold * 1000, 3),
+        'python_kb': round(python_bytes / 1024, 1),
+        'rss_kb': round((rss_after - rss_before) / 1024, 1) if rss_before is not None else None,
+        'qobjects': qobjects,
+    })
+
+
+def measure_transitions(app, repeat):
+    window = MainWindow(BENCHMARK_CONFIG, StubSupabaseService())
+    window.resize(400, 700)
+    window.show()
+    app.processEvents()
+    transition = window.screen_transition
+
+    calls, frames, paint = [], [], []
+    targets = [1, 0, 3, 0, 2, 0]
+    for index in range(repeat):
+        started = time.perf_counter()
+        window.change_screen(targets[index % len(targets)])
+        calls.append(time.perf_counter() - started)
+        run_until(app, lambda: not transition.isVisible())
+        frame_count = len(transition._frame_times) - 1
+        frames.append(frame_count)
+        if frame_count:
+            paint.append(transition._paint_time / frame_count)
+
+    destroy(app, window)
+    return {
+        'change_screen_call': summarize_ms(calls),
+        'frames_per_transition': round(float(statistics.mean(frames)), 1),
+        'paint_per_frame': summarize_ms(paint),
+        'duration_ms': BENCHMARK_CONFIG['transition_duration_ms'],
+    }
+
+
+def hover_in(widget):
+    position = QPointF(5, 5)
+    QApplication.sendEvent(widget, QEnterEvent(position, position, position))
+
+
+def hover_out(widget):
+    QApplication.sendEvent(widget, QEvent(QEvent.Type.Leave))
+
+
+def focus_in(widget):
+    QApplication.sendEvent(widget, QFocusEvent(QEvent.Type.FocusIn, Qt.FocusReason.OtherFocusReason))
+
+
+def focus_out(widget):
+    QApplication.sendEvent(widget, QFocusEvent(QEvent.Type.FocusOut, Qt.FocusReason.OtherFocusReason))
+
+
+def run_frames(manager, container):
+    """
+    Step the shared animation clock at its frame rate until it is idle,
+    timing the tick plus a synchronous repaint of every frame
+    """
+    samples = []
+    next_frame = time.perf_counter()
+    while manager.active_count:
+        next_frame += manager.frame_interval
+        time.sleep(max(0.0, next_frame - time.perf_counter()))
+        started = time.perf_counter()
+        manager._tick()
+        container.repaint()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def measure_animations(app, repeat):
+    container = QWidget()
+    layout = QVBoxLayout(container)
+    layout.setContentsMargins(30, 30, 30, 30)
+    layout.setSpacing(20)
+    widgets = {
+        'AnimatedButton.hover': (AnimatedButton("Login"), hover_in, hover_out),
+        'OAuthButton.hover': (OAuthButton("Continue with Google", 'google'), hover_in, hover_out),
+        'AnimatedLineEdit.focus': (AnimatedLineEdit(), focus_in, focus_out),
+    }
+    for widget, _, _ in widgets.values():
+        widget.setMinimumHeight(50)
+        layout.addWidget(widget)
+    container.resize(400, 320)
+    container.show()
+    app.processEvents()
+
+    manager = animation_manager()
+    results = {}
+    for name, (widget, start, finish) in widgets.items():
+        samples = []
+        for _ in range(repeat):
+            start(widget)
+            samples += run_frames(manager, container)
+            finish(widget)
+            samples += run_frames(manager, container)
+        results[name] = dict(summarize_ms(samples), frames_per_animation=round(len(samples) / (2 * repeat), 1))
+
+    destroy(app, container)
+    return results
+
+
+def measure_update_user_info(app, repeat):
+    service = StubSupabaseService()
+    dashboard = DashboardScreen(service)
+    dashboard.resize(400, 660)
+    dashboard.show()
+    app.processEvents()
+    dashboard.update_user_info(service.role)
+
+    same_role = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        dashboard.update_user_info(service.role)
+        same_role.append(time.perf_counter() - started)
+
+    role_change = []
+    for index in range(repeat):
+        service.role = 'PRO' if index % 2 == 0 else 'FREE'
+        started = time.perf_counter()
+        dashboard.update_user_info(service.role)
+        role_change.append(time.perf_counter() - started)
+
+    destroy(app, dashboard)
+    return {'same_role': summarize_ms(same_role), 'role_change': summarize_ms(role_change)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=20, help='runs per measurement')
+    parser.add_argument('--output', help='write the JSON here as well as to stdout')
+    args = parser.parse_args()
+
+    app = application()
+    report = {
+        'schema_version': SCHEMA_VERSION,
+        'environment': environment(),
+        'repeat': args.repeat,
+        'construction': {name: measure_construction(app, name, factory, args.repeat)
+                         for name, factory in FACTORIES.items()},
+        'transitions': measure_transitions(app, max(6, args.repeat // 2)),
+        'animations': measure_animations(app, max(1, args.repeat // 5)),
+        'update_user_info': measure_update_user_info(app, args.repeat),
+    }
+
+    text = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, 'w') as output_file:
+            output_file.write(text + '\n')
+    print(text)
+
+
+if __name__ == '__main__':
+    main()
@@ -6,18 +6,13 @@ from PyInstaller.utils.hooks import collect_data_files, collect_submodules
 
 block_cipher = None
 
-# Get the base directory
-base_dir = os.path.abspath(os.path.dirname(SPECPATH))
+# Get the base directory (SPECPATH already is the directory holding this spec)
+base_dir = os.path.abspath(SPECPATH)
 
-# Collect all necessary data files
-assets_dir = os.path.join(base_dir, 'app', 'assets')
-assets = []
-for root, dirs, files in os.walk(assets_dir):
-    for file in files:
-        file_path = os.path.join(root, file)
-        rel_path = os.path.relpath(file_path, base_dir)
-        target_path = os.path.dirname(rel_path)
-        assets.append((file_path, target_path))
+# Regenerate the compiled resource bundle; it is the only asset shipped
+sys.path.insert(0, base_dir)
+from app.utils.resource_compiler import compile_assets
+assets = [(compile_assets(), os.path.join('app', 'assets'))]
 
 # Add .env file if it exists
 env_file = os.path.join(base_dir, '.env')
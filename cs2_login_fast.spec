@@ -0,0 +1,166 @@
+# -*- mode: python ; coding: utf-8 -*-
+#
+# Startup-optimized build profile.
+#
+# Compared to cs2_login.spec this produces a one-dir bundle (nothing is
+# unpacked to a temp dir on launch), skips UPX (no decompression on load),
+# leaves out Qt modules/plugins the app never imports and ships bytecode
+# compiled at optimization level 1. Qt WebEngine is bundled for the
+# embedded OAuth view but only imported on demand, so it adds to the size
+# of the bundle, not to startup.
+#
+#   pyinstaller cs2_login_fast.spec
+#
+# The result is dist/CS2_Tool_Login_fast/. Compare it against the one-file
+# build with benchmarks/startup_profile.py.
+
+import os
+import sys
+from PyInstaller import __version__ as pyinstaller_version
+
+block_cipher = None
+
+# Get the base directory (SPECPATH already is the directory holding this spec)
+base_dir = os.path.abspath(SPECPATH)
+
+# Regenerate the compiled resource bundle; it is the only asset shipped
+sys.path.insert(0, base_dir)
+from app.utils.resource_compiler import compile_assets
+assets = [(compile_assets(), os.path.join('app', 'assets'))]
+
+# Add .env file if it exists
+env_file = os.path.join(base_dir, '.env')
+if os.path.exists(env_file):
+    assets.append((env_file, '.'))
+
+# Only what the analysis cannot see on its own; supabase submodules are
+# picked up through the normal import graph instead of collect_submodules()
+hidden_imports = [
+    'keyring.backends',
+]
+
+# Modules the app never imports but which PyQt6/stdlib hooks would drag in
+excluded_modules = [
+    'tkinter',
+    'unittest',
+    'pydoc',
+    'IPython',
+    'jedi',
+    'parso',
+    'PyQt6.QtWebEngineQuick',
+    'PyQt6.QtQml',
+    'PyQt6.QtQuick',
+    'PyQt6.QtQuickWidgets',
+    'PyQt6.QtMultimedia',
+    'PyQt6.QtMultimediaWidgets',
+    'PyQt6.QtOpenGL',
+    'PyQt6.QtOpenGLWidgets',
+    'PyQt6.QtPdf',
+    'PyQt6.QtPdfWidgets',
+    'PyQt6.QtPositioning',
+    'PyQt6.QtSql',
+    'PyQt6.QtTest',
+    'PyQt6.QtXml',
+    'PyQt6.QtBluetooth',
+    'PyQt6.QtNfc',
+    'PyQt6.QtSensors',
+    'PyQt6.QtSerialPort',
+    'PyQt6.QtDesigner',
+    'PyQt6.QtHelp',
+    'PyQt6.Qt3DCore',
+    'PyQt6.QtCharts',
+    'PyQt6.QtDataVisualization',
+]
+
+# Qt payload that the hooks collect but the app has no use for
+excluded_qt_paths = [
+    os.path.join('Qt6', 'translations'),
+    os.path.join('Qt6', 'qml'),
+    'Qt6Pdf',
+    os.path.join('plugins', 'multimedia'),
+    os.path.join('plugins', 'sqldrivers'),
+    os.path.join('plugins', 'printsupport'),
+    os.path.join('plugins', 'position'),
+    os.path.join('plugins', 'tls'),
+    os.path.join('plugins', 'networkinformation'),
+    os.path.join('plugins', 'imageformats', 'qgif'),
+    os.path.join('plugins', 'imageformats', 'qjpeg'),
+    os.path.join('plugins', 'imageformats', 'qtiff'),
+    os.path.join('plugins', 'imageformats', 'qwebp'),
+    os.path.join('plugins', 'imageformats', 'qwbmp'),
+    os.path.join('plugins', 'imageformats', 'qtga'),
+    os.path.join('plugins', 'imageformats', 'qpdf'),
+]
+
+# Exceptions within the excluded paths: WebEngine's locale data
+kept_qt_paths = [
+    os.path.join('Qt6', 'translations', 'qtwebengine_locales'),
+]
+
+
+def is_excluded(dest_name):
+    """
+    Check whether a collected TOC entry belongs to an excluded Qt path
+    """
+    if any(fragment in dest_name for fragment in kept_qt_paths):
+        return False
+    return any(fragment in dest_name for fragment in excluded_qt_paths)
+
+
+# Bytecode optimization level; Analysis(optimize=...) exists since PyInstaller 6.6,
+# older versions take it from the interpreter running the build (python -O -m PyInstaller)
+analysis_options = {}
+if tuple(int(part) for part in pyinstaller_version.split('.')[:2] if part.isdigit()) >= (6, 6):
+    analysis_options['optimize'] = 1
+
+a = Analysis(
+    ['main.py'],
+    pathex=[base_dir],
+    binaries=[],
+    datas=assets,
+    hiddenimports=hidden_imports,
+    hookspath=[],
+    hooksconfig={},
+    runtime_hooks=[],
+    excludes=excluded_modules,
+    win_no_prefer_redirects=False,
+    win_private_assemblies=False,
+    cipher=block_cipher,
+    noarchive=False,
+    **analysis_options,
+)
+
+a.binaries = [entry for entry in a.binaries if not is_excluded(entry[0])]
+a.datas = [entry for entry in a.datas if not is_excluded(entry[0])]
+
+pyz = PYZ(a.pure, a.zipped_data, cipher=block_cipher)
+
+exe = EXE(
+    pyz,
+    a.scripts,
+    [('O', None, 'OPTION')],
+    exclude_binaries=True,
+    name='CS2_Tool_Login_fast',
+    debug=False,
+    bootloader_ignore_signals=False,
+    strip=False,
+    upx=False,
+    console=False,
+    disable_windowed_traceback=False,
+    argv_emulation=False,
+    target_arch=None,
+    codesign_identity=None,
+    entitlements_file=None,
+    icon=os.path.join(base_dir, 'app', 'assets', 'icons', 'app_icon.ico') if os.path.exists(os.path.join(base_dir, 'app', 'assets', 'icons', 'app_icon.ico')) else None,
+)
+
+coll = COLLECT(
+    exe,
+    a.binaries,
+    a.zipfiles,
+    a.datas,
+    strip=False,
+    upx=False,
+    upx_exclude=[],
+    name='CS2_Tool_Login_fast',
+)
@@ -1,36 +1,113 @@
 import sys
 import os
+import time
 import logging
 from dotenv import load_dotenv
-from PyQt6.QtWidgets import QApplication
-from PyQt6.QtGui import QFontDatabase
 
-from app.ui.main_window import MainWindow
-from app.utils.config import load_config
-from app.utils.logging_config import setup_logging
+# Only what the hand-off to a running app needs is imported up front; the
+# UI, services and their dependencies are imported in main() once this
+# launch is known to be the running app
+from app.utils.settings import settings
+from app.utils.single_instance import SingleInstance
+
+def startup_images():
+    """
+    Images the screens ask for while they are built
+    """
+    from PyQt6.QtCore import QSize
+    from app.ui.widgets.oauth_button import OAuthButton
+    return [
+        (':/icons/google.svg', OAuthButton.ICON_SIZE),
+        (':/images/logo.svg', QSize(80, 80)),
+        (':/images/logo.svg', QSize(50, 50)),
+    ]
+
+def write_startup_probe(probe_path, app):
+    """
+    Record the time the main window became visible and quit.
+    Used by benchmarks/startup_profile.py to measure time-to-window.
+    """
+    with open(probe_path, 'w') as probe_file:
+        probe_file.write(repr(time.time()))
+    app.quit()
 
 def main():
+    # Load environment variables and the settings on top of them; logging
+    # is configured from the settings
+    load_dotenv()
+    app_settings = settings()
+    app_settings.load()
+    
+    # Hand the command line to an app that is already running and leave.
+    # Startup measurements always start their own.
+    instance = None
+    if app_settings.get('single_instance') and not os.getenv('CS2_LOGIN_STARTUP_PROBE'):
+        instance = SingleInstance()
+        if instance.hand_off(sys.argv):
+            sys.exit(0)
+    
+    from PyQt6.QtCore import Qt, QCoreApplication, QTimer, QDir
+    from PyQt6.QtWidgets import QApplication
+    from PyQt6.QtGui import QFontDatabase
+    from app.ui.main_window import MainWindow
+    from app.ui.theme import apply_theme
+    from app.utils.config import load_config
+    from app.utils.logging_config import setup_logging, shutdown_logging
+    from app.utils import metrics, tracing
+    from app.utils.census import census_from_settings
+    from app.services.token_broker import token_broker_from_settings
+    from app.utils.resources import load_resources
+    from app.utils.watchdog import watchdog_from_settings
+    from app.ui.animation import animation_manager
+    from app.ui.image_registry import image_registry
+    
     # Set up logging
     setup_logging()
-    logger = logging.getLogger('cs2_tool_logger')
+    logger = logging.getLogger('app.main')
     logger.info('Application starting...')
+    logger.info('Environment variables and settings loaded.')
     
-    # Load environment variables
-    load_dotenv()
-    logger.info('Environment variables loaded.')
+    # Lets the embedded OAuth view import WebEngine after the application
+    # exists instead of at startup
+    QCoreApplication.setAttribute(Qt.ApplicationAttribute.AA_ShareOpenGLContexts)
     
     # Initialize application
     app = QApplication(sys.argv)
     logger.info('QApplication initialized.')
     
+    # Later launches reach this one from now on
+    if instance:
+        instance.listen()
+    
+    # Apply edits to .env and the settings file while running
+    app_settings.watch()
+    
+    # Opt-in GUI thread stall detection (watchdog, CS2_LOGIN_WATCHDOG=1)
+    watchdog = watchdog_from_settings(app)
+    
+    # Opt-in metrics export (metrics_file / metrics_port)
+    metrics_export = metrics.export_from_settings(app)
+    
+    # Opt-in QObject census and tracemalloc snapshots (census, CS2_LOGIN_CENSUS=1)
+    census = census_from_settings(app)
+    
+    # Register compiled assets
+    load_resources()
+    logger.info('Resources loaded.')
+    
+    # Install the application-wide theme once
+    apply_theme(app)
+    
     # Load fonts
-    fonts_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'app', 'assets', 'fonts')
-    if os.path.exists(fonts_dir):
-        for font_file in os.listdir(fonts_dir):
-            if font_file.endswith('.ttf'):
-                QFontDatabase.addApplicationFont(os.path.join(fonts_dir, font_file))
+    fonts_dir = QDir(':/fonts')
+    if fonts_dir.exists():
+        for font_file in fonts_dir.entryList(['*.ttf']):
+            QFontDatabase.addApplicationFont(f":/fonts/{font_file}")
         logger.info('Fonts loaded.')
     
+    # Rasterize icons and logos in the background while configuration and services load
+    image_registry().prewarm(startup_images())
+    
     # Load configuration
     config = load_config()
     logger.info('Configuration loaded.')
@@ -38,10 +115,38 @@ def main():
     # Create and show main window
     window = MainWindow(config)
     window.show()
+    if instance:
+        instance.arguments_received.connect(window.activate)
+    if census:
+        census.watch(window.supabase_service)
+    
+    # Opt-in credentials for other local CS2 tools (token_broker, CS2_LOGIN_TOKEN_BROKER=1)
+    broker = token_broker_from_settings(window.supabase_service, app)
     logger.info('Main window shown.')
     
+    # Startup measurement mode: exit as soon as the event loop has painted the window
+    probe_path = os.getenv('CS2_LOGIN_STARTUP_PROBE')
+    if probe_path:
+        QTimer.singleShot(0, lambda: write_startup_probe(probe_path, app))
+    
     # Start application event loop
-    sys.exit(app.exec())
+    exit_code = app.exec()
+    app_settings.stop()
+    if instance:
+        instance.close()
+    if broker:
+        broker.stop()
+    if watchdog:
+        watchdog.stop()
+    if census:
+        census.stop()
+    if metrics_export:
+        metrics_export.stop()
+    tracing.export()
+    logger.info('Image cache: %s', image_registry().stats())
+    logger.info('Animations: %s', animation_manager().stats())
+    shutdown_logging()
+    sys.exit(exit_code)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
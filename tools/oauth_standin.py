@@ -0,0 +1,275 @@
+"""
+Local stand-in for Supabase's OAuth endpoints.
+
+Serves the parts of the Supabase auth API that the loopback PKCE sign-in
+uses: /auth/v1/authorize (redirects straight back with a code, as if the
+user had approved at the provider), /auth/v1/token?grant_type=pkce (checks
+the code verifier against the saved challenge),
+/auth/v1/token?grant_type=refresh_token (refresh tokens are single use, as
+with Supabase's reuse detection), /auth/v1/user and the profiles role
+lookup. Tokens are unsigned JWTs, good for this server only.
+
+By default it runs the whole flow once, headless: SupabaseService starts
+sign_in_with_oauth against the stand-in, a "browser" follows the authorize
+redirect to the loopback listener, and the report says whether the session
+was completed, whether the listener was closed afterwards and how long it
+took. The exit status is 1 when the outcome is not the expected one.
+
+Usage (from the repository root):
+
+    python -m tools.oauth_standin               # approve the sign-in
+    python -m tools.oauth_standin --deny        # the provider refuses
+    python -m tools.oauth_standin --serve 54321 # only serve, for main.py
+
+With --serve, point the app at the stand-in with SUPABASE_URL and
+SUPABASE_KEY (the key is printed) and sign in with Google.
+"""
+import argparse
+import base64
+import hashlib
+import json
+import os
+import secrets
+import socket
+import sys
+import threading
+import time
+import urllib.request
+import uuid
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode, urlsplit
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+os.environ.setdefault('PYTHON_KEYRING_BACKEND', 'keyring.backends.null.Keyring')
+
+from PyQt6.QtCore import QCoreApplication
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+STANDIN_EMAIL = 'oauth.user@example.com'
+
+
+def b64url(data):
+    return base64.urlsafe_b64encode(data).rstrip(b'=').decode('ascii')
+
+
+def unsigned_jwt(claims):
+    header = b64url(json.dumps({'alg': 'HS256', 'typ': 'JWT'}).encode())
+    return f"{header}.{b64url(json.dumps(claims).encode())}.{b64url(b'stand-in')}"
+
+
+# Looks like a Supabase anon key, which create_client insists on
+STANDIN_KEY = unsigned_jwt({'role': 'anon', 'iss': 'oauth-standin'})
+
+
+class StandInProvider(ThreadingHTTPServer):
+    """
+    The stand-in server and what it saw: issued codes with their PKCE
+    challenges, sessions, and the redirect URIs it sent browsers to
+    """
+    daemon_threads = True
+
+    def __init__(self, port=0, deny=False):
+        super().__init__(('127.0.0.1', port), StandInHandler)
+        self.deny = deny
+        self.codes = {}
+        self.sessions = {}
+        self.redirects = []
+        self.exchanges = []
+        self.refresh_tokens = set()
+        self.refreshes = []
+        self.user = {
+            'id': str(uuid.uuid4()),
+            'aud': 'authenticated',
+            'role': 'authenticated',
+            'email': STANDIN_EMAIL,
+            'app_metadata': {'provider': 'google', 'providers': ['google']},
+            'user_metadata': {'username': 'oauth_user', 'full_name': 'OAuth User'},
+            'created_at': datetime.now(timezone.utc).isoformat(),
+        }
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def issue_session(self):
+        now = int(time.time())
+        access_token = unsigned_jwt({'sub': self.user['id'], 'email': STANDIN_EMAIL, 'aud': 'authenticated',
+                                     'role': 'authenticated', 'iat': now, 'exp': now + 3600})
+        self.sessions[access_token] = self.user
+        refresh_token = secrets.token_urlsafe(24)
+        self.refresh_tokens.add(refresh_token)
+        return {
+            'access_token': access_token,
+            'refresh_token': refresh_token,
+            'token_type': 'bearer',
+            'expires_in': 3600,
+            'expires_at': now + 3600,
+            'user': self.user,
+        }
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def send_json(self, status, body):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def redirect(self, location):
+        self.send_response(302)
+        self.send_header('Location', location)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        params = {name: values[0] for name, values in parse_qs(parts.query).items()}
+        provider = self.server
+
+        if parts.path == '/auth/v1/authorize':
+            redirect_to = params.get('redirect_to', '')
+            provider.redirects.append(redirect_to)
+            if not redirect_to or params.get('code_challenge_method') != 's256' or 'code_challenge' not in params:
+                self.send_json(400, {'error': 'invalid_request', 'error_description': 'PKCE parameters missing'})
+            elif provider.deny:
+                self.redirect(redirect_to + '?' + urlencode({
+                    'error': 'access_denied', 'error_description': 'The user denied access'}))
+            else:
+                code = secrets.token_urlsafe(16)
+                provider.codes[code] = params['code_challenge']
+                self.redirect(redirect_to + '?' + urlencode({'code': code}))
+        elif parts.path == '/auth/v1/user':
+            token = self.headers.get('Authorization', '').removeprefix('Bearer ')
+            user = provider.sessions.get(token)
+            if user is None:
+                self.send_json(401, {'msg': 'Invalid token'})
+            else:
+                self.send_json(200, user)
+        elif parts.path == '/rest/v1/profiles':
+            self.send_json(200, [{'role': 'FREE'}])
+        else:
+            self.send_json(404, {'msg': 'Not found'})
+
+    def do_POST(self):
+        parts = urlsplit(self.path)
+        body = json.loads(self.rfile.read(int(self.headers.get('Content-Length') or 0)) or b'{}')
+        provider = self.server
+
+        if parts.path == '/auth/v1/token' and parse_qs(parts.query).get('grant_type') == ['pkce']:
+            challenge = provider.codes.pop(body.get('auth_code'), None)
+            verifier = body.get('code_verifier', '')
+            verified = challenge is not None and b64url(hashlib.sha256(verifier.encode()).digest()) == challenge
+            provider.exchanges.append(verified)
+            if not verified:
+                self.send_json(400, {'error': 'invalid_grant',
+                                     'error_description': 'Invalid code or code verifier'})
+            else:
+                self.send_json(200, provider.issue_session())
+        elif parts.path == '/auth/v1/token' and parse_qs(parts.query).get('grant_type') == ['refresh_token']:
+            refresh_token = body.get('refresh_token')
+            valid = refresh_token in provider.refresh_tokens
+            provider.refresh_tokens.discard(refresh_token)
+            provider.refreshes.append(valid)
+            if not valid:
+                self.send_json(400, {'error': 'invalid_grant',
+                                     'error_description': 'Invalid Refresh Token: Already Used'})
+            else:
+                self.send_json(200, provider.issue_session())
+        else:
+            self.send_json(404, {'msg': 'Not found'})
+
+
+def follow(url):
+    """
+    What the browser does with the authorize URL: follow the redirect to
+    the loopback listener
+    """
+    with urllib.request.urlopen(url, timeout=10) as response:
+        response.read()
+
+
+def listener_closed(redirect_uri):
+    port = urlsplit(redirect_uri).port
+    try:
+        socket.create_connection(('127.0.0.1', port), timeout=1).close()
+        return False
+    except OSError:
+        return True
+
+
+def run_flow(provider, timeout):
+    from app.services.supabase_service import SupabaseService
+
+    app = QCoreApplication.instance() or QCoreApplication(sys.argv[:1])
+    service = SupabaseService({'supabase_url': provider.url, 'supabase_key': STANDIN_KEY})
+    service.browser_open = follow
+
+    errors = []
+    service.auth_error.connect(errors.append)
+
+    started = time.perf_counter()
+    handle = service.start('sign_in_with_oauth', 'google', deadline=timeout)
+    while not handle.done:
+        app.processEvents()
+        time.sleep(0.002)
+    elapsed = time.perf_counter() - started
+
+    user = service.current_user
+    return {
+        'state': handle.state,
+        'result': handle.result,
+        'signed_in_as': getattr(user, 'email', None),
+        'errors': errors,
+        'pkce_exchanges': provider.exchanges,
+        'redirect_uri': provider.redirects[-1] if provider.redirects else None,
+        'listener_closed': listener_closed(provider.redirects[-1]) if provider.redirects else None,
+        'elapsed_ms': round(elapsed * 1000, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--deny', action='store_true', help='refuse the sign-in at the provider')
+    parser.add_argument('--serve', type=int, metavar='PORT', help='only serve on PORT until interrupted')
+    parser.add_argument('--timeout', type=float, default=15, help='deadline of the sign-in operation (s)')
+    parser.add_argument('--verbose', action='store_true', help='let the app log to stderr')
+    args = parser.parse_args()
+
+    provider = StandInProvider(args.serve or 0, deny=args.deny)
+    if args.serve:
+        print(f"SUPABASE_URL={provider.url}\nSUPABASE_KEY={STANDIN_KEY}", flush=True)
+        try:
+            provider.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        return
+
+    if not args.verbose:
+        import logging
+        logging.getLogger('app').addHandler(logging.NullHandler())
+        logging.getLogger('app').propagate = False
+
+    threading.Thread(target=provider.serve_forever, name='oauth-standin', daemon=True).start()
+    report = run_flow(provider, args.timeout)
+    provider.shutdown()
+
+    if args.deny:
+        ok = report['signed_in_as'] is None and bool(report['errors'])
+    else:
+        ok = report['signed_in_as'] == STANDIN_EMAIL and report['pkce_exchanges'] == [True]
+    ok = ok and report['listener_closed'] is True
+    report['ok'] = ok
+    print(json.dumps(report, indent=2, default=str))
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,146 @@
+"""
+Login/logout soak test with an object census.
+
+Runs the real screens and SupabaseService in demo mode under the offscreen
+Qt platform. Every cycle fails a sign-in (error message), presses the login
+button, signs in, opens the dashboard and signs out again. A census is taken
+after every --sample-every cycles once --warmup cycles have filled the
+caches. The JSON report lists the QObject and traced memory trend, what
+grew between the first and last sample, and the QObject classes that grew
+steadily. The exit status is 1 when any class did.
+
+The keyring backend defaults to the null backend, so the user's keyring is
+not touched.
+
+Usage (from the repository root):
+
+    python -m tools.soak --cycles 300 --sample-every 25
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+import tracemalloc
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+os.environ.setdefault('PYTHON_KEYRING_BACKEND', 'keyring.backends.null.Keyring')
+
+from PyQt6.QtWidgets import QApplication
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from app.ui.animation import animation_manager
+from app.ui.main_window import MainWindow
+from app.ui.theme import apply_theme
+from app.utils.census import count_diff, growing_types, memory_diff, take_snapshot
+from app.utils.resources import load_resources
+
+DEMO_EMAIL = 'demo@example.com'
+DEMO_PASSWORD = 'password123'
+
+
+def settle(app, window):
+    """
+    Process events until the screen transition, animations and service
+    operations are done
+    """
+    deadline = time.perf_counter() + 5.0
+    while time.perf_counter() < deadline:
+        app.processEvents()
+        if (not window.screen_transition.isVisible() and animation_manager().active_count == 0
+                and window.supabase_service.pending_operations == 0):
+            break
+        time.sleep(0.001)
+    app.processEvents()
+
+
+def cycle(app, window):
+    login = window.login_screen
+
+    # Failed attempt: auth_error reaches every screen's error handler
+    login.email_edit.setText(DEMO_EMAIL)
+    login.password_edit.setText('wrong password')
+    login.on_login_clicked()
+
+    # Button press feedback
+    login.login_button.pressed.emit()
+    login.login_button.released.emit()
+    settle(app, window)
+
+    login.password_edit.setText(DEMO_PASSWORD)
+    login.on_login_clicked()
+    settle(app, window)
+    if window.stacked_widget.currentWidget() is not window.dashboard_screen:
+        raise RuntimeError("Sign-in did not reach the dashboard")
+
+    window.dashboard_screen.on_logout_clicked()
+    settle(app, window)
+    login.email_edit.clear()
+    login.password_edit.clear()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--cycles', type=int, default=300, help='login/logout cycles')
+    parser.add_argument('--warmup', type=int, default=10, help='cycles before the first census')
+    parser.add_argument('--sample-every', type=int, default=25, help='cycles between censuses')
+    parser.add_argument('--transition-ms', type=int, default=0, help='screen cross-fade duration')
+    parser.add_argument('--min-increases', type=int, default=3,
+                        help='rises without a drop that flag a class as growing')
+    parser.add_argument('--verbose', action='store_true', help='let the app log to stderr')
+    args = parser.parse_args()
+
+    if not args.verbose:
+        logging.getLogger('app').addHandler(logging.NullHandler())
+        logging.getLogger('app').propagate = False
+
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    load_resources()
+    apply_theme(app)
+
+    window = MainWindow({
+        'supabase_url': 'https://demo.supabase.co',
+        'supabase_key': 'demo-anon-key',
+        'transition_duration_ms': args.transition_ms,
+        # Two sign-ins per cycle would soon be throttled
+        'auth_rate_limits': {'sign_in': (1e6, 1e6)},
+    })
+    window.resize(400, 700)
+    window.show()
+    settle(app, window)
+
+    # A first census creates wrappers and enum types the later ones reuse
+    take_snapshot('prime')
+    tracemalloc.start()
+    snapshots = []
+    started = time.perf_counter()
+    for index in range(1, args.cycles + 1):
+        cycle(app, window)
+        if index >= args.warmup and (index - args.warmup) % args.sample_every == 0:
+            snapshot = take_snapshot(f"cycle {index}")
+            snapshots.append(snapshot)
+    elapsed = time.perf_counter() - started
+
+    growing = growing_types(snapshots, args.min_increases)
+    report = {
+        'cycles': args.cycles,
+        'wall_s': round(elapsed, 1),
+        'ms_per_cycle': round(elapsed / args.cycles * 1000, 1),
+        'samples': [{'label': snapshot.label, 'qobjects': snapshot.qobjects,
+                     'traced_kb': round(snapshot.traced_bytes / 1024, 1)} for snapshot in snapshots],
+        'qobject_changes': count_diff(snapshots[0], snapshots[-1]) if len(snapshots) > 1 else {},
+        'memory_growth': memory_diff(snapshots[0], snapshots[-1]) if len(snapshots) > 1 else [],
+        'growing_types': growing,
+    }
+    tracemalloc.stop()
+    window.close()
+
+    print(json.dumps(report, indent=2))
+    sys.exit(1 if growing else 0)
+
+
+if __name__ == '__main__':
+    main()